@@ -0,0 +1,287 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from rate_limit import current_party, set_party
+from resume_analysis import analyze_resume_structured, stream_critique
+from telemetry import get_default_telemetry, span
+
+# Statuses a task can end in
+FINISHED = ("done", "failed", "cancelled")
+
+# Task handler: (payload, report) -> result; report(**progress) publishes progress and raises Cancelled
+Handler = Callable[[Dict, Callable[..., None]], Dict]
+
+
+class Cancelled(Exception):
+    """Raised inside a running task by its next progress report once it has been cancelled."""
+
+
+class AnalysisQueue:
+    """Queue of resume analyses, run by a pool of worker threads instead of the sessions' script threads.
+
+    A session submits an analysis and polls `status(task_id)` for its
+    progress (the critique so far) and result, so slow model responses hold
+    at most `workers` threads however many sessions are waiting. Queued
+    tasks run highest `priority` first, then oldest first.
+
+    Tasks live in a SQLite file (ANALYSIS_QUEUE_PATH) shared by every app
+    process on the host, so any process's workers can pick them up. Running
+    tasks are kept alive by a heartbeat; one whose process died is queued
+    again after `lease` seconds. Cancelling a queued task drops it, and a
+    running one stops at its next progress report. Finished tasks are kept
+    for `retention` seconds.
+
+    The file holds personal data: a task's payload (the full resume text)
+    and its progress stay there until the task finishes, when both are
+    cleared. Only the result is kept for the retention period.
+    """
+
+    def __init__(self, run: Handler, path: Optional[str] = None, workers: Optional[int] = None,
+                 lease: float = 60.0, poll: float = 0.2, progress_interval: float = 0.25,
+                 retention: float = 3600.0):
+        self.run = run
+        self.path = path or os.getenv("ANALYSIS_QUEUE_PATH", os.path.join(".cache", "analysis_queue.sqlite3"))
+        self.workers = int(os.getenv("ANALYSIS_WORKERS", "4")) if workers is None else workers
+        self.lease = lease
+        self.poll = poll
+        self.progress_interval = progress_interval
+        self.retention = retention
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "recovered": 0}
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._running: Dict[str, bool] = {}  # Tasks this process is running -> cancel requested
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        try:
+            self._db = self._connect(self.path)
+        except sqlite3.Error as e:
+            # Still queue within this process, just without sharing or surviving restarts
+            print(f"Analysis queue is in-memory only: {str(e)}")
+            self._db = self._connect(":memory:")
+
+        self._threads = [threading.Thread(target=self._work, name=f"analysis-worker-{i}", daemon=True)
+                         for i in range(self.workers)]
+        self._threads.append(threading.Thread(target=self._heartbeat, name="analysis-heartbeat", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(path) if path != ":memory:" else ""
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode; every read-modify-write runs in an explicit BEGIN IMMEDIATE
+        db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS tasks (id TEXT PRIMARY KEY, priority INTEGER NOT NULL, status TEXT NOT NULL, "
+            "party TEXT, payload TEXT NOT NULL, progress TEXT NOT NULL DEFAULT '{}', result TEXT, error TEXT, "
+            "cancel INTEGER NOT NULL DEFAULT 0, owner TEXT, created REAL NOT NULL, started REAL, finished REAL, "
+            "heartbeat REAL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS tasks_queue ON tasks (status, priority DESC, created)")
+        return db
+
+    def submit(self, payload: Dict, priority: int = 0, party: Optional[str] = None) -> str:
+        """Queue a task; returns its id. `party` (default: the calling session) is used for rate-limit fairness."""
+        task_id = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO tasks (id, priority, status, party, payload, created) VALUES (?, ?, 'queued', ?, ?, ?)",
+                (task_id, priority, party or current_party(), json.dumps(payload), time.time())
+            )
+            self.counters["submitted"] += 1
+        self._wake.set()
+        return task_id
+
+    def status(self, task_id: str) -> Optional[Dict]:
+        """Status, progress and (once done) result of a task, or None if it is unknown or expired.
+
+        Queued tasks also report `position`: how many tasks will run before them.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, priority, progress, result, error, created, started, finished FROM tasks WHERE id = ?",
+                (task_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            status, priority, progress, result, error, created, started, finished = row
+            task = {"id": task_id, "status": status, "priority": priority, "progress": json.loads(progress),
+                    "result": json.loads(result) if result else None, "error": error,
+                    "created": created, "started": started, "finished": finished}
+            if status == "queued":
+                task["position"] = self._db.execute(
+                    "SELECT COUNT(*) FROM tasks WHERE status = 'queued' AND (priority > ? OR (priority = ? AND created < ?))",
+                    (priority, priority, created)
+                ).fetchone()[0]
+            return task
+
+    def cancel(self, task_id: str) -> bool:
+        """Cancel a queued or running task; False if it had already finished."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute("SELECT status FROM tasks WHERE id = ?", (task_id,)).fetchone()
+                if row is None or row[0] in FINISHED:
+                    return False
+                if row[0] == "queued":
+                    self._db.execute("UPDATE tasks SET status = 'cancelled', finished = ?, payload = '' WHERE id = ?",
+                                     (time.time(), task_id))
+                    self.counters["cancelled"] += 1
+                else:
+                    self._db.execute("UPDATE tasks SET cancel = 1 WHERE id = ?", (task_id,))
+                    if task_id in self._running:
+                        self._running[task_id] = True
+                return True
+            finally:
+                self._db.execute("COMMIT")
+
+    def wait(self, task_id: str, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Poll until the task finishes (or `timeout` passes) and return its status."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            task = self.status(task_id)
+            if task is None or task["status"] in FINISHED or (deadline is not None and time.monotonic() > deadline):
+                return task
+            time.sleep(self.poll)
+
+    def stats(self) -> Dict[str, int]:
+        """Tasks by status, plus this process's counters."""
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+            return {**{status: counts.get(status, 0) for status in ("queued", "running", *FINISHED)}, **self.counters}
+
+    def close(self):
+        """Stop taking new tasks; running ones finish in the background."""
+        self._stop.set()
+        self._wake.set()
+
+    def _work(self):
+        while not self._stop.is_set():
+            task = self._claim()
+            if task is None:
+                self._wake.wait(self.poll)
+                self._wake.clear()
+                continue
+            self._execute(*task)
+
+    def _claim(self):
+        """Mark the next queued task as ours, re-queueing tasks whose worker stopped heartbeating."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                recovered = self._db.execute(
+                    "UPDATE tasks SET status = 'queued', owner = NULL WHERE status = 'running' AND heartbeat < ?",
+                    (now - self.lease,)
+                ).rowcount
+                self.counters["recovered"] += recovered
+                row = self._db.execute(
+                    "SELECT id, party, payload, created FROM tasks WHERE status = 'queued' "
+                    "ORDER BY priority DESC, created LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    return None
+                self._db.execute(
+                    "UPDATE tasks SET status = 'running', owner = ?, started = ?, heartbeat = ? WHERE id = ?",
+                    (self._owner, now, now, row[0])
+                )
+                self._running[row[0]] = False
+            finally:
+                self._db.execute("COMMIT")
+        get_default_telemetry().observe("stage_duration_seconds", now - row[3], stage="analysis_queue_wait")
+        return row[0], row[1], json.loads(row[2])
+
+    def _execute(self, task_id: str, party: Optional[str], payload: Dict):
+        progress: Dict = {}
+        last_write = [0.0]
+
+        def report(**fields):
+            progress.update(fields)
+            if self._running.get(task_id):
+                raise Cancelled()
+            now = time.monotonic()
+            if now - last_write[0] >= self.progress_interval:
+                last_write[0] = now
+                self._update(task_id, progress=json.dumps(progress))
+
+        # Set for every task, so a worker thread never runs one under the previous task's party
+        set_party(party or f"task-{task_id}")
+        try:
+            result = self.run(payload, report)
+        except Cancelled:
+            self._finish(task_id, "cancelled")
+        except Exception as e:
+            self._finish(task_id, "failed", error=str(e))
+        else:
+            self._finish(task_id, "done", result=json.dumps(result))
+
+    def _update(self, task_id: str, **columns):
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        with self._lock:
+            self._db.execute(f"UPDATE tasks SET {assignments} WHERE id = ? AND owner = ?",
+                             (*columns.values(), task_id, self._owner))
+
+    def _finish(self, task_id: str, status: str, **columns):
+        # The resume and the critique so far aren't needed once the task is over; don't keep them on disk
+        self._update(task_id, status=status, finished=time.time(), payload="", progress="{}", **columns)
+        with self._lock:
+            self._running.pop(task_id, None)
+            self.counters["completed" if status == "done" else status] += 1
+
+    def _heartbeat(self):
+        """Keep our running tasks' leases alive, pick up cancellations and drop expired tasks."""
+        while not self._stop.wait(min(self.poll * 5, self.lease / 3)):
+            now = time.time()
+            with self._lock:
+                running = list(self._running)
+                if running:
+                    marks = ",".join("?" * len(running))
+                    self._db.execute(f"UPDATE tasks SET heartbeat = ? WHERE owner = ? AND id IN ({marks})",
+                                     (now, self._owner, *running))
+                    for task_id, in self._db.execute(
+                            f"SELECT id FROM tasks WHERE cancel = 1 AND id IN ({marks})", running).fetchall():
+                        if task_id in self._running:
+                            self._running[task_id] = True
+                self._db.execute("DELETE FROM tasks WHERE status IN ('done', 'failed', 'cancelled') AND finished < ?",
+                                 (now - self.retention,))
+
+
+def run_analysis(job_searcher, payload: Dict, report: Callable[..., None]) -> Dict:
+    """The app's resume analysis as a queued task.
+
+    payload: resume_text, job_role and mode ("single" for one structured
+    call, falling back to separate calls; anything else streams the critique
+    while recommendations and skills are generated alongside). Progress
+    carries the step and, while streaming, the critique so far.
+    """
+    resume_text, job_role = payload["resume_text"], payload.get("job_role")
+    client, cache = job_searcher.groq_client, job_searcher.llm_cache
+    with span("analyze_resume", mode=payload.get("mode", "streaming")) as stage:
+        if payload.get("mode") == "single":
+            report(step="analyzing")
+            analysis = analyze_resume_structured(client, cache, resume_text, job_role)
+            stage.set(structured=bool(analysis))
+            if analysis:
+                return {"critique": analysis["critique"], "recommendations": analysis["recommendations"],
+                        "skills": analysis["skills"]}
+
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="analysis-insights") as executor:
+            recommendations = executor.submit(job_searcher.get_job_recommendations, resume_text, job_role)
+            skills = executor.submit(job_searcher.extract_skills_from_resume, resume_text)
+            report(step="critique", critique="")
+            chunks: List[str] = []
+            for delta in stream_critique(client, cache, resume_text, job_role):
+                chunks.append(delta)
+                report(critique="".join(chunks))
+            report(step="insights")
+            return {"critique": "".join(chunks), "recommendations": recommendations.result(),
+                    "skills": skills.result()}
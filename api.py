@@ -0,0 +1,291 @@
+"""Headless HTTP API for resume analysis and job search.
+
+Usage:
+    python api.py [--host 0.0.0.0] [--port 8000] [--workers 4]
+    uvicorn api:app --workers 4
+
+Endpoints (JSON in, JSON out):
+    POST /analyze          critique, skills and job recommendations for a resume
+    POST /skills           skills found in a resume
+    POST /recommendations  job titles worth searching for
+    POST /jobs/search      jobs for a search term, or for a resume's skills
+    GET  /healthz          liveness
+    GET  /metrics          this worker's metrics in Prometheus text format
+
+A resume is sent as "resume_text", or as "resume_base64" plus its
+"content_type" (application/pdf or text/plain). With "stream": true,
+/analyze and /jobs/search answer with server-sent events instead: critique
+deltas as they are generated, or provider progress, then the result.
+
+Workers keep no per-user state; the LLM, result and rate-limit stores are
+the on-disk ones the app uses, so any number of workers and replicas can
+sit behind a load balancer. Set X-Client-Id to have rate budgets shared
+fairly per client rather than per connecting address.
+"""
+import argparse
+import asyncio
+import base64
+import binascii
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from async_job_search import AsyncJobSearcher
+from batch_analyze import analyze_text
+from llm_cache import cached_chat_stream_async
+from prompt_compaction import prepare_resume
+from rate_limit import RateLimited, set_party
+from resume_analysis import CRITIQUE_PROMPT_VERSION, MODEL, critique_messages
+from telemetry import get_default_telemetry, span
+from text_extraction import MAX_BYTES, ExtractionError, extract_text
+
+load_dotenv()
+
+MAX_RESULTS = 100
+
+# One event and its JSON payload in a server-sent event stream
+Event = Tuple[str, Any]
+
+
+class ApiError(Exception):
+    """A request the API can't serve; sent back as {"error": message} with `status`."""
+
+    def __init__(self, status: int, message: str):
+        self.status = status
+        super().__init__(message)
+
+
+def endpoint(handler: Callable[[Request, Dict], Awaitable[Response]]):
+    """Parse the JSON body, name the rate-limit party and turn failures into JSON errors."""
+    async def run(request: Request) -> Response:
+        set_party(request.headers.get("x-client-id") or f"client-{request.client.host if request.client else 'unknown'}")
+        try:
+            body = {}
+            if request.method == "POST":
+                try:
+                    body = await request.json()
+                except ValueError:
+                    raise ApiError(400, "Request body must be JSON")
+                if not isinstance(body, dict):
+                    raise ApiError(400, "Request body must be a JSON object")
+            with span("api_request", labels={"endpoint": request.url.path}):
+                return await handler(request, body)
+        except ApiError as e:
+            return JSONResponse({"error": str(e)}, status_code=e.status)
+        except RateLimited as e:
+            return JSONResponse({"error": str(e)}, status_code=429,
+                                headers={"Retry-After": str(max(1, round(e.retry_after)))})
+        except Exception as e:
+            return JSONResponse({"error": f"Upstream error: {str(e)}"}, status_code=502)
+    return run
+
+
+async def resume_text(body: Dict) -> str:
+    """The resume in a request, extracted from the uploaded file if it was sent as one."""
+    if body.get("resume_text"):
+        text = str(body["resume_text"])
+    elif body.get("resume_base64"):
+        try:
+            data = base64.b64decode(body["resume_base64"], validate=True)
+        except (binascii.Error, TypeError):
+            raise ApiError(400, "resume_base64 is not valid base64")
+        if len(data) > MAX_BYTES:
+            raise ApiError(413, f"File is {len(data) / 1024 / 1024:.1f} MB; the limit is {MAX_BYTES / 1024 / 1024:.0f} MB")
+        try:
+            # PDF parsing is CPU-bound; keep it off the event loop
+            text = await asyncio.to_thread(extract_text, data, body.get("content_type", "application/pdf"))
+        except ExtractionError as e:
+            raise ApiError(400, f"Could not read the resume: {str(e)}")
+    else:
+        raise ApiError(400, "Send the resume as resume_text or resume_base64")
+    if not text.strip():
+        raise ApiError(400, "The resume has no text")
+    return text
+
+
+def event_stream(events: AsyncIterator[Event]) -> StreamingResponse:
+    """Send (event, payload) pairs as server-sent events; a failure ends the stream with an error event."""
+    async def encode() -> AsyncIterator[str]:
+        try:
+            async for event, payload in events:
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        except RateLimited as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e), 'retry_after': e.retry_after})}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': f'Upstream error: {str(e)}'})}\n\n"
+    return StreamingResponse(encode(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+async def with_progress(call: Callable[[Callable, Callable], Awaitable[Any]]) -> AsyncIterator[Event]:
+    """Run a searcher call, yielding its progress events as they happen, then ("result", value)."""
+    queue: asyncio.Queue = asyncio.Queue()
+    task = asyncio.ensure_future(call(lambda event, details: queue.put_nowait((event, details)),
+                                      lambda message: queue.put_nowait(("warning", {"message": message}))))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            yield item
+        yield "result", task.result()
+    finally:
+        task.cancel()
+
+
+def searcher(request: Request) -> AsyncJobSearcher:
+    return request.app.state.searcher
+
+
+def job_records(jobs_df) -> List[Dict]:
+    # to_json turns NumPy scalars and NaN into plain JSON values
+    return json.loads(jobs_df.to_json(orient="records")) if not jobs_df.empty else []
+
+
+@endpoint
+async def analyze(request: Request, body: Dict) -> Response:
+    text = await resume_text(body)
+    job_role = body.get("job_role") or None
+    if not body.get("stream"):
+        return JSONResponse(await analyze_text(searcher(request).groq_client, searcher(request).llm_cache, text, job_role))
+    return event_stream(stream_analysis(searcher(request), text, job_role))
+
+
+async def stream_analysis(job_searcher: AsyncJobSearcher, text: str, job_role: Optional[str]) -> AsyncIterator[Event]:
+    """Critique deltas as they arrive; skills and recommendations are generated alongside and sent after."""
+    skills_task = asyncio.ensure_future(job_searcher.extract_skills_from_resume(text))
+    recommendations_task = asyncio.ensure_future(job_searcher.get_job_recommendations(text, job_role))
+    try:
+        critique_text = prepare_resume(text, "critique")
+        async for delta in cached_chat_stream_async(
+            job_searcher.groq_client,
+            job_searcher.llm_cache,
+            CRITIQUE_PROMPT_VERSION,
+            critique_text,
+            model=MODEL,
+            messages=critique_messages(critique_text, job_role),
+            temperature=0.7,
+            job_role=job_role,
+        ):
+            yield "critique", {"text": delta}
+        yield "skills", {"skills": await skills_task}
+        yield "recommendations", {"recommendations": await recommendations_task}
+        yield "done", {}
+    finally:
+        skills_task.cancel()
+        recommendations_task.cancel()
+
+
+@endpoint
+async def skills(request: Request, body: Dict) -> Response:
+    text = await resume_text(body)
+    warnings: List[str] = []
+    found = await searcher(request).extract_skills_from_resume(text, on_error=warnings.append)
+    return JSONResponse({"skills": found, "warnings": warnings})
+
+
+@endpoint
+async def recommendations(request: Request, body: Dict) -> Response:
+    text = await resume_text(body)
+    warnings: List[str] = []
+    found = await searcher(request).get_job_recommendations(text, body.get("target_role") or None,
+                                                            on_error=warnings.append)
+    return JSONResponse({"recommendations": found, "warnings": warnings})
+
+
+@endpoint
+async def search_jobs(request: Request, body: Dict) -> Response:
+    try:
+        results_wanted = int(body.get("results_wanted", 20))
+    except (TypeError, ValueError):
+        raise ApiError(400, "results_wanted must be a number")
+    if not 1 <= results_wanted <= MAX_RESULTS:
+        raise ApiError(400, f"results_wanted must be between 1 and {MAX_RESULTS}")
+    location = body.get("location") or "United States"
+    job_type = body.get("job_type") or None
+    mode = body.get("mode") or None
+    skills = body.get("skills")
+    if skills is not None and not (isinstance(skills, list) and all(isinstance(skill, str) for skill in skills)):
+        raise ApiError(400, "skills must be a list of strings")
+
+    job_searcher = searcher(request)
+    if body.get("search_term"):
+        search_term = str(body["search_term"])
+
+        def run(on_progress, on_error):
+            return job_searcher.search_jobs(search_term, location, results_wanted, job_type, mode,
+                                            on_progress=on_progress, on_error=on_error)
+    elif body.get("resume_text") or body.get("resume_base64") or skills:
+        # Skills already extracted can be sent on their own; the resume then only refines the ranking
+        text = await resume_text(body) if body.get("resume_text") or body.get("resume_base64") else ""
+
+        def run(on_progress, on_error):
+            return job_searcher.search_jobs_by_resume(text, location, results_wanted, job_type,
+                                                      skills=skills, mode=mode,
+                                                      on_progress=on_progress, on_error=on_error)
+    else:
+        raise ApiError(400, "Send a search_term, or a resume (or its skills) to search by")
+
+    if body.get("stream"):
+        async def events() -> AsyncIterator[Event]:
+            async for event, payload in with_progress(run):
+                yield (event, {"jobs": job_records(payload)}) if event == "result" else (event, payload)
+        return event_stream(events())
+
+    warnings: List[str] = []
+    jobs_df = await run(None, warnings.append)
+    return JSONResponse({"jobs": job_records(jobs_df), "warnings": warnings})
+
+
+async def healthz(request: Request) -> Response:
+    return JSONResponse({"status": "ok"})
+
+
+async def metrics(request: Request) -> Response:
+    return PlainTextResponse(get_default_telemetry().render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    groq_api_key = os.getenv("GROQ_API_KEY")
+    if not groq_api_key:
+        raise RuntimeError("GROQ_API_KEY not found. Please check your .env file.")
+    # One searcher (HTTP pool and Groq client) per worker, bound to its event loop
+    async with AsyncJobSearcher(groq_api_key) as job_searcher:
+        app.state.searcher = job_searcher
+        yield
+
+
+app = Starlette(
+    routes=[
+        Route("/analyze", analyze, methods=["POST"]),
+        Route("/skills", skills, methods=["POST"]),
+        Route("/recommendations", recommendations, methods=["POST"]),
+        Route("/jobs/search", search_jobs, methods=["POST"]),
+        Route("/healthz", healthz),
+        Route("/metrics", metrics),
+    ],
+    lifespan=lifespan,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=os.getenv("API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", str(os.cpu_count() or 1))))
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,27 @@
 import streamlit as st
-import groq
-import PyPDF2
-import io
+import functools
 import os
-import pandas as pd
 from dotenv import load_dotenv
+from analysis_queue import AnalysisQueue, run_analysis
+from job_results import JobResults
 from job_search import JobSearcher
+from lazy_imports import LazyModule, warm_up
+from prompt_compaction import compaction_stats, load_encoding
+from rate_limit import get_default_governor
+from telemetry import get_default_telemetry
+from text_extraction import ExtractionError, extract_text
 
 load_dotenv()
 
+# Only needed for the statistics tables, so it isn't imported before the first render
+pd = LazyModule("pandas")
+
+# Starts the /metrics endpoint on the first run if TELEMETRY_PORT is set
+telemetry = get_default_telemetry()
+
+STREAMING_MODE = "⚡ Streaming"
+SINGLE_CALL_MODE = "📦 Single call"
+
 st.set_page_config(page_title='Agragrati - AI Resume & Job Search',layout='wide')
 
 st.title('🎯 Agragrati - AI Resume & Job Search')
@@ -16,9 +29,27 @@ st.markdown('Upload your resume to receive feedback and find real job opportunit
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
+
+@st.cache_resource
+def get_job_searcher(groq_api_key: str) -> JobSearcher:
+    """One JobSearcher (and Groq client) per process, shared by every session and rerun."""
+    job_searcher = JobSearcher(groq_api_key)
+    # Load the heavy libraries while the first page renders, so the first analysis or search doesn't wait
+    warm_up("pandas", "numpy", "PyPDF2", "ranking", "dedup", load_encoding,
+            lambda: job_searcher.groq_client, lambda: job_searcher.transport.session)
+    return job_searcher
+
+
+@st.cache_resource
+def get_analysis_queue(groq_api_key: str) -> AnalysisQueue:
+    """Worker pool that runs every session's resume analyses, one per process."""
+    return AnalysisQueue(functools.partial(run_analysis, get_job_searcher(groq_api_key)))
+
+
 # Initialize job searcher
 if GROQ_API_KEY:
-    job_searcher = JobSearcher(GROQ_API_KEY)
+    job_searcher = get_job_searcher(GROQ_API_KEY)
+    analysis_queue = get_analysis_queue(GROQ_API_KEY)
 else:
     st.error("GROQ_API_KEY not found. Please check your .env file.")
     st.stop()
@@ -30,6 +61,12 @@ with tab1:
     st.header("Resume Analysis")
     uploaded_file = st.file_uploader("Upload Your Resume (PDF or TXT)", type=["pdf","txt"])
     job_role = st.text_input("Enter the job role you are targeting (optional)")
+    analysis_mode = st.radio(
+        "Analysis mode",
+        [STREAMING_MODE, SINGLE_CALL_MODE],
+        horizontal=True,
+        help="Streaming shows the critique as it is written. Single call asks for the critique, skills and recommendations together, using fewer tokens."
+    )
     analyze = st.button("Analyze Resume", type="primary")
 
 with tab2:
@@ -53,6 +90,32 @@ with tab2:
     if not any("✅" in status for status in api_status):
         st.warning("⚠️ No job search APIs configured. Will show sample data. See README for API setup instructions.")
 
+    provider_stats = job_searcher.transport.stats()
+    if provider_stats:
+        with st.expander("📈 Provider statistics"):
+            for stats in provider_stats.values():
+                stats["statuses"] = ", ".join(f"{code}: {count}" for code, count in sorted(stats["statuses"].items()))
+            st.dataframe(pd.DataFrame(provider_stats).T, use_container_width=True)
+            cache_stats = job_searcher.job_cache.stats()
+            st.caption(
+                f"Result cache: {cache_stats['fresh_hits']} fresh / {cache_stats['stale_hits']} stale hits, "
+                f"{cache_stats['misses']} misses, {cache_stats['refreshes']} background refreshes"
+            )
+            utilization = get_default_governor().utilization()
+            if utilization:
+                st.caption("Rate budget used: " + ", ".join(
+                    f"{upstream} {dimension} {used:.0%}"
+                    for upstream, dimensions in utilization.items() for dimension, used in dimensions.items()
+                ))
+            stages = telemetry.snapshot().get("stage_duration_seconds", [])
+            if stages:
+                st.markdown("**⏱️ Stage latency** (bucket upper bounds, seconds)")
+                st.dataframe(pd.DataFrame([
+                    {**row["labels"], "count": row["count"], "p50 ≤": row["p50"], "p95 ≤": row["p95"],
+                     "mean": round(row["sum"] / row["count"], 3)}
+                    for row in stages
+                ]), use_container_width=True)
+
     # Job search options
     search_option = st.radio(
         "Choose search method:",
@@ -77,6 +140,11 @@ with tab2:
         )
 
         results_count = st.slider("Number of results", min_value=10, max_value=50, value=20)
+        local_first = st.checkbox(
+            "⚡ Search saved listings first",
+            value=job_searcher.search_mode == "local-first",
+            help="Answer from jobs fetched by earlier searches when there are enough matches, without calling the APIs"
+        )
 
     search_jobs = st.button("🔍 Search Jobs", type="primary")
 
@@ -84,24 +152,28 @@ with tab3:
     st.header("Career Insights")
     st.info("Upload your resume and analyze it to get personalized career recommendations!")
 
-def extract_text_pdf(file):
-    pdf_reader=PyPDF2.PdfReader(file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text() + "\n"
-    
-    return text
-
 def extract_text_from_file(uploaded_file):
-    if uploaded_file.type == "application/pdf":
-        return extract_text_pdf(io.BytesIO(uploaded_file.read()))
-    return uploaded_file.read().decode("utf-8")
+    try:
+        return extract_text(uploaded_file.getvalue(), uploaded_file.type)
+    except ExtractionError as e:
+        st.error(f"Could not read your resume: {str(e)}")
+        st.stop()
 
 # Store resume content in session state for use across tabs
 if 'resume_content' not in st.session_state:
     st.session_state.resume_content = None
 if 'resume_analyzed' not in st.session_state:
     st.session_state.resume_analyzed = False
+if 'resume_skills' not in st.session_state:
+    st.session_state.resume_skills = None
+if 'job_results' not in st.session_state:
+    st.session_state.job_results = None
+if 'analysis_task' not in st.session_state:
+    st.session_state.analysis_task = None
+if 'analysis' not in st.session_state:
+    st.session_state.analysis = None
+if 'analysis_error' not in st.session_state:
+    st.session_state.analysis_error = None
 
 # Resume Analysis Logic
 if analyze and uploaded_file:
@@ -116,199 +188,182 @@ if analyze and uploaded_file:
         st.session_state.resume_content = file_content
         st.session_state.resume_analyzed = True
 
-        prompt = f"""
-    You are an expert resume reviewer and career consultant with 15+ years of experience in talent acquisition and HR. 
-    Analyze the following resume and provide comprehensive, actionable feedback for {job_role if job_role else 'general job applications'}.
-
-    **ANALYSIS FRAMEWORK:**
-    Please structure your response with the following sections:
-
-    1. **OVERALL IMPRESSION** (1-2 sentences)
-    - First impression and general quality assessment
-
-    2. **STRENGTHS** 
-    - What works well in this resume
-    - Standout achievements or experiences
-
-    3. **AREAS FOR IMPROVEMENT**
-    - Content gaps or weaknesses
-    - Formatting and presentation issues
-    - Missing key information
-
-    4. **SPECIFIC RECOMMENDATIONS**
-    - Concrete suggestions for improvement
-    - Industry-specific advice for {job_role if job_role else 'General Job Applications'}
-    - Keywords and skills to consider adding
-
-    5. **ACTION ITEMS** 
-    - Priority fixes (High/Medium/Low)
-    - Quick wins that can be implemented immediately
-
-    6. **FINAL SCORE** 
-    - Rate the resume from 1-10 with brief justification
-
-    **RESUME CONTENT:**
-    {file_content}
-
-    **INSTRUCTIONS:**
-    - Be honest but constructive in your feedback
-    - Provide specific examples from the resume when pointing out issues
-    - Consider ATS (Applicant Tracking System) compatibility
-    - Focus on relevance to {job_role if job_role else 'modern job market standards'}
-    - Suggest specific metrics, action verbs, and formatting improvements
-    - Keep feedback actionable and prioritized
-    """
-    
-        client = groq.Client(api_key=GROQ_API_KEY)
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "system", "content": "You are an expert resume reviewer with years of experience in HR and recruitment."},
-                      {"role": "user", "content": prompt}],
-            temperature=0.7,
-        )
-
-        st.balloons()
-
-        st.markdown('### 📋 Resume Analysis Results:')
-        st.markdown(response.choices[0].message.content)
+        # The LLM calls run on the analysis workers; this session only polls for progress
+        if st.session_state.analysis_task:
+            analysis_queue.cancel(st.session_state.analysis_task)
+        st.session_state.analysis = None
+        st.session_state.analysis_error = None
+        st.session_state.analysis_task = analysis_queue.submit({
+            "resume_text": file_content,
+            "job_role": job_role,
+            "mode": "single" if analysis_mode == SINGLE_CALL_MODE else "streaming",
+        })
+
+
+@st.fragment(run_every=1.0)
+def analysis_progress():
+    """Poll the running analysis; reruns on its own every second without rerunning the page."""
+    task = analysis_queue.status(st.session_state.analysis_task)
+    if task is None or task["status"] in ("failed", "cancelled"):
+        # Kept in the session and shown by the page, since this fragment stops once the task is cleared
+        if task is not None and task["status"] == "failed":
+            st.session_state.analysis_error = task["error"]
+        st.session_state.analysis_task = None
+        st.rerun()
+    if task["status"] == "done":
+        st.session_state.analysis = task["result"]
+        st.session_state.resume_skills = task["result"]["skills"]
+        st.session_state.analysis_task = None
+        st.session_state.analysis_celebrated = False
+        st.rerun()
+
+    st.markdown('### 📋 Resume Analysis Results:')
+    if task["status"] == "queued":
+        st.info(f"⏳ Waiting for an analysis worker ({task.get('position', 0)} ahead of you)...")
+    elif task["progress"].get("critique"):
+        st.markdown(task["progress"]["critique"] + " ▌")
+    else:
+        st.info("🤖 Analyzing your resume...")
+    if st.button("Cancel analysis"):
+        analysis_queue.cancel(task["id"])
+        st.session_state.analysis_task = None
+        st.rerun()
 
-        # Show career insights in tab3
-        with tab3:
-            st.success("✅ Resume analyzed! Here are your personalized career insights:")
 
-            # Get job recommendations
-            recommendations = job_searcher.get_job_recommendations(file_content, job_role)
+if st.session_state.analysis_task:
+    with tab1:
+        analysis_progress()
+elif st.session_state.analysis_error:
+    with tab1:
+        st.error(f"Error analyzing resume: {st.session_state.analysis_error}")
 
-            if recommendations:
-                st.markdown("### 🎯 Job Search Recommendations:")
-                for i, rec in enumerate(recommendations, 1):
-                    st.markdown(f"{i}. {rec}")
+if st.session_state.analysis:
+    analysis = st.session_state.analysis
+    recommendations = analysis["recommendations"]
+    skills = analysis["skills"]
 
-            # Extract skills for display
-            skills = job_searcher.extract_skills_from_resume(file_content)
-            if skills:
-                st.markdown("### 🔧 Key Skills Identified:")
-                # Display skills as tags
-                skills_html = " ".join([f'<span style="background-color: #e1f5fe; padding: 4px 8px; margin: 2px; border-radius: 12px; font-size: 12px;">{skill}</span>' for skill in skills])
-                st.markdown(skills_html, unsafe_allow_html=True)
+    with tab1:
+        st.markdown('### 📋 Resume Analysis Results:')
+        st.markdown(analysis["critique"])
+        if not st.session_state.get("analysis_celebrated", True):
+            st.session_state.analysis_celebrated = True
+            st.balloons()
+
+    # Show career insights in tab3
+    with tab3:
+        st.success("✅ Resume analyzed! Here are your personalized career insights:")
+
+        if recommendations:
+            st.markdown("### 🎯 Job Search Recommendations:")
+            for i, rec in enumerate(recommendations, 1):
+                st.markdown(f"{i}. {rec}")
+
+        if skills:
+            st.markdown("### 🔧 Key Skills Identified:")
+            # Display skills as tags
+            skills_html = " ".join([f'<span style="background-color: #e1f5fe; padding: 4px 8px; margin: 2px; border-radius: 12px; font-size: 12px;">{skill}</span>' for skill in skills])
+            st.markdown(skills_html, unsafe_allow_html=True)
+
+        cache_stats = job_searcher.llm_cache.stats()
+        st.caption(f"LLM cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+        compaction = compaction_stats()
+        if compaction:
+            st.caption("✂️ Prompt compaction (resume tokens sent): " + ", ".join(
+                f"{call_type} {entry['last_original_tokens']:,} → {entry['last_tokens']:,}"
+                for call_type, entry in compaction.items()
+            ) + f" · {sum(entry['saved'] for entry in compaction.values()):,} tokens saved since start")
 
 # Job Search Logic
 if search_jobs:
     with tab2:
+        job_type_param = None if job_type_filter == "Any" else job_type_filter
+        search_mode = "local-first" if local_first else "live"
+        jobs_df = None
+
+        # Jobs appear here as each provider page comes in; replaced by the full results below
+        live_results = st.empty()
+
+        def show_partial_results(partial_df):
+            with live_results.container():
+                st.caption(f"⏳ {len(partial_df)} jobs so far, still waiting on slower providers...")
+                st.dataframe(partial_df, use_container_width=True, hide_index=True,
+                             column_config={"Apply Link": st.column_config.LinkColumn("Apply Link")})
+
         if search_option == "🤖 Smart Search (Based on Resume)":
             if not st.session_state.resume_content:
                 st.error("Please upload and analyze your resume first in the Resume Analysis tab.")
             else:
                 st.info("Searching for jobs based on your resume...")
-                job_type_param = None if job_type_filter == "Any" else job_type_filter
                 jobs_df = job_searcher.search_jobs_by_resume(
                     st.session_state.resume_content,
                     location,
                     results_count,
-                    job_type_param
+                    job_type_param,
+                    skills=st.session_state.resume_skills,
+                    mode=search_mode,
+                    on_results=show_partial_results
                 )
 
-                if not jobs_df.empty:
-                    st.success(f"Found {len(jobs_df)} job opportunities!")
-
-                    # Display job results
-                    st.markdown("### 💼 Job Search Results:")
-
-                    # Add filters for the results
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if 'Company' in jobs_df.columns:
-                            companies = ['All'] + sorted(jobs_df['Company'].dropna().unique().tolist())
-                            selected_company = st.selectbox("Filter by Company", companies)
-
-                    with col2:
-                        if 'Source' in jobs_df.columns:
-                            sources = ['All'] + sorted(jobs_df['Source'].dropna().unique().tolist())
-                            selected_source = st.selectbox("Filter by Source", sources)
-
-                    # Apply filters
-                    filtered_df = jobs_df.copy()
-                    if selected_company != 'All' and 'Company' in jobs_df.columns:
-                        filtered_df = filtered_df[filtered_df['Company'] == selected_company]
-                    if selected_source != 'All' and 'Source' in jobs_df.columns:
-                        filtered_df = filtered_df[filtered_df['Source'] == selected_source]
-
-                    # Display filtered results
-                    st.dataframe(
-                        filtered_df,
-                        use_container_width=True,
-                        hide_index=True,
-                        column_config={
-                            "Apply Link": st.column_config.LinkColumn("Apply Link")
-                        }
-                    )
-
-                    # Download option
-                    csv = filtered_df.to_csv(index=False)
-                    st.download_button(
-                        label="📥 Download Results as CSV",
-                        data=csv,
-                        file_name="job_search_results.csv",
-                        mime="text/csv"
-                    )
-
         else:  # Manual search
             if not search_term:
                 st.error("Please enter a job title or keywords to search.")
             else:
                 st.info(f"Searching for '{search_term}' jobs...")
-                job_type_param = None if job_type_filter == "Any" else job_type_filter
                 jobs_df = job_searcher.search_jobs(
                     search_term,
                     location,
                     results_count,
-                    job_type_param
+                    job_type_param,
+                    mode=search_mode,
+                    on_results=show_partial_results
                 )
 
-                if not jobs_df.empty:
-                    st.success(f"Found {len(jobs_df)} job opportunities!")
-
-                    # Display job results (same as above)
-                    st.markdown("### 💼 Job Search Results:")
-
-                    # Add filters for the results
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if 'Company' in jobs_df.columns:
-                            companies = ['All'] + sorted(jobs_df['Company'].dropna().unique().tolist())
-                            selected_company = st.selectbox("Filter by Company", companies, key="manual_company")
-
-                    with col2:
-                        if 'Source' in jobs_df.columns:
-                            sources = ['All'] + sorted(jobs_df['Source'].dropna().unique().tolist())
-                            selected_source = st.selectbox("Filter by Source", sources, key="manual_source")
-
-                    # Apply filters
-                    filtered_df = jobs_df.copy()
-                    if selected_company != 'All' and 'Company' in jobs_df.columns:
-                        filtered_df = filtered_df[filtered_df['Company'] == selected_company]
-                    if selected_source != 'All' and 'Source' in jobs_df.columns:
-                        filtered_df = filtered_df[filtered_df['Source'] == selected_source]
-
-                    # Display filtered results
-                    st.dataframe(
-                        filtered_df,
-                        use_container_width=True,
-                        hide_index=True,
-                        column_config={
-                            "Apply Link": st.column_config.LinkColumn("Apply Link")
-                        }
-                    )
-
-                    # Download option
-                    csv = filtered_df.to_csv(index=False)
-                    st.download_button(
-                        label="📥 Download Results as CSV",
-                        data=csv,
-                        file_name="job_search_results.csv",
-                        mime="text/csv",
-                        key="manual_download"
-                    )
+        live_results.empty()
+        # Keep the results so filter changes (which rerun the script) don't search again
+        if jobs_df is not None:
+            st.session_state.job_results = JobResults(jobs_df) if not jobs_df.empty else None
+            # The previous selection may not exist in the new results
+            st.session_state.pop("results_company", None)
+            st.session_state.pop("results_source", None)
+
+# Job results, filtered locally on every rerun
+if st.session_state.job_results is not None:
+    with tab2:
+        job_results = st.session_state.job_results
+        st.success(f"Found {len(job_results)} job opportunities!")
+
+        # Display job results
+        st.markdown("### 💼 Job Search Results:")
+
+        # Add filters for the results
+        col1, col2 = st.columns(2)
+        with col1:
+            selected_company = st.selectbox("Filter by Company", job_results.options("Company"), key="results_company")
+
+        with col2:
+            selected_source = st.selectbox("Filter by Source", job_results.options("Source"), key="results_source")
+
+        # Apply filters
+        filtered_df = job_results.filter(Company=selected_company, Source=selected_source)
+
+        # Display filtered results
+        st.dataframe(
+            filtered_df,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Apply Link": st.column_config.LinkColumn("Apply Link")
+            }
+        )
+
+        # Download option
+        csv = filtered_df.to_csv(index=False)
+        st.download_button(
+            label="📥 Download Results as CSV",
+            data=csv,
+            file_name="job_search_results.csv",
+            mime="text/csv"
+        )
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,409 @@
+import asyncio
+import contextvars
+import itertools
+import logging
+import os
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import groq
+import pandas as pd
+
+from job_cache import JobResultCache
+from job_index import JobIndex
+from job_search import (RECOMMENDATIONS_PROMPT_VERSION, SKILLS_PROMPT_VERSION, JobSearcher, PageCursor,
+                        parse_recommendations, parse_skills, recommendation_messages, skills_messages)
+from llm_cache import LLMCache, cached_chat_async
+from prompt_compaction import prepare_resume
+from provider_transport import AsyncProviderTransport
+from ranking import rank_jobs
+from rate_limit import RateLimited
+from singleflight import SingleFlight
+from skills import MAX_SKILLS, extract_skills
+from telemetry import span
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[str, Dict], None]
+ErrorCallback = Callable[[str], None]
+
+# Callbacks for the call in progress, so concurrent callers of one searcher each get their own
+_callbacks: contextvars.ContextVar = contextvars.ContextVar("job_search_callbacks", default=(None, None))
+
+
+class AsyncJobSearcher(JobSearcher):
+    """JobSearcher for asyncio, so one event loop can serve many concurrent users.
+
+    `search_jobs`, `search_jobs_by_resume`, `extract_skills_from_resume` and
+    `get_job_recommendations` are coroutines. Provider pages go through httpx
+    and LLM calls through groq.AsyncGroq, so a search holds no thread while
+    it waits. Nothing is sent to Streamlit: progress goes to
+    `on_progress(event, details)` and errors to `on_error(message)`, set per
+    searcher or per call (errors are logged when neither is set).
+
+    Progress events: "skills_extracted" (skills, source), "search_started"
+    (search_term, providers), "provider_done" (provider, jobs) and
+    "search_done" (jobs). A search that joins an identical one already in
+    flight shares its run, and its callbacks only see "search_done".
+
+    The local job index (SQLite) and result cleaning run on worker threads,
+    so a slow write or a large batch doesn't hold up the other users on the
+    loop. The HTTP client is bound to the event loop it is first used on;
+    use one searcher per loop and close it with `aclose()` (or `async with`).
+    """
+
+    def __init__(self, groq_api_key: str, llm_cache: Optional[LLMCache] = None,
+                 transport: Optional[AsyncProviderTransport] = None, job_cache: Optional[JobResultCache] = None,
+                 flights: Optional[SingleFlight] = None, job_index: Optional[JobIndex] = None,
+                 on_progress: Optional[ProgressCallback] = None, on_error: Optional[ErrorCallback] = None):
+        transport = transport or AsyncProviderTransport(
+            pool_size=int(os.getenv("PROVIDER_POOL_SIZE", "10")),
+            max_retries=int(os.getenv("PROVIDER_MAX_RETRIES", "3")),
+        )
+        super().__init__(groq_api_key, llm_cache, transport, job_cache, flights, job_index)
+        self.on_progress = on_progress
+        self.on_error = on_error
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the pooled provider and Groq connections."""
+        await self.transport.aclose()
+        if self._groq_client is not None:
+            await self._groq_client.close()
+
+    def _make_groq_client(self):
+        return groq.AsyncGroq(api_key=self.groq_api_key)
+
+    async def extract_skills_from_resume(self, resume_text: str, on_progress: Optional[ProgressCallback] = None,
+                                         on_error: Optional[ErrorCallback] = None) -> List[str]:
+        """Extract relevant skills and keywords from resume text, locally first."""
+        with self._reporting(on_progress, on_error), span("extract_skills", mode=self.skill_mode) as stage:
+            skills = [] if self.skill_mode == "llm" else extract_skills(resume_text)
+            stage.set(local_skills=len(skills))
+            if self.skill_mode == "local" and len(skills) >= self.min_local_skills:
+                self._progress("skills_extracted", skills=skills, source="local")
+                return skills
+
+            # Enrichment or fallback: append the LLM's terms the taxonomy didn't already cover
+            seen = {skill.lower() for skill in skills}
+            for skill in await self._extract_skills_with_llm(resume_text):
+                if skill.lower() not in seen:
+                    seen.add(skill.lower())
+                    skills.append(skill)
+            stage.set(skills=len(skills[:MAX_SKILLS]))
+            self._progress("skills_extracted", skills=skills[:MAX_SKILLS],
+                           source="llm" if self.skill_mode == "llm" else "local+llm")
+            return skills[:MAX_SKILLS]
+
+    async def _extract_skills_with_llm(self, resume_text: str) -> List[str]:
+        """Extract relevant skills and keywords from resume text using AI."""
+        resume_text = prepare_resume(resume_text, "skills")
+        try:
+            skills_text = await cached_chat_async(
+                self.groq_client,
+                self.llm_cache,
+                SKILLS_PROMPT_VERSION,
+                resume_text,
+                model="llama-3.3-70b-versatile",
+                messages=skills_messages(resume_text),
+                temperature=0.3,
+                max_tokens=200
+            )
+            return parse_skills(skills_text)
+        except RateLimited:
+            raise
+        except Exception as e:
+            self._error(f"Error extracting skills: {str(e)}")
+            return []
+
+    async def search_jobs_by_resume(self, resume_text: str, location: str = "United States",
+                                    results_wanted: int = 20, job_type: Optional[str] = None,
+                                    skills: Optional[List[str]] = None, mode: Optional[str] = None,
+                                    on_progress: Optional[ProgressCallback] = None,
+                                    on_error: Optional[ErrorCallback] = None) -> pd.DataFrame:
+        """Search for jobs based on resume content (or skills already extracted from it)."""
+        with self._reporting(on_progress, on_error):
+            if not skills:
+                skills = await self.extract_skills_from_resume(resume_text)
+
+            if not skills:
+                self._error("Could not extract skills from resume. Please try manual search.")
+                return pd.DataFrame()
+
+            # Create search term from top skills
+            search_term = " OR ".join(skills[:5])
+
+            # Providers return jobs in their own order; put the best matches for this resume first
+            with span("resume_search", skills=len(skills)):
+                jobs_df = await self.search_jobs(search_term, location, results_wanted, job_type, mode)
+                with span("rank_jobs", jobs=len(jobs_df)):
+                    return rank_jobs(jobs_df, resume_text)
+
+    async def search_jobs(self, search_term: str, location: str = "United States",
+                          results_wanted: int = 20, job_type: Optional[str] = None,
+                          mode: Optional[str] = None, on_progress: Optional[ProgressCallback] = None,
+                          on_error: Optional[ErrorCallback] = None) -> pd.DataFrame:
+        """Search for jobs using real APIs (JSearch and Adzuna), or the local job index first."""
+        with self._reporting(on_progress, on_error):
+            try:
+                local_df = await asyncio.to_thread(self._search_local, search_term, location, results_wanted,
+                                                   job_type, mode)
+                if local_df is not None:
+                    self._progress("search_done", jobs=len(local_df))
+                    return local_df
+
+                with span("search_jobs", results_wanted=results_wanted) as stage:
+                    # Users searching for the same thing at the same time share one run
+                    jobs_df, shared = await self.flights.do_async(
+                        self._search_key(search_term, location, results_wanted, job_type),
+                        lambda: self._run_search(search_term, location, results_wanted, job_type),
+                        kind="search"
+                    )
+                    stage.set(jobs=len(jobs_df), coalesced=shared)
+                    self._progress("search_done", jobs=len(jobs_df))
+                    # Callers may modify their results, so waiters get their own copy
+                    return jobs_df.copy() if shared else jobs_df
+
+            except RateLimited:
+                # Not a failed search: the caller should retry later (the API answers 429)
+                raise
+            except Exception as e:
+                self._error(f"Error searching for jobs: {str(e)}")
+                return pd.DataFrame()
+
+    async def _run_search(self, search_term: str, location: str, results_wanted: int,
+                          job_type: Optional[str]) -> pd.DataFrame:
+        """Query all configured providers concurrently and return the cleaned, trimmed results."""
+        all_jobs = await self._query_providers(search_term, location, results_wanted, job_type)
+        fetched = bool(all_jobs)
+
+        # Sample data is only a demo for setups without API keys, never a stand-in for real results
+        if not all_jobs and not self.rapidapi_key and not (self.adzuna_app_id and self.adzuna_app_key):
+            self._error("⚠️ No API keys configured. Showing sample data.")
+            all_jobs.extend(self._generate_sample_jobs(search_term, location, results_wanted, job_type))
+
+        if not all_jobs:
+            self._error("No jobs found for the given criteria.")
+            return pd.DataFrame()
+
+        jobs_df = await asyncio.to_thread(self._clean_job_data, pd.DataFrame(all_jobs))
+        if fetched:
+            await asyncio.to_thread(self._index_jobs, jobs_df, search_term, location)
+
+        # Trim after de-duplication so duplicates don't eat into the budget
+        return jobs_df.head(results_wanted)
+
+    async def _query_providers(self, search_term: str, location: str, results_wanted: int,
+                               job_type: Optional[str]) -> List[Dict]:
+        """Fan a search out to every configured provider and merge the results within the budget.
+
+        As in JobSearcher._stream_providers, the budget is split between the
+        providers and a shortfall is topped up by those with pages left.
+        """
+        providers = []
+        if self.rapidapi_key:
+            providers.append(("JSearch API", self._search_jsearch_api))
+        if self.adzuna_app_id and self.adzuna_app_key:
+            providers.append(("Adzuna API", self._search_adzuna_api))
+        if not providers:
+            return []
+        self._progress("search_started", search_term=search_term, providers=[name for name, _ in providers])
+
+        cursors = {name: PageCursor() for name, _ in providers}
+        found: Dict[str, List[Dict]] = {name: [] for name, _ in providers}
+
+        async def run_provider(name: str, search: Callable[..., Awaitable[List[Dict]]], wanted: int) -> List[Dict]:
+            with span("provider_search", labels={"provider": name}) as stage:
+                jobs = await search(search_term, location, wanted, job_type, cursors[name])
+                stage.set(jobs=len(jobs))
+                self._progress("provider_done", provider=name, jobs=len(found[name]) + len(jobs))
+                return jobs
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.search_timeout
+        rate_limited = None
+        round_providers, wanted = providers, results_wanted
+        while round_providers and wanted > 0:
+            share = -(-wanted // len(round_providers))
+            tasks = [(name, asyncio.ensure_future(run_provider(name, search, share)))
+                     for name, search in round_providers]
+            done, pending = await asyncio.wait([task for _, task in tasks], timeout=max(0.0, deadline - loop.time()))
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+            for name, task in tasks:
+                if task not in done:
+                    self._error(f"{name} did not respond within {self.search_timeout:g}s. Showing partial results.")
+                elif task.exception() is not None:
+                    cursors[name].exhausted = True
+                    if isinstance(task.exception(), RateLimited):
+                        rate_limited = task.exception()
+                    self._error(f"{name} error: {str(task.exception())}")
+                else:
+                    found[name].extend(task.result())
+            if pending:
+                break
+            # Top up a shortfall from the providers that still have pages
+            wanted = results_wanted - sum(len(jobs) for jobs in found.values())
+            round_providers = [(name, search) for name, search in providers if not cursors[name].exhausted]
+
+        # With nothing from any provider, being over budget is the answer rather than "no jobs"
+        if rate_limited is not None and not any(found.values()):
+            raise rate_limited
+
+        # Interleave providers so both are represented when the budget is trimmed
+        all_jobs = []
+        for group in itertools.zip_longest(*found.values()):
+            all_jobs.extend(job for job in group if job is not None)
+        return all_jobs
+
+    async def _collect_pages(self, fetch_page: Callable[[int], Awaitable[Optional[List[Dict]]]],
+                             results_wanted: int, per_page: int, cursor: Optional[PageCursor] = None) -> List[Dict]:
+        """Async _iter_pages: fetch waves of pages concurrently until results_wanted more unique jobs are in."""
+        cursor = cursor or PageCursor()
+        jobs, cursor.spare = cursor.spare[:results_wanted], cursor.spare[results_wanted:]
+        while len(jobs) < results_wanted and not cursor.exhausted:
+            if cursor.next_page > self.max_pages:
+                cursor.exhausted = True
+                break
+            wave = min(self.max_pages - cursor.next_page + 1, -(-(results_wanted - len(jobs)) // per_page))
+            first_page = cursor.next_page
+            pages = await asyncio.gather(*(fetch_page(page) for page in range(first_page, first_page + wave)))
+
+            for page, page_jobs in enumerate(pages, first_page):
+                cursor.next_page = page + 1
+                if page_jobs is None:
+                    cursor.exhausted = True
+                    return jobs
+                new_jobs = []
+                for job in page_jobs:
+                    key = (job.get("Job Title"), job.get("Company"))
+                    if key not in cursor.seen:
+                        cursor.seen.add(key)
+                        new_jobs.append(job)
+                taken = new_jobs[:results_wanted - len(jobs)]
+                cursor.spare.extend(new_jobs[len(taken):])
+                jobs.extend(taken)
+                # A short page is the last one; stop as soon as we have enough
+                if len(page_jobs) < per_page:
+                    cursor.exhausted = True
+                    return jobs
+                if len(jobs) >= results_wanted:
+                    return jobs
+        return jobs
+
+    async def _search_jsearch_api(self, search_term: str, location: str, results_wanted: int,
+                                  job_type: Optional[str], cursor: Optional[PageCursor] = None) -> List[Dict]:
+        """Search jobs using JSearch API via RapidAPI, reading as many pages as needed."""
+        return await self._collect_pages(
+            lambda page: self.job_cache.get_or_fetch_async(
+                self.job_cache.make_key(search_term, location, job_type, "JSearch API", page),
+                lambda: self._fetch_jsearch_page(search_term, location, job_type, page)
+            ),
+            results_wanted,
+            per_page=10,
+            cursor=cursor
+        )
+
+    async def _fetch_jsearch_page(self, search_term: str, location: str, job_type: Optional[str],
+                                  page: int) -> Optional[List[Dict]]:
+        """Fetch one page (10 jobs) from the JSearch API."""
+        try:
+            url, headers, querystring = self._jsearch_request(search_term, location, job_type, page)
+            response = await self.transport.get("JSearch API", url, headers=headers, params=querystring)
+            if response.status_code == 200:
+                return self._parse_jsearch_page(response.json())
+            self._error(f"JSearch API returned status code: {response.status_code}")
+            return None
+        except RateLimited:
+            raise
+        except Exception as e:
+            self._error(f"JSearch API error: {str(e)}")
+            return None
+
+    async def _search_adzuna_api(self, search_term: str, location: str, results_wanted: int,
+                                 job_type: Optional[str], cursor: Optional[PageCursor] = None) -> List[Dict]:
+        """Search jobs using Adzuna API, reading as many pages as needed."""
+        # Fixed page size, so a cached page means the same thing whatever the budget
+        per_page = 20
+        return await self._collect_pages(
+            lambda page: self.job_cache.get_or_fetch_async(
+                self.job_cache.make_key(search_term, location, job_type, "Adzuna API", page),
+                lambda: self._fetch_adzuna_page(search_term, location, job_type, page, per_page)
+            ),
+            results_wanted,
+            per_page=per_page,
+            cursor=cursor
+        )
+
+    async def _fetch_adzuna_page(self, search_term: str, location: str, job_type: Optional[str], page: int,
+                                 per_page: int) -> Optional[List[Dict]]:
+        """Fetch one page of results from the Adzuna API."""
+        try:
+            url, params = self._adzuna_request(search_term, location, job_type, page, per_page)
+            response = await self.transport.get("Adzuna API", url, params=params)
+            if response.status_code == 200:
+                return self._parse_adzuna_page(response.json())
+            self._error(f"Adzuna API returned status code: {response.status_code}")
+            return None
+        except RateLimited:
+            raise
+        except Exception as e:
+            self._error(f"Adzuna API error: {str(e)}")
+            return None
+
+    async def get_job_recommendations(self, resume_text: str, target_role: Optional[str] = None,
+                                      on_progress: Optional[ProgressCallback] = None,
+                                      on_error: Optional[ErrorCallback] = None) -> List[str]:
+        """Get job search recommendations based on resume analysis."""
+        with self._reporting(on_progress, on_error):
+            resume_text = prepare_resume(resume_text, "recommendations")
+            try:
+                recommendations_text = await cached_chat_async(
+                    self.groq_client,
+                    self.llm_cache,
+                    RECOMMENDATIONS_PROMPT_VERSION,
+                    resume_text,
+                    model="llama-3.3-70b-versatile",
+                    messages=recommendation_messages(resume_text, target_role),
+                    temperature=0.7,
+                    max_tokens=400,
+                    target_role=target_role
+                )
+                return parse_recommendations(recommendations_text)
+            except RateLimited:
+                raise
+            except Exception as e:
+                self._error(f"Error generating recommendations: {str(e)}")
+                return []
+
+    @contextmanager
+    def _reporting(self, on_progress: Optional[ProgressCallback], on_error: Optional[ErrorCallback]):
+        """Route progress and errors for the enclosed call (and the tasks it starts) to these callbacks."""
+        if on_progress is None and on_error is None:
+            yield
+            return
+        outer_progress, outer_error = _callbacks.get()
+        token = _callbacks.set((on_progress or outer_progress, on_error or outer_error))
+        try:
+            yield
+        finally:
+            _callbacks.reset(token)
+
+    def _progress(self, event: str, **details):
+        callback = _callbacks.get()[0] or self.on_progress
+        if callback is not None:
+            callback(event, details)
+
+    def _error(self, message: str):
+        callback = _callbacks.get()[1] or self.on_error
+        if callback is not None:
+            callback(message)
+        else:
+            logger.warning(message)
@@ -0,0 +1,305 @@
+"""Headless batch resume analysis.
+
+Usage:
+    python batch_analyze.py resumes/ -o results.jsonl [--role "Data Engineer"]
+    python batch_analyze.py resumes.zip -o results.jsonl --concurrency 8 --tpm 12000 --parquet results.parquet
+
+Reads every PDF/TXT file in a directory (recursively) or a .zip/.tar(.gz)
+archive, extracts PDF text in a process pool and runs the critique, skills
+and recommendations through Groq with bounded concurrency and a
+tokens-per-minute budget. Each result is appended to the JSONL file as soon
+as it is ready; started again with the same output file, a run skips the
+resumes that already succeeded, so a crashed batch picks up where it stopped.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import groq
+from dotenv import load_dotenv
+
+from job_search import RECOMMENDATIONS_PROMPT_VERSION, parse_recommendations, recommendation_messages
+from llm_cache import LLMCache, cached_chat_async, get_default_cache
+from prompt_compaction import prepare_resume
+from rate_limit import RateGovernor, get_default_governor
+from resume_analysis import (CRITIQUE_PROMPT_VERSION, MODEL, STRUCTURED_PROMPT_VERSION, critique_messages,
+                             parse_structured_analysis, structured_messages)
+from skills import extract_skills
+from telemetry import span
+from text_extraction import MAX_BYTES, WORKERS, ExtractionError, extract_pdf_text, extract_plain_text
+
+CONTENT_TYPES = {".pdf": "application/pdf", ".txt": "text/plain"}
+
+# A document to analyze: (name, MIME type, function returning its bytes)
+Document = Tuple[str, str, Callable[[], bytes]]
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _read_zip_member(archive: str, member: str) -> bytes:
+    with zipfile.ZipFile(archive) as z:
+        return z.read(member)
+
+
+def discover(source: str) -> List[Document]:
+    """List the PDF/TXT documents in a directory or archive, in a stable order."""
+    documents = []
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for filename in sorted(files):
+                content_type = CONTENT_TYPES.get(os.path.splitext(filename)[1].lower())
+                if content_type:
+                    path = os.path.join(root, filename)
+                    documents.append((os.path.relpath(path, source), content_type,
+                                      functools.partial(_read_file, path)))
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as z:
+            for member in sorted(z.namelist()):
+                content_type = CONTENT_TYPES.get(os.path.splitext(member)[1].lower())
+                if content_type and not member.endswith("/"):
+                    documents.append((member, content_type, functools.partial(_read_zip_member, source, member)))
+    elif tarfile.is_tarfile(source):
+        # Compressed tars can't be read out of order cheaply, so load the members in one pass
+        with tarfile.open(source) as tar:
+            for member in tar:
+                content_type = CONTENT_TYPES.get(os.path.splitext(member.name)[1].lower())
+                if content_type and member.isfile():
+                    data = tar.extractfile(member).read()
+                    documents.append((member.name, content_type, functools.partial(bytes, data)))
+        documents.sort(key=lambda document: document[0])
+    else:
+        raise ValueError(f"{source} is not a directory, .zip or .tar archive")
+    return documents
+
+
+def extract_document(content_type: str, data: bytes) -> Tuple[Optional[str], Optional[str]]:
+    """Return (text, error) for one document; runs in a worker process for PDFs."""
+    try:
+        if len(data) > MAX_BYTES:
+            raise ExtractionError(f"File is {len(data) / 1024 / 1024:.1f} MB; the limit is {MAX_BYTES / 1024 / 1024:.0f} MB")
+        if content_type == "application/pdf":
+            # Already in a worker process: read pages serially instead of fanning out again
+            text = extract_pdf_text(data, parallel_min_pages=sys.maxsize)
+        else:
+            text = extract_plain_text(data)
+    except ExtractionError as e:
+        return None, str(e)
+    if not text.strip():
+        return None, "No text could be extracted"
+    return text, None
+
+
+def repair_results(path: str):
+    """Drop a half-written last line left behind by a crash, so appends start on a fresh line."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def load_finished(path: str) -> Set[str]:
+    """Names of the documents that already have a successful result in the output file."""
+    finished = set()
+    if not os.path.exists(path):
+        return finished
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") == "ok":
+                finished.add(record["file"])
+    return finished
+
+
+async def analyze_text(client, cache: LLMCache, resume_text: str, job_role: Optional[str] = None) -> Dict:
+    """Critique, skills and recommendations for one resume, one structured call first."""
+    structured_text = prepare_resume(resume_text, "structured")
+    content = await cached_chat_async(
+        client,
+        cache,
+        STRUCTURED_PROMPT_VERSION,
+        structured_text,
+        model=MODEL,
+        messages=structured_messages(structured_text, job_role),
+        temperature=0.7,
+        response_format={"type": "json_object"},
+        validate=lambda text: parse_structured_analysis(text) is not None,
+        job_role=job_role,
+    )
+    result = parse_structured_analysis(content)
+    if result:
+        return {**result, "mode": "structured"}
+
+    # Same fallback as the app: separate critique and recommendation calls, skills extracted locally
+    critique_text = prepare_resume(resume_text, "critique")
+    recommendations_text = prepare_resume(resume_text, "recommendations")
+    critique, recommendations = await asyncio.gather(
+        cached_chat_async(client, cache, CRITIQUE_PROMPT_VERSION, critique_text, model=MODEL,
+                          messages=critique_messages(critique_text, job_role), temperature=0.7,
+                          job_role=job_role),
+        cached_chat_async(client, cache, RECOMMENDATIONS_PROMPT_VERSION, recommendations_text, model=MODEL,
+                          messages=recommendation_messages(recommendations_text, job_role), temperature=0.7,
+                          max_tokens=400, target_role=job_role),
+    )
+    return {
+        "critique": critique,
+        "skills": extract_skills(resume_text),
+        "recommendations": parse_recommendations(recommendations),
+        "mode": "separate",
+    }
+
+
+@contextmanager
+def batch_limits(governor: RateGovernor, tokens_per_minute: Optional[int] = None):
+    """Batch settings on a governor for the length of a batch, then the previous ones back.
+
+    The governor is the process-wide one, shared with everything else in
+    the process (such as the API calling analyze_text), so the change must
+    not outlive the batch.
+    """
+    saved_tokens_per_minute = governor.limits.get("groq", {}).get("tokens", 0)
+    saved_max_wait = governor.max_wait
+    if tokens_per_minute is not None:
+        governor.set_limit("groq", "tokens", tokens_per_minute)
+    # A batch has nobody waiting on a single resume: queue for the budget rather than give up
+    governor.max_wait = float("inf")
+    try:
+        yield
+    finally:
+        governor.max_wait = saved_max_wait
+        if tokens_per_minute is not None:
+            governor.set_limit("groq", "tokens", saved_tokens_per_minute)
+
+
+async def run_batch(documents: List[Document], output: str, client, cache: Optional[LLMCache] = None,
+                    job_role: Optional[str] = None, concurrency: int = 8, tokens_per_minute: Optional[int] = None,
+                    workers: int = WORKERS, quiet: bool = False) -> Dict:
+    """Analyze the documents not yet finished in `output`, appending one JSON line per resume.
+
+    Groq calls draw on the host-wide rate budget (rate_limit.py), shared with
+    any app processes; `tokens_per_minute` overrides its TPM limit (0 = none).
+    """
+    cache = cache or get_default_cache()
+    repair_results(output)
+    finished = load_finished(output)
+    pending = [document for document in documents if document[0] not in finished]
+    governor = get_default_governor()
+    with batch_limits(governor, tokens_per_minute):
+        waited_before = governor.stats()["waited"]
+        stats = {"documents": len(documents), "skipped": len(documents) - len(pending), "ok": 0, "failed": 0}
+
+        loop = asyncio.get_running_loop()
+        # Bound how many raw files are read and extracted at once. Extracted text is smaller, but every
+        # document waiting for an LLM slot still holds its text
+        extract_slots = asyncio.Semaphore(max(1, workers) * 2)
+        llm_slots = asyncio.Semaphore(concurrency)
+        start = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context("spawn")) as pool, \
+                open(output, "a", encoding="utf-8") as out:
+
+            async def process(name: str, content_type: str, read: Callable[[], bytes]):
+                began = time.perf_counter()
+                record = {"file": name}
+                # Any failure (a corrupt archive member, a worker process killed by a bad PDF, the LLM call)
+                # becomes this file's error line rather than aborting the rest of the batch
+                try:
+                    async with extract_slots:
+                        data = read()
+                        if content_type == "application/pdf":
+                            text, error = await loop.run_in_executor(pool, extract_document, content_type, data)
+                        else:
+                            text, error = extract_document(content_type, data)
+                        del data  # Only the text is needed from here on
+
+                    if text is not None:
+                        async with llm_slots:
+                            with span("analyze_resume", mode="batch", file=name):
+                                record.update(await analyze_text(client, cache, text, job_role))
+                except Exception as e:
+                    error = f"{type(e).__name__}: {str(e)}"
+                record["status"] = "error" if error else "ok"
+                if error:
+                    record["error"] = error
+                record["seconds"] = round(time.perf_counter() - began, 3)
+
+                # One complete line per result, flushed at once, so a crash loses at most the resumes in flight
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                stats["failed" if error else "ok"] += 1
+                if not quiet:
+                    done = stats["ok"] + stats["failed"]
+                    print(f"[{done}/{len(pending)}] {'✅' if not error else '❌'} {name}"
+                          f"{'' if not error else ' - ' + error}")
+
+            await asyncio.gather(*(process(*document) for document in pending))
+
+        elapsed = time.perf_counter() - start
+        stats["seconds"] = round(elapsed, 3)
+        stats["resumes_per_minute"] = round(stats["ok"] / elapsed * 60, 1) if elapsed > 0 else 0.0
+        stats["rate_limited_seconds"] = round(governor.stats()["waited"] - waited_before, 3)
+        return stats
+
+
+def write_parquet(jsonl_path: str, parquet_path: str):
+    """Convert the results file to Parquet, keeping the latest result per document."""
+    import pandas as pd
+    results = pd.read_json(jsonl_path, lines=True)
+    results = results.drop_duplicates(subset="file", keep="last")
+    try:
+        results.to_parquet(parquet_path, index=False)
+    except ImportError:
+        print("Parquet output needs pyarrow: pip install pyarrow")
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Critique a directory or archive of resumes with Groq.")
+    parser.add_argument("source", help="directory, .zip or .tar(.gz) of PDF/TXT resumes")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="JSONL results file (appended to)")
+    parser.add_argument("--role", help="job role to tailor the critique to")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("BATCH_CONCURRENCY", "8")),
+                        help="LLM requests in flight at once")
+    parser.add_argument("--tpm", type=int,
+                        help="tokens-per-minute budget (default: GROQ_TOKENS_PER_MINUTE or 12000; 0 = unlimited)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="PDF extraction processes")
+    parser.add_argument("--parquet", help="also write the results as Parquet to this path")
+    parser.add_argument("--base-url", default=os.getenv("GROQ_BASE_URL"), help="alternative Groq endpoint")
+    args = parser.parse_args()
+
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        parser.error("GROQ_API_KEY not found. Please check your .env file.")
+
+    documents = discover(args.source)
+    client = groq.AsyncGroq(api_key=api_key, base_url=args.base_url)
+    stats = asyncio.run(run_batch(documents, args.output, client, job_role=args.role,
+                                  concurrency=args.concurrency, tokens_per_minute=args.tpm, workers=args.workers))
+    if args.parquet:
+        write_parquet(args.output, args.parquet)
+
+    print(f"\n📊 {stats['ok']} analyzed, {stats['failed']} failed, {stats['skipped']} already done "
+          f"in {stats['seconds']:.1f}s - {stats['resumes_per_minute']:.1f} resumes/minute"
+          + (f", {stats['rate_limited_seconds']:.1f}s queued for the Groq rate budget" if stats['rate_limited_seconds'] else ""))
+
+
+if __name__ == "__main__":
+    main()
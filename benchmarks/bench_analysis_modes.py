@@ -0,0 +1,92 @@
+"""Tokens sent and latency: three separate LLM calls vs. one structured call.
+
+Usage:
+    python benchmarks/bench_analysis_modes.py [--runs 10] [--latency 0.3]
+
+Runs against a local fake Groq endpoint whose response time grows with the
+prompt and completion size. "separate" is the critique + recommendations +
+skills path; "single" is resume_analysis.analyze_resume_structured.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from stub_servers import GroqStub, StubServer, percentile
+
+import groq  # noqa: E402
+
+from job_search import JobSearcher  # noqa: E402
+from llm_cache import LLMCache  # noqa: E402
+from resume_analysis import analyze_resume_structured, critique_resume  # noqa: E402
+
+RESUME = """Jane Doe - Senior Software Engineer
+jane@example.com | Austin, TX
+
+SUMMARY
+Backend engineer with 8 years building data-intensive services in Python and Go.
+
+EXPERIENCE
+Acme Corp - Senior Software Engineer (2019 - present)
+- Led migration of a monolith to 14 Kubernetes services, cutting deploy time by 70%
+- Built a streaming pipeline on Kafka and Spark processing 2B events per day
+- Mentored 6 engineers and ran the backend interview loop
+
+Globex - Software Engineer (2016 - 2019)
+- Designed REST and GraphQL APIs serving 30M requests per day
+- Reduced AWS spend by 35% through right-sizing and reserved capacity
+
+SKILLS
+Python, Go, SQL, PostgreSQL, Redis, Kafka, Spark, AWS, Docker, Kubernetes, Terraform
+
+EDUCATION
+B.S. Computer Science, University of Texas at Austin
+"""
+
+
+def run_separate(client, searcher, resume):
+    critique_resume(client, searcher.llm_cache, resume, "Staff Engineer")
+    searcher.get_job_recommendations(resume, "Staff Engineer")
+    searcher.extract_skills_from_resume(resume)
+
+
+def run_single(client, searcher, resume):
+    assert analyze_resume_structured(client, searcher.llm_cache, resume, "Staff Engineer")
+
+
+def measure(label, fn, stub, client, searcher, runs):
+    samples = []
+    tokens_before, hits_before = stub.prompt_tokens, stub.hits
+    for i in range(runs):
+        # A distinct resume per run so every call misses the cache
+        resume = f"{RESUME}\nReference #{label}-{i}"
+        start = time.perf_counter()
+        fn(client, searcher, resume)
+        samples.append(time.perf_counter() - start)
+    calls = (stub.hits - hits_before) / runs
+    tokens = (stub.prompt_tokens - tokens_before) / runs
+    print(f"{label:<10} calls/analysis {calls:4.1f}   prompt tokens/analysis {tokens:7.0f}   "
+          f"p50 {percentile(samples, 50) * 1000:7.1f} ms   p99 {percentile(samples, 99) * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.3, help="fixed per-call latency in seconds")
+    parser.add_argument("--per-input-token", type=float, default=0.0002)
+    parser.add_argument("--per-output-token", type=float, default=0.002)
+    args = parser.parse_args()
+
+    with StubServer(GroqStub, args.latency, per_input_token=args.per_input_token,
+                    per_output_token=args.per_output_token) as stub, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        client = groq.Client(api_key="benchmark", base_url=stub.url)
+        searcher = JobSearcher("benchmark", llm_cache=LLMCache(os.path.join(cache_dir, "cache.sqlite3")))
+        searcher.skill_mode = "llm"  # measure the LLM skills call, not the local extractor
+        searcher.groq_client = client
+        measure("separate", run_separate, stub, client, searcher, args.runs)
+        measure("single", run_single, stub, client, searcher, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""UI responsiveness while analyses are in flight on the background queue.
+
+Usage:
+    python benchmarks/bench_analysis_queue.py [--analyses 20] [--workers 4] [--latency 2.0] [--max-rerun-ms 1000]
+
+Renders app.py with Streamlit's AppTest against a Groq stub, then queues
+--analyses slow analyses (as other sessions would) into the app's queue
+file and keeps re-running the page while the app's --workers work through
+them. Page reruns are timed without load and under load. For comparison,
+one analysis run inline, the way the page used to, holds a session for
+the time shown as "inline analysis". A queued task is also cancelled to
+check it never runs.
+
+Exits non-zero if the rerun p99 under load is over --max-rerun-ms or an
+analysis does not finish, so it can gate CI.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from stub_servers import GroqStub, StubServer, percentile
+
+from bench_analysis_modes import RESUME  # noqa: E402
+
+
+def rerun_latencies(app, runs: int):
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        app.run()
+        latencies.append(time.perf_counter() - start)
+        if app.exception:
+            raise SystemExit(f"app.py raised: {app.exception[0].value}")
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--analyses", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=2.0, help="Groq stub latency per call, seconds")
+    parser.add_argument("--runs", type=int, default=20, help="Page reruns per measurement")
+    parser.add_argument("--max-rerun-ms", type=float, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory, StubServer(GroqStub, args.latency) as groq_stub:
+        os.environ.update(
+            GROQ_API_KEY="benchmark", GROQ_BASE_URL=groq_stub.url, ANALYSIS_WORKERS=str(args.workers),
+            ANALYSIS_QUEUE_PATH=os.path.join(directory, "queue.sqlite3"),
+            LLM_CACHE_PATH=os.path.join(directory, "llm.sqlite3"),
+        )
+        from streamlit.testing.v1 import AppTest
+        from analysis_queue import AnalysisQueue, run_analysis
+        from job_search import JobSearcher
+        from llm_cache import LLMCache
+
+        app = AppTest.from_file(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py"),
+                                default_timeout=60)
+        app.run()
+        idle = rerun_latencies(app, args.runs)
+
+        # The old page: one session thread busy for the whole analysis
+        searcher = JobSearcher("benchmark", llm_cache=LLMCache(":memory:"))
+        start = time.perf_counter()
+        run_analysis(searcher, {"resume_text": f"{RESUME}\nReference #inline"}, lambda **progress: None)
+        inline = time.perf_counter() - start
+
+        # Other sessions' analyses, submitted through the shared queue file; this instance runs none itself
+        sessions = AnalysisQueue(lambda payload, report: {}, workers=0)
+        start = time.perf_counter()
+        tasks = [sessions.submit({"resume_text": f"{RESUME}\nReference #{i}"}, party=f"session-{i}")
+                 for i in range(args.analyses)]
+        cancelled = sessions.submit({"resume_text": f"{RESUME}\nReference #cancelled"}, priority=-1)
+        sessions.cancel(cancelled)
+
+        time.sleep(args.latency / 2)
+        in_flight = sessions.stats()
+        loaded = rerun_latencies(app, args.runs)
+        results = [sessions.wait(task, timeout=args.analyses * args.latency * 4) for task in tasks]
+        elapsed = time.perf_counter() - start
+
+    done = sum(task is not None and task["status"] == "done" for task in results)
+    print(f"{args.analyses} analyses, {args.workers} workers, Groq stub latency {args.latency:g} s\n")
+    print(f"inline analysis (old page)     {inline * 1000:8.0f} ms of a session thread per analysis")
+    print(f"page rerun, no analyses        p50 {percentile(idle, 50) * 1000:7.1f} ms   p99 {percentile(idle, 99) * 1000:7.1f} ms")
+    print(f"page rerun, {in_flight['running']} running / {in_flight['queued']:>2} queued  "
+          f"p50 {percentile(loaded, 50) * 1000:7.1f} ms   p99 {percentile(loaded, 99) * 1000:7.1f} ms")
+    print(f"\nall analyses done: {done}/{args.analyses} in {elapsed:.1f} s "
+          f"({done / elapsed * 60:.0f}/minute), cancelled task: {sessions.status(cancelled)['status']}")
+
+    if percentile(loaded, 99) * 1000 > args.max_rerun_ms:
+        raise SystemExit(f"page rerun p99 under load is over {args.max_rerun_ms:g} ms")
+    if done != args.analyses or sessions.status(cancelled)["status"] != "cancelled":
+        raise SystemExit("not every analysis finished as expected")
+
+
+if __name__ == "__main__":
+    main()
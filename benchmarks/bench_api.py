@@ -0,0 +1,158 @@
+"""Load test for the HTTP API: requests/second and tail latency per endpoint.
+
+Usage:
+    python benchmarks/bench_api.py [--workers 4] [--concurrency 50] [--duration 10] [--latency 0.3]
+
+Starts the JSearch, Adzuna and Groq stubs, then `python api.py` with
+--workers worker processes pointed at them (rate limits off, fresh cache
+files), and drives every endpoint with --concurrency clients for
+--duration seconds each. Every request carries a different resume or
+search term, so the caches miss and each one costs real upstream calls
+(--cache-hits sends the same one every time instead). Streaming /analyze
+also reports time to the first critique event.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import count
+
+import httpx
+
+from stub_servers import ROOT, AdzunaStub, GroqStub, JSearchStub, StubServer, percentile
+
+from bench_analysis_modes import RESUME  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_api(port: int, workers: int, jsearch: str, adzuna: str, groq: str, directory: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        GROQ_API_KEY="benchmark", GROQ_BASE_URL=groq,
+        RAPIDAPI_KEY="benchmark", ADZUNA_APP_ID="benchmark", ADZUNA_APP_KEY="benchmark",
+        JSEARCH_URL=f"{jsearch}/search", ADZUNA_URL=adzuna, RATE_LIMITS="off",
+        LLM_CACHE_PATH=os.path.join(directory, "llm.sqlite3"), JOB_CACHE_PATH=os.path.join(directory, "jobs.sqlite3"),
+        JOB_INDEX_PATH=os.path.join(directory, "index.sqlite3"),
+    )
+    env.pop("TELEMETRY_PORT", None)
+    process = subprocess.Popen([sys.executable, "api.py", "--port", str(port), "--workers", str(workers)],
+                               cwd=ROOT, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/healthz", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit("API did not start within 30 s")
+
+
+def scenarios(cache_hits: bool):
+    unique = count()
+
+    def resume():
+        return RESUME if cache_hits else f"{RESUME}\nReference #{next(unique)}"
+
+    def term():
+        return "Software Engineer" if cache_hits else f"Software Engineer {next(unique)}"
+
+    return [
+        ("/skills", lambda: {"resume_text": resume()}, False),
+        ("/recommendations", lambda: {"resume_text": resume(), "target_role": "Data Engineer"}, False),
+        ("/analyze", lambda: {"resume_text": resume()}, False),
+        ("/analyze (stream)", lambda: {"resume_text": resume(), "stream": True}, True),
+        ("/jobs/search", lambda: {"search_term": term(), "results_wanted": 20}, False),
+        ("/jobs/search (stream)", lambda: {"search_term": term(), "results_wanted": 20, "stream": True}, True),
+    ]
+
+
+async def load(base_url: str, path: str, payload, stream: bool, concurrency: int, duration: float):
+    latencies, first_events, failures = [], [], 0
+    stop = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def user():
+            nonlocal failures
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                try:
+                    if stream:
+                        async with client.stream("POST", path, json=payload()) as response:
+                            ok, first = response.status_code == 200, None
+                            async for line in response.aiter_lines():
+                                if line.startswith("event:"):
+                                    first = first or time.perf_counter() - start
+                                    ok = ok and line != "event: error"
+                        if first is not None:
+                            first_events.append(first)
+                    else:
+                        response = await client.post(path, json=payload())
+                        ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                failures += not ok
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, first_events, failures, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub response time in seconds")
+    parser.add_argument("--cache-hits", action="store_true", help="Repeat one resume and search term")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per endpoint")
+    args = parser.parse_args()
+
+    port = free_port()
+    with tempfile.TemporaryDirectory() as directory, \
+            StubServer(JSearchStub, args.latency) as jsearch, StubServer(AdzunaStub, args.latency) as adzuna, \
+            StubServer(GroqStub, args.latency) as groq_stub:
+        api = start_api(port, args.workers, jsearch.url, adzuna.url, groq_stub.url, directory)
+        try:
+            if not args.json:
+                print(f"{args.workers} workers, {args.concurrency} concurrent clients, {args.duration:g} s per endpoint, "
+                      f"stub latency {args.latency:g} s{', cache hits' if args.cache_hits else ''}\n")
+            for path, payload, stream in scenarios(args.cache_hits):
+                latencies, first_events, failures, elapsed = asyncio.run(
+                    load(f"http://127.0.0.1:{port}", path.split()[0], payload, stream, args.concurrency, args.duration))
+                row = {
+                    "endpoint": path, "requests": len(latencies), "rps": round(len(latencies) / elapsed, 1),
+                    "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+                    "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+                    "p999_ms": round(percentile(latencies, 99.9) * 1000, 1), "errors": failures,
+                }
+                if first_events:
+                    row["first_event_p50_ms"] = round(percentile(first_events, 50) * 1000, 1)
+                if args.json:
+                    print(json.dumps(row))
+                else:
+                    first = (f"   first event p50 {row['first_event_p50_ms']:7.1f} ms"
+                             if "first_event_p50_ms" in row else "")
+                    print(f"{path:<22} {row['rps']:7.1f} req/s   p50 {row['p50_ms']:7.1f} ms   "
+                          f"p99 {row['p99_ms']:7.1f} ms   p99.9 {row['p999_ms']:7.1f} ms   "
+                          f"errors {failures}{first}")
+        finally:
+            api.terminate()
+            api.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
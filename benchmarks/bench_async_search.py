@@ -0,0 +1,139 @@
+"""Concurrent users served by threaded JobSearcher vs. AsyncJobSearcher on one event loop.
+
+Usage:
+    python benchmarks/bench_async_search.py [--users 1 10 50 200] [--latency 0.3] [--pool 100]
+
+Each user runs one search (a distinct term, so nothing is shared through the
+caches) against local JSearch and Adzuna stubs. The threaded column gives
+every user its own thread, as one Streamlit session would; the async column
+runs all users as tasks on a single event loop. Peak thread count shows what
+each approach holds while it waits on the providers. The stubs run in a
+child process, so their threads don't compete with the client for the GIL.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from stub_servers import AdzunaStub, JSearchStub, StubServer, percentile
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from async_job_search import AsyncJobSearcher  # noqa: E402
+from job_cache import JobResultCache  # noqa: E402
+from job_index import JobIndex  # noqa: E402
+from job_search import JobSearcher  # noqa: E402
+from provider_transport import AsyncProviderTransport, ProviderTransport  # noqa: E402
+
+
+def configure(searcher, jsearch_url: str, adzuna_url: str):
+    searcher.rapidapi_key = "benchmark"
+    searcher.adzuna_app_id = "benchmark"
+    searcher.adzuna_app_key = "benchmark"
+    searcher.jsearch_url = f"{jsearch_url}/search"
+    searcher.adzuna_url = adzuna_url
+    searcher.search_timeout = 30
+    return searcher
+
+
+class ThreadSampler:
+    """Record the peak number of live threads while the block runs."""
+
+    def __enter__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(0.005):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def threaded(users: int, jsearch_url: str, adzuna_url: str, pool: int, results: int):
+    searcher = configure(JobSearcher("benchmark", transport=ProviderTransport(pool_size=pool),
+                                     job_cache=JobResultCache(":memory:", ttl=0, stale_ttl=0),
+                                     job_index=JobIndex(":memory:")),
+                         jsearch_url, adzuna_url)
+
+    def user(i: int):
+        start = time.perf_counter()
+        rows = len(searcher.search_jobs(f"engineer {i}", "United States", results))
+        return time.perf_counter() - start, rows
+
+    with ThreadSampler() as threads, ThreadPoolExecutor(max_workers=users) as executor:
+        start = time.perf_counter()
+        outcomes = list(executor.map(user, range(users)))
+        wall = time.perf_counter() - start
+    return wall, outcomes, threads.peak
+
+
+def asynchronous(users: int, jsearch_url: str, adzuna_url: str, pool: int, results: int):
+    async def run():
+        searcher = configure(AsyncJobSearcher("benchmark", transport=AsyncProviderTransport(pool_size=pool),
+                                              job_cache=JobResultCache(":memory:", ttl=0, stale_ttl=0),
+                                              job_index=JobIndex(":memory:")),
+                             jsearch_url, adzuna_url)
+
+        async def user(i: int):
+            start = time.perf_counter()
+            rows = len(await searcher.search_jobs(f"engineer {i}", "United States", results))
+            return time.perf_counter() - start, rows
+
+        async with searcher:
+            with ThreadSampler() as threads:
+                start = time.perf_counter()
+                outcomes = await asyncio.gather(*(user(i) for i in range(users)))
+                wall = time.perf_counter() - start
+        return wall, outcomes, threads.peak
+
+    return asyncio.run(run())
+
+
+def report(label: str, users: int, wall: float, outcomes, peak_threads: int):
+    latencies = [latency for latency, _ in outcomes]
+    rows = min(rows for _, rows in outcomes)
+    print(f"{label:<9} {users:>5} users   {users / wall:7.1f} searches/s   "
+          f"p50 {percentile(latencies, 50) * 1000:7.1f} ms   p99 {percentile(latencies, 99) * 1000:7.1f} ms   "
+          f"peak threads {peak_threads:>4}   min rows {rows}")
+
+
+def serve_stubs(latency: float, jitter: float, urls, stop):
+    with StubServer(JSearchStub, latency, jitter) as jsearch, StubServer(AdzunaStub, latency, jitter) as adzuna:
+        urls.send((jsearch.url, adzuna.url))
+        stop.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--results", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--pool", type=int, default=100, help="Connection pool size for both transports")
+    args = parser.parse_args()
+
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    stop = multiprocessing.Event()
+    stubs = multiprocessing.Process(target=serve_stubs, args=(args.latency, args.jitter, sender, stop), daemon=True)
+    stubs.start()
+    try:
+        jsearch_url, adzuna_url = receiver.recv()
+        for users in args.users:
+            report("threaded", users, *threaded(users, jsearch_url, adzuna_url, args.pool, args.results))
+            report("async", users, *asynchronous(users, jsearch_url, adzuna_url, args.pool, args.results))
+    finally:
+        stop.set()
+        stubs.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Batch analysis throughput (resumes/minute) and crash recovery.
+
+Usage:
+    python benchmarks/bench_batch_analyze.py [--resumes 40] [--latency 0.5] [--concurrency 1 4 16]
+
+Writes a folder of synthetic TXT and PDF resumes and runs
+batch_analyze.run_batch against a local fake Groq endpoint at several
+concurrency levels. A final run is killed part-way through (leaving a
+half-written line behind, as a crash would) and started again: the second
+run should only send the resumes that had no result yet (the synthetic PDFs
+are identical, so they share one cached analysis).
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+
+from stub_servers import GroqStub, StubServer
+
+import groq  # noqa: E402
+
+from batch_analyze import discover, run_batch  # noqa: E402
+from bench_analysis_modes import RESUME  # noqa: E402
+from bench_pdf_extraction import make_pdf  # noqa: E402
+from llm_cache import LLMCache  # noqa: E402
+
+
+def write_corpus(directory: str, count: int):
+    for i in range(count):
+        if i % 5 == 0:
+            with open(os.path.join(directory, f"resume_{i:04d}.pdf"), "wb") as f:
+                f.write(make_pdf(2))
+        else:
+            with open(os.path.join(directory, f"resume_{i:04d}.txt"), "w", encoding="utf-8") as f:
+                f.write(f"{RESUME}\nCandidate #{i}\n")
+
+
+async def run(documents, output, stub_url, cache_path, concurrency, tpm=0):
+    client = groq.AsyncGroq(api_key="benchmark", base_url=stub_url)
+    return await run_batch(documents, output, client, cache=LLMCache(cache_path), concurrency=concurrency,
+                           tokens_per_minute=tpm, workers=2, quiet=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.5, help="fixed LLM latency in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work, StubServer(GroqStub, args.latency) as stub:
+        corpus = os.path.join(work, "resumes")
+        os.makedirs(corpus)
+        write_corpus(corpus, args.resumes)
+        documents = discover(corpus)
+
+        for concurrency in args.concurrency:
+            output = os.path.join(work, f"results_{concurrency}.jsonl")
+            stats = asyncio.run(run(documents, output, stub.url, os.path.join(work, f"cache_{concurrency}.sqlite3"),
+                                    concurrency))
+            print(f"concurrency {concurrency:3d}   {stats['resumes_per_minute']:8.1f} resumes/min   "
+                  f"ok {stats['ok']}   failed {stats['failed']}   {stats['seconds']:.1f}s")
+
+        # Crash part-way through, then resume with the same output file
+        output = os.path.join(work, "results_crash.jsonl")
+        cache_path = os.path.join(work, "cache_crash.sqlite3")
+        concurrency = max(args.concurrency)
+        try:
+            asyncio.run(asyncio.wait_for(run(documents, output, stub.url, cache_path, concurrency),
+                                         timeout=args.latency * 1.5))
+        except asyncio.TimeoutError:
+            pass
+        with open(output, "a", encoding="utf-8") as f:
+            f.write('{"file": "resume_9999.txt", "sta')  # torn write
+        with open(output, encoding="utf-8") as f:
+            before = sum(1 for line in f if line.endswith("\n"))
+
+        hits = stub.hits
+        stats = asyncio.run(run(documents, output, stub.url, os.path.join(work, "cache_resume.sqlite3"), concurrency))
+        with open(output, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        ok_files = [record["file"] for record in records if record["status"] == "ok"]
+        print(f"crash after {before} results; resume skipped {stats['skipped']}, analyzed {stats['ok']} "
+              f"with {stub.hits - hits} LLM calls; {len(set(ok_files))}/{len(documents)} resumes done, "
+              f"{len(ok_files) - len(set(ok_files))} duplicates")
+
+
+if __name__ == "__main__":
+    main()
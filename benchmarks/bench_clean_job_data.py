@@ -0,0 +1,92 @@
+"""JobSearcher._clean_job_data: row-wise apply (before) vs. vectorized columns (after).
+
+Usage:
+    python benchmarks/bench_clean_job_data.py [--rows 1000 10000 100000]
+
+Builds raw aggregated listings (city/state and min/max/interval salary
+columns, with gaps and duplicates), cleans them with both paths, checks the
+outputs are identical and reports the time each path takes.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from stub_servers import percentile  # noqa: F401  (puts the app modules on sys.path)
+
+from dedup import dedupe_jobs  # noqa: E402
+from job_search import JobSearcher  # noqa: E402
+
+
+def legacy_clean_job_data(searcher: JobSearcher, jobs_df: pd.DataFrame) -> pd.DataFrame:
+    """The original row-wise transforms, kept here as the reference for the equality check."""
+    if 'Salary' not in jobs_df.columns:
+        if 'min_amount' in jobs_df.columns and 'max_amount' in jobs_df.columns:
+            jobs_df['salary'] = jobs_df.apply(searcher._format_salary, axis=1)
+        else:
+            jobs_df['salary'] = 'Not specified'
+    if 'city' in jobs_df.columns and 'state' in jobs_df.columns:
+        jobs_df['location'] = jobs_df.apply(
+            lambda row: f"{row.get('city', '')}, {row.get('state', '')}".strip(', '),
+            axis=1
+        )
+    display_columns = {
+        'title': 'Job Title', 'company': 'Company', 'location': 'Location', 'job_type': 'Job Type',
+        'salary': 'Salary', 'date_posted': 'Date Posted', 'job_url': 'Apply Link', 'site': 'Source'
+    }
+    jobs_df = jobs_df.rename(columns={old: new for old, new in display_columns.items() if old in jobs_df.columns})
+    jobs_df = jobs_df[[col for col in display_columns.values() if col in jobs_df.columns]]
+    jobs_df = dedupe_jobs(jobs_df)
+    jobs_df = jobs_df.sort_values('Date Posted', ascending=False)
+    return jobs_df.reset_index(drop=True)
+
+
+def make_listings(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cities = np.array(["Austin", "Denver", "Seattle", "New York", "", None], dtype=object)
+    states = np.array(["TX", "CO", "WA", "NY", ""], dtype=object)
+    min_amount = rng.integers(40, 160, rows) * 1000.0
+    max_amount = min_amount + rng.integers(0, 4, rows) * 10000.0
+    min_amount[rng.random(rows) < 0.2] = np.nan
+    max_amount[rng.random(rows) < 0.2] = np.nan
+    return pd.DataFrame({
+        "title": rng.choice(["Data Analyst", "Software Engineer", "Product Manager", "SRE"], rows)
+                 + " " + (rng.integers(0, rows // 2 + 1, rows)).astype(str),
+        "company": rng.choice(["Acme", "Globex", "Initech", "Umbrella"], rows),
+        "city": rng.choice(cities, rows),
+        "state": rng.choice(states, rows),
+        "job_type": rng.choice(["fulltime", "contract"], rows),
+        "min_amount": min_amount,
+        "max_amount": max_amount,
+        "interval": rng.choice(["yearly", "hourly", "monthly"], rows),
+        "date_posted": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 60, rows), unit="D"),
+        "job_url": [f"https://example.com/{i}" for i in range(rows)],
+        "site": rng.choice(["indeed", "linkedin"], rows),
+    })
+
+
+def timed(clean, df):
+    frame = df.copy()
+    start = time.perf_counter()
+    result = clean(frame)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    searcher = JobSearcher("benchmark")
+    print(f"{'rows':>7} {'apply (before)':>15} {'vectorized (after)':>19} {'speedup':>8}  equal")
+    for rows in args.rows:
+        df = make_listings(rows)
+        before, expected = timed(lambda frame: legacy_clean_job_data(searcher, frame), df)
+        after, actual = timed(searcher._clean_job_data, df)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+        print(f"{rows:>7} {before * 1000:>13.1f}ms {after * 1000:>17.1f}ms {before / after:>7.1f}x  yes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Fuzzy cross-provider deduplication at scale, with a precision/recall check.
+
+Usage:
+    python benchmarks/bench_dedup.py [--rows 100000] [--dup-rate 0.3]
+
+Generates distinct base postings, then re-posts a share of them the way a
+second provider would: company suffixes ("Inc.", ", LLC"), abbreviated or
+reordered titles, remote tags and a different location format. Recall is
+the share of re-posts that were dropped; precision is the share of drops
+that were merged into a posting of the same job.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+import stub_servers  # noqa: F401  (puts the app modules on sys.path)
+
+from dedup import find_duplicates  # noqa: E402
+
+LEVELS = ["", "Senior", "Junior", "Lead", "Principal", "Staff"]
+SPECIALTIES = ["Backend", "Frontend", "Data", "Machine Learning", "Platform", "Mobile", "Security", "Cloud",
+               "Analytics", "Payments", "Search", "Infrastructure"]
+ROLES = ["Software Engineer", "Engineer", "Analyst", "Scientist", "Developer", "Architect", "Product Manager",
+         "Engineering Manager", "Designer", "Consultant"]
+GRADES = ["", "I", "II", "III"]
+CITIES = [("Austin", "TX", "Travis County"), ("Denver", "CO", "Colorado"), ("Seattle", "WA", "King County"),
+          ("Boston", "MA", "Massachusetts"), ("Chicago", "IL", "Cook County"), ("Atlanta", "GA", "Fulton County"),
+          ("Phoenix", "AZ", "Arizona"), ("Portland", "OR", "Oregon"), ("Miami", "FL", "Florida"),
+          ("Dallas", "TX", "Dallas County")]
+SUFFIXES = [" Inc.", ", Inc", " LLC", ", LLC", " Ltd", " Corporation", " Co."]
+
+
+def make_listings(rows: int, dup_rate: float, seed: int = 11):
+    rnd = random.Random(seed)
+    base_count = int(rows * (1 - dup_rate))
+    companies = [f"{rnd.choice(['Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Vandelay'])} "
+                 f"{rnd.choice(['Labs', 'Systems', 'Works', 'Digital', 'Analytics'])} {i}" for i in range(3000)]
+
+    seen, base = set(), []
+    while len(base) < base_count:
+        title = " ".join(part for part in (rnd.choice(LEVELS), rnd.choice(SPECIALTIES), rnd.choice(ROLES),
+                                           rnd.choice(GRADES)) if part)
+        company, city = rnd.choice(companies), rnd.choice(CITIES)
+        if (title, company, city) in seen:
+            continue
+        seen.add((title, company, city))
+        base.append((title, company, city))
+
+    records = [(title, company, f"{city[0]}, {city[1]}", i) for i, (title, company, city) in enumerate(base)]
+    for _ in range(rows - base_count):
+        cluster = rnd.randrange(base_count)
+        title, company, city = base[cluster]
+        variant = rnd.randrange(4)
+        if variant == 0:
+            title = title.replace("Senior", "Sr.").replace("Junior", "Jr.")
+        elif variant == 1:
+            title = f"{title} - Remote"
+        elif variant == 2:
+            words = title.split()
+            title = f"{words[-1]}, {' '.join(words[:-1])}" if len(words) > 1 else title
+        records.append((title, company + rnd.choice(SUFFIXES), f"{city[0]}, {city[2]}", cluster))
+
+    rnd.shuffle(records)
+    return pd.DataFrame(records, columns=["Job Title", "Company", "Location", "cluster"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dup-rate", type=float, default=0.3)
+    args = parser.parse_args()
+
+    df = make_listings(args.rows, args.dup_rate)
+    cluster = df["cluster"].to_numpy()
+    true_dups = len(df) - df["cluster"].nunique()
+
+    start = time.perf_counter()
+    exact = df.duplicated(subset=["Job Title", "Company"]).to_numpy()
+    exact_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    representative = find_duplicates(df["Job Title"].tolist(), df["Company"].tolist(), df["Location"].tolist())
+    fuzzy_time = time.perf_counter() - start
+    dropped = representative != np.arange(len(df))
+    correct = int((cluster[dropped] == cluster[representative[dropped]]).sum())
+
+    print(f"{len(df)} listings, {true_dups} re-posts of {df['cluster'].nunique()} jobs")
+    print(f"exact title+company   {exact_time * 1000:8.1f} ms   dropped {int(exact.sum()):6d}   "
+          f"recall {int(exact.sum()) / true_dups:.3f}")
+    print(f"fuzzy MinHash/LSH     {fuzzy_time * 1000:8.1f} ms   dropped {int(dropped.sum()):6d}   "
+          f"recall {correct / true_dups:.3f}   precision {correct / max(1, int(dropped.sum())):.3f}")
+
+
+if __name__ == "__main__":
+    main()
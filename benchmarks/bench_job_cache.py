@@ -0,0 +1,58 @@
+"""Cold vs. cached job searches, and stale-while-revalidate.
+
+Usage:
+    python benchmarks/bench_job_cache.py [--latency 0.5] [--runs 10]
+
+The first search fills an on-disk JobResultCache from the stubs; repeats
+(with different spacing/case in the query) are served from it without any
+upstream request. The cache TTL then lapses: the next search still answers
+from the stale entry immediately and refreshes it in the background.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from stub_servers import AdzunaStub, JSearchStub, StubServer, percentile
+
+from bench_search_latency import make_searcher  # noqa: E402
+from job_cache import JobResultCache  # noqa: E402
+
+
+def timed_search(searcher, term):
+    start = time.perf_counter()
+    rows = len(searcher.search_jobs(term, "United States", 20))
+    return time.perf_counter() - start, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with StubServer(JSearchStub, args.latency) as jsearch, StubServer(AdzunaStub, args.latency) as adzuna, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        cache = JobResultCache(os.path.join(cache_dir, "jobs.sqlite3"), ttl=60, stale_ttl=600)
+        searcher = make_searcher(jsearch.url, adzuna.url, timeout=10.0, job_cache=cache)
+
+        cold, rows = timed_search(searcher, "Software Engineer")
+        upstream = jsearch.hits + adzuna.hits
+        print(f"cold search          {cold * 1000:8.1f} ms   rows {rows}   upstream requests {upstream}")
+
+        warm = [timed_search(searcher, "  software   ENGINEER ")[0] for _ in range(args.runs)]
+        print(f"cached search p50    {percentile(warm, 50) * 1000:8.1f} ms   p99 {percentile(warm, 99) * 1000:.1f} ms   "
+              f"upstream requests {jsearch.hits + adzuna.hits - upstream}")
+
+        # Let the entries go stale: answered from cache at once, refreshed behind the scenes
+        cache.ttl = 0
+        upstream = jsearch.hits + adzuna.hits
+        stale, rows = timed_search(searcher, "Software Engineer")
+        time.sleep(args.latency * 2)
+        print(f"stale search         {stale * 1000:8.1f} ms   rows {rows}   "
+              f"background refresh requests {jsearch.hits + adzuna.hits - upstream}")
+        print(f"cache counters       {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Local job index: build time and query latency at 1M stored postings, and local-first vs. live searches.
+
+Usage:
+    python benchmarks/bench_job_index.py [--postings 1000000] [--runs 50] [--keep index.sqlite3]
+
+Synthetic postings (role x seniority titles, 5k companies, 150 cities,
+mixed job types, salaries and posting dates) are written through
+JobIndex.add in batches, as searches would; --keep reuses a file built
+by an earlier run. Each query shape is then timed: a common word, a
+two-word role, a company, a role in a city, and a role with job type,
+salary and posting-date filters. The last block runs the same search
+through JobSearcher against the stubs in live and local-first mode.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from stub_servers import AdzunaStub, JSearchStub, StubServer, percentile
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from job_cache import JobResultCache  # noqa: E402
+from job_index import JobIndex  # noqa: E402
+from job_search import JobSearcher  # noqa: E402
+from singleflight import SingleFlight  # noqa: E402
+
+ROLES = [
+    "Software Engineer", "Data Scientist", "Data Engineer", "Product Manager", "DevOps Engineer",
+    "Frontend Developer", "Backend Developer", "Machine Learning Engineer", "Data Analyst", "QA Engineer",
+    "Site Reliability Engineer", "Security Engineer", "Mobile Developer", "Solutions Architect",
+    "Technical Writer", "UX Designer", "Business Analyst", "Cloud Engineer", "Database Administrator",
+    "Network Engineer", "Embedded Engineer", "Scrum Master", "Engineering Manager", "Sales Engineer",
+    "Support Engineer", "Game Developer", "Research Scientist", "Platform Engineer", "Full Stack Developer",
+    "Systems Administrator", "Marketing Analyst", "Financial Analyst", "Project Manager", "Recruiter",
+    "Account Executive", "Customer Success Manager", "Graphic Designer", "Content Strategist",
+    "Operations Manager", "Controller",
+]
+LEVELS = ["", "Senior ", "Junior ", "Lead ", "Principal ", "Staff "]
+CITIES = [f"{city}, {state}" for city, state in [
+    ("Austin", "TX"), ("Seattle", "WA"), ("Boston", "MA"), ("Denver", "CO"), ("Chicago", "IL"),
+    ("New York", "NY"), ("San Francisco", "CA"), ("Atlanta", "GA"), ("Portland", "OR"), ("Miami", "FL"),
+]] + [f"City{i}, S{i % 50}" for i in range(140)]
+JOB_TYPES = ["FULLTIME", "PARTTIME", "CONTRACTOR", "INTERN", "permanent", "contract"]
+SYLLABLES = ["ac", "me", "lo", "tri", "vex", "nor", "qua", "zen", "dal", "ori", "pix", "sol", "ter", "byte"]
+
+
+def company_names(count: int, rng: random.Random):
+    names = set()
+    while len(names) < count:
+        names.add("".join(rng.choice(SYLLABLES) for _ in range(3)).capitalize() + rng.choice([" Inc", " Labs", ""]))
+    return sorted(names)
+
+
+def postings(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    companies = company_names(5000, rng)
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        role = rng.choice(ROLES)
+        low = rng.randrange(40, 200) * 1000
+        salary = rng.random()
+        yield role, {
+            "Job Title": rng.choice(LEVELS) + role,
+            "Company": rng.choice(companies),
+            "Location": rng.choice(CITIES),
+            "Job Type": rng.choice(JOB_TYPES),
+            "Salary": (f"${low:,} - ${low + 30000:,} per year" if salary < 0.6
+                       else f"${low // 2000:,}+ per hour" if salary < 0.7 else "Salary not specified"),
+            "Date Posted": (now - timedelta(minutes=rng.randrange(60 * 24 * 60))).isoformat(),
+            "Apply Link": f"https://example.com/jobs/{i}",
+            "Source": rng.choice(["JSearch API", "Adzuna API"]),
+        }
+
+
+def build(index: JobIndex, count: int, batch: int = 5000):
+    start = time.perf_counter()
+    pending = {}
+    for i, (role, job) in enumerate(postings(count), 1):
+        pending.setdefault(role, []).append(job)
+        if i % batch == 0 or i == count:
+            for role_jobs_term, jobs in pending.items():
+                index.add(jobs, role_jobs_term, "United States")
+            pending = {}
+    return time.perf_counter() - start
+
+
+def time_queries(index: JobIndex, runs: int):
+    company = next(job["Company"] for _, job in postings(1, seed=7))
+    queries = [
+        ("common word", dict(search_term="engineer")),
+        ("two-word role", dict(search_term="Data Scientist")),
+        ("company", dict(search_term=company)),
+        ("role in a city", dict(search_term="Software Engineer", location="Austin, TX")),
+        ("role + filters", dict(search_term="Data Engineer", job_type="Full-time", min_salary=120000,
+                                posted_within_days=7)),
+        ("no match", dict(search_term="astronaut")),
+    ]
+    for label, query in queries:
+        latencies = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            rows = index.search(limit=20, **query)
+            latencies.append(time.perf_counter() - start)
+        print(f"{label:<16} p50 {percentile(latencies, 50) * 1000:7.2f} ms   "
+              f"p99 {percentile(latencies, 99) * 1000:7.2f} ms   rows {len(rows)}")
+
+
+def end_to_end(runs: int, latency: float):
+    with tempfile.TemporaryDirectory() as directory, \
+            StubServer(JSearchStub, latency) as jsearch, StubServer(AdzunaStub, latency) as adzuna:
+        index = JobIndex(os.path.join(directory, "index.sqlite3"))
+        searcher = JobSearcher("benchmark", job_cache=JobResultCache(":memory:", ttl=0, stale_ttl=0),
+                               flights=SingleFlight(enabled=False), job_index=index)
+        searcher.rapidapi_key = searcher.adzuna_app_id = searcher.adzuna_app_key = "benchmark"
+        searcher.jsearch_url = f"{jsearch.url}/search"
+        searcher.adzuna_url = adzuna.url
+
+        for mode in ("live", "local-first"):
+            latencies, calls = [], jsearch.hits + adzuna.hits
+            for _ in range(runs):
+                start = time.perf_counter()
+                rows = len(searcher.search_jobs("Software Engineer", "United States", 20, mode=mode))
+                latencies.append(time.perf_counter() - start)
+            print(f"{mode:<12} p50 {percentile(latencies, 50) * 1000:7.1f} ms   "
+                  f"p99 {percentile(latencies, 99) * 1000:7.1f} ms   rows {rows}   "
+                  f"provider requests {jsearch.hits + adzuna.hits - calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--postings", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--keep", help="Index file to build once and reuse")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.keep or os.path.join(directory, "index.sqlite3")
+        index = JobIndex(path, max_age=float("inf"))
+        stored = index.count()
+        if stored < args.postings:
+            seconds = build(index, args.postings)
+            print(f"indexed {args.postings:,} postings in {seconds:.1f} s "
+                  f"({args.postings / seconds:,.0f}/s), {os.path.getsize(path) / 2 ** 20:,.0f} MB")
+        print(f"\n{index.count():,} stored postings, {args.runs} runs per query, 20 results\n")
+        time_queries(index, args.runs)
+
+    print("\nJobSearcher against the stubs, 'Software Engineer' in 'United States'\n")
+    end_to_end(10, args.latency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""How well paginated provider searches fill results_wanted, and what it costs.
+
+Usage:
+    python benchmarks/bench_pagination.py [--latency 0.3]
+
+JSearch serves 10 jobs per page and Adzuna up to 20; the JSearch stub runs
+out after --jsearch-total results, so the last page comes back short.
+Each row shows rows returned, upstream page requests and wall-clock time.
+The budget is split between the providers, so each should read only the
+pages its half needs ("expected"); a provider that runs short is made up
+by the other. A last run has JSearch hold too few jobs for its half.
+
+Exits non-zero if a search returns the wrong number of rows or reads more
+pages than its split budget needs, so it can gate CI.
+"""
+import argparse
+import math
+import time
+
+from stub_servers import AdzunaStub, JSearchStub, StubServer
+
+from bench_search_latency import make_searcher  # noqa: E402
+
+
+def search(wanted: int, latency: float, jsearch_total: int, adzuna: bool = True):
+    with StubServer(JSearchStub, latency, total=jsearch_total) as jsearch_stub, \
+            StubServer(AdzunaStub, latency) as adzuna_stub:
+        searcher = make_searcher(jsearch_stub.url, adzuna_stub.url, timeout=10.0)
+        if not adzuna:
+            searcher.adzuna_app_id = None
+        start = time.perf_counter()
+        rows = len(searcher.search_jobs("engineer", "United States", wanted))
+        return rows, jsearch_stub.hits, adzuna_stub.hits, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--jsearch-total", type=int, default=35)
+    parser.add_argument("--wanted", type=int, nargs="+", default=[10, 20, 50])
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'wanted':>6} {'rows':>5} {'jsearch pages':>14} {'adzuna pages':>13} {'expected':>9} {'time':>9}")
+    for wanted in args.wanted:
+        rows, jsearch_pages, adzuna_pages, elapsed = search(wanted, args.latency, args.jsearch_total)
+        half = math.ceil(wanted / 2)
+        expected = (math.ceil(min(half, args.jsearch_total) / 10), math.ceil(half / 20))
+        print(f"{wanted:>6} {rows:>5} {jsearch_pages:>14} {adzuna_pages:>13} {'%d + %d' % expected:>9} "
+              f"{elapsed * 1000:>7.0f}ms")
+        if rows != wanted:
+            failures.append(f"{wanted} wanted: got {rows} rows")
+        if half <= args.jsearch_total and (jsearch_pages, adzuna_pages) != expected:
+            failures.append(f"{wanted} wanted: read {jsearch_pages} + {adzuna_pages} pages, expected {'%d + %d' % expected}")
+
+    # JSearch holds less than its half; Adzuna has to make up the rest
+    short = 15
+    rows, jsearch_pages, adzuna_pages, elapsed = search(50, args.latency, short)
+    print(f"\nJSearch holding {short}, 50 wanted: {rows} rows from {jsearch_pages} + {adzuna_pages} pages "
+          f"in {elapsed * 1000:.0f}ms")
+    if rows != 50:
+        failures.append(f"JSearch short: got {rows} rows, expected Adzuna to make up 50")
+
+    # JSearch alone has to make up the whole budget, and stops at its short last page
+    rows, jsearch_pages, _, elapsed = search(50, args.latency, args.jsearch_total, adzuna=False)
+    print(f"JSearch only, 50 wanted: {rows} rows (stub holds {args.jsearch_total}) "
+          f"from {jsearch_pages} pages in {elapsed * 1000:.0f}ms")
+    if rows != min(50, args.jsearch_total):
+        failures.append(f"JSearch only: got {rows} rows, expected {min(50, args.jsearch_total)}")
+
+    if failures:
+        raise SystemExit("\n".join(failures))
+
+
+if __name__ == "__main__":
+    main()
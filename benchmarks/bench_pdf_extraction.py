@@ -0,0 +1,80 @@
+"""PDF text extraction throughput (pages/second) on synthetic 1, 10 and 100 page documents.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py [--sizes 1 10 100] [--repeat 3]
+
+"serial" extracts every page in-process; "parallel" uses the
+text_extraction process pool (pages >= EXTRACTION_PARALLEL_MIN_PAGES).
+The pool is warmed up first so worker start-up isn't counted.
+"""
+import argparse
+import time
+
+import stub_servers  # noqa: F401  (puts the app modules on sys.path)
+
+from text_extraction import WORKERS, extract_pdf_text  # noqa: E402
+
+LINE = "Led a team of engineers delivering data platform features in Python, SQL and AWS."
+
+
+def make_pdf(pages: int, lines_per_page: int = 45) -> bytes:
+    """Build a text-only PDF by hand so the benchmark needs no extra dependencies."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page in range(pages):
+        text = ["BT", "/F1 10 Tf", "12 TL", "50 790 Td"]
+        for line in range(lines_per_page):
+            text.append(f"({LINE} p{page + 1} l{line + 1}) Tj T*")
+        text.append("ET")
+        stream = "\n".join(text).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref)
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def throughput(data: bytes, pages: int, repeat: int, parallel: bool) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = extract_pdf_text(data, parallel_min_pages=1 if parallel else pages + 1)
+        best = min(best, time.perf_counter() - start)
+    assert f"p{pages} l1" in text
+    return pages / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    extract_pdf_text(make_pdf(WORKERS), parallel_min_pages=1)  # warm the pool
+    print(f"{'pages':>6} {'size':>9} {'serial pages/s':>15} {'parallel pages/s':>17}  ({WORKERS} workers)")
+    for pages in args.sizes:
+        data = make_pdf(pages)
+        serial = throughput(data, pages, args.repeat, parallel=False)
+        parallel = throughput(data, pages, args.repeat, parallel=True)
+        print(f"{pages:>6} {len(data) / 1024:>7.0f}KB {serial:>15.1f} {parallel:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
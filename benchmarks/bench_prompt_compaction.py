@@ -0,0 +1,66 @@
+"""Prompt tokens before and after resume compaction, per call type.
+
+Usage:
+    python benchmarks/bench_prompt_compaction.py [--pages 1 3 10 30]
+
+Builds resumes the way PDF extraction returns them - a name/contact header
+and "Page N of M" footer on every page, ragged whitespace - with the
+experience section growing with the page count, then runs
+prompt_compaction.compact_resume for each call type. Also checks that the
+most recent role survives trimming.
+"""
+import argparse
+import time
+
+import stub_servers  # noqa: F401  (puts the app modules on sys.path)
+
+from prompt_compaction import BUDGETS, compact_resume, count_tokens  # noqa: E402
+
+HEADER = "JANE   DOE\njane.doe@example.com  |  (512) 555-0147  |  linkedin.com/in/janedoe"
+SUMMARY = "SUMMARY\nBackend engineer with 9 years building data-intensive services in Python and Go."
+SKILLS = "TECHNICAL SKILLS\nPython, Go, SQL, PostgreSQL, Redis, Kafka, Spark, AWS, Docker, Kubernetes, Terraform"
+EDUCATION = "EDUCATION\nB.S. Computer Science, University of Texas at Austin, 2014"
+INTERESTS = "INTERESTS\nTrail running, chess, amateur radio, woodworking"
+ROLE = """Company {n}  -  Senior Software Engineer   ({start} - {end})
+  •   Led migration of a monolith to {n} Kubernetes services, cutting deploy time by 70%
+  •   Built a streaming pipeline on Kafka and Spark processing {n}B events per day
+  •   Designed REST and GraphQL APIs serving {n}0M requests per day
+
+
+  •   Mentored {n} engineers and ran the backend interview loop"""
+
+
+def make_resume(pages: int) -> str:
+    roles = [ROLE.format(n=i + 1, start=2024 - 2 * i - 2, end="present" if i == 0 else 2024 - 2 * i)
+             for i in range(pages * 6)]
+    body = "\n\n".join([SUMMARY, "EXPERIENCE", *roles, SKILLS, EDUCATION, INTERESTS]).split("\n")
+    per_page = -(-len(body) // pages)
+    out = []
+    for page in range(pages):
+        out.append(HEADER)
+        out.extend(body[page * per_page:(page + 1) * per_page])
+        out.append(f"\n\nPage {page + 1} of {pages}\n\x0c")
+    return "\n".join(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 3, 10, 30])
+    args = parser.parse_args()
+
+    print(f"budgets: {BUDGETS}")
+    for pages in args.pages:
+        text = make_resume(pages)
+        print(f"\n{pages:2d}-page resume, {count_tokens(text)} tokens raw")
+        for call_type in BUDGETS:
+            start = time.perf_counter()
+            result = compact_resume(text, call_type)
+            elapsed = time.perf_counter() - start
+            recent_role_kept = "Company 1 " in result.text
+            print(f"  {call_type:<16} {result.original_tokens:6d} -> {result.tokens:6d} tokens   "
+                  f"saved {result.saved:6d} ({result.saved / result.original_tokens:5.1%})   "
+                  f"{elapsed * 1000:6.1f} ms   latest role kept: {'yes' if recent_role_kept else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Resume-to-job ranking speed and quality on a synthetic batch.
+
+Usage:
+    python benchmarks/bench_ranking.py [--jobs 10000] [--runs 10]
+
+Builds a batch of listings across several job families and scores them
+against a data-engineering resume with ranking.rank_jobs. Besides the
+timing, it reports how many of the top 20 jobs belong to the resume's
+family, against the provider order (before) the ranking replaces.
+
+It also checks that a job in the resume's own city never scores below
+the same job elsewhere, and exits non-zero if one does.
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from stub_servers import percentile
+
+from ranking import match_scores, rank_jobs  # noqa: E402
+
+FAMILIES = {
+    "data": ["Data Engineer", "Senior Data Engineer", "Big Data Engineer (Spark, Kafka)", "ETL Developer - Python/SQL",
+             "Data Platform Engineer", "Analytics Engineer (dbt, Airflow)"],
+    "frontend": ["Frontend Developer", "React Engineer", "UI Engineer (TypeScript)", "Senior Frontend Engineer - Vue"],
+    "mobile": ["iOS Developer (Swift)", "Android Engineer (Kotlin)", "Mobile Developer - React Native"],
+    "sales": ["Account Executive", "Sales Development Representative", "Regional Sales Manager"],
+    "nursing": ["Registered Nurse", "ICU Nurse", "Nurse Practitioner", "Clinical Nurse Educator"],
+    "finance": ["Financial Analyst", "Senior Accountant", "Controller", "Tax Associate"],
+}
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Vandelay", "Stark Industries", "Wayne Enterprises"]
+CITIES = ["Austin, TX", "Denver, CO", "Seattle, WA", "Remote", "Boston, MA", "Chicago, IL"]
+TYPES = ["Full-time", "Contract", "Part-time"]
+
+RESUME = """Jane Doe - Data Engineer
+Experience: Built batch and streaming data pipelines in Python and SQL on Spark and Kafka.
+Orchestrated ETL with Airflow, modelled warehouse tables with dbt on Snowflake, and ran the data platform on AWS.
+Skills: Python, SQL, Spark, Kafka, Airflow, dbt, Snowflake, AWS, Docker, data modelling."""
+
+
+def make_jobs(count: int, seed: int = 12) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    families = list(FAMILIES)
+    rows = []
+    for _ in range(count):
+        family = rnd.choice(families)
+        rows.append({
+            "Job Title": rnd.choice(FAMILIES[family]),
+            "Company": f"{rnd.choice(COMPANIES)} {rnd.randrange(500)}",
+            "Location": rnd.choice(CITIES),
+            "Job Type": rnd.choice(TYPES),
+            "family": family,
+        })
+    return pd.DataFrame(rows)
+
+
+def location_never_lowers(jobs: pd.DataFrame) -> bool:
+    """Score identical postings in every city against the resume located in each city in turn."""
+    postings = pd.DataFrame([{"Job Title": title, "Company": "Acme 1", "Location": city, "Job Type": "Full-time"}
+                             for title in ("Data Engineer", "Python Developer", "Registered Nurse")
+                             for city in CITIES])
+    batch = pd.concat([jobs, postings], ignore_index=True)
+    for index, city in enumerate(CITIES):
+        scores = match_scores(f"{RESUME}\nLocation: {city}", batch)[len(jobs):].reshape(-1, len(CITIES))
+        if (scores[:, index:index + 1] < scores).any():
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.jobs)
+    samples, ranked = [], None
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        ranked = rank_jobs(jobs, RESUME)
+        samples.append(time.perf_counter() - start)
+
+    print(f"{len(jobs)} jobs vs. one resume: p50 {percentile(samples, 50) * 1000:.1f} ms   "
+          f"max {max(samples) * 1000:.1f} ms")
+    print(f"data jobs in top 20: provider order {int((jobs['family'].head(20) == 'data').sum())}/20   "
+          f"ranked {int((ranked['family'].head(20) == 'data').sum())}/20")
+    print(ranked[["Match Score", "Job Title", "Job Type"]].head(5).to_string(index=False))
+
+    same_city_first = location_never_lowers(jobs)
+    print(f"\nsame job in the resume's city never scores lower: {'yes' if same_city_first else 'NO'}")
+    if not same_city_first:
+        raise SystemExit("a matching location lowered a job's match score")
+
+
+if __name__ == "__main__":
+    main()
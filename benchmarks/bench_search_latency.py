@@ -0,0 +1,85 @@
+"""Search latency with the providers queried one after another vs. in parallel.
+
+Usage:
+    python benchmarks/bench_search_latency.py [--runs 30] [--jsearch-latency 0.4] [--adzuna-latency 0.6]
+
+Both providers are local stubs with injected latency. The "sequential"
+column calls the adapters back to back (the old behaviour); "concurrent"
+goes through JobSearcher.search_jobs. A third run makes Adzuna slower
+than the search deadline to show partial results coming back on time.
+"""
+import argparse
+import os
+import time
+
+from stub_servers import AdzunaStub, JSearchStub, StubServer, percentile
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from job_cache import JobResultCache  # noqa: E402
+from job_index import JobIndex  # noqa: E402
+from job_search import JobSearcher  # noqa: E402
+from llm_cache import LLMCache  # noqa: E402
+
+
+def make_searcher(jsearch_url: str, adzuna_url: str, timeout: float, job_cache: JobResultCache = None) -> JobSearcher:
+    # Unless a cache is passed in, use one that always misses so every search reaches the stubs.
+    # The job index and LLM cache are in memory too, so stub listings never reach the app's files
+    searcher = JobSearcher("benchmark", job_cache=job_cache or JobResultCache(":memory:", ttl=0, stale_ttl=0),
+                           job_index=JobIndex(":memory:"), llm_cache=LLMCache(":memory:"))
+    searcher.rapidapi_key = "benchmark"
+    searcher.adzuna_app_id = "benchmark"
+    searcher.adzuna_app_key = "benchmark"
+    searcher.jsearch_url = f"{jsearch_url}/search"
+    searcher.adzuna_url = adzuna_url
+    searcher.search_timeout = timeout
+    return searcher
+
+
+def sequential(searcher: JobSearcher, results_wanted: int):
+    jobs = searcher._search_jsearch_api("engineer", "United States", min(results_wanted, 10), None)
+    remaining = results_wanted - len(jobs)
+    if remaining > 0:
+        jobs += searcher._search_adzuna_api("engineer", "United States", min(remaining, 10), None)
+    return jobs
+
+
+def concurrent(searcher: JobSearcher, results_wanted: int):
+    return searcher.search_jobs("engineer", "United States", results_wanted)
+
+
+def measure(label: str, fn, searcher: JobSearcher, runs: int, results_wanted: int):
+    samples, rows = [], 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        rows = len(fn(searcher, results_wanted))
+        samples.append(time.perf_counter() - start)
+    print(f"{label:<28} p50 {percentile(samples, 50) * 1000:8.1f} ms   "
+          f"p99 {percentile(samples, 99) * 1000:8.1f} ms   rows {rows}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--results", type=int, default=20)
+    parser.add_argument("--jsearch-latency", type=float, default=0.4)
+    parser.add_argument("--adzuna-latency", type=float, default=0.6)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with StubServer(JSearchStub, args.jsearch_latency, args.jitter) as jsearch, \
+            StubServer(AdzunaStub, args.adzuna_latency, args.jitter) as adzuna:
+        searcher = make_searcher(jsearch.url, adzuna.url, timeout=5.0)
+        measure("sequential (before)", sequential, searcher, args.runs, args.results)
+        measure("concurrent (after)", concurrent, searcher, args.runs, args.results)
+
+    # Adzuna now blows through the deadline; JSearch results still come back on time
+    deadline = args.jsearch_latency + args.jitter + 0.2
+    with StubServer(JSearchStub, args.jsearch_latency, args.jitter) as jsearch, \
+            StubServer(AdzunaStub, deadline * 3) as adzuna:
+        searcher = make_searcher(jsearch.url, adzuna.url, timeout=deadline)
+        measure(f"concurrent, {deadline:.1f}s deadline", concurrent, searcher, max(3, args.runs // 5), args.results)
+
+
+if __name__ == "__main__":
+    main()
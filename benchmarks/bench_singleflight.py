@@ -0,0 +1,149 @@
+"""Upstream calls made by N concurrent identical searches and analyses, with and without single-flight.
+
+Usage:
+    python benchmarks/bench_singleflight.py [--clients 50] [--latency 0.3]
+
+All clients start together (behind a barrier) and ask for "Software Engineer"
+in "United States", then for the skills of one resume, against local stubs
+and empty caches - the cold start of a traffic spike. Without coalescing
+every client calls every upstream; with it, one search and one LLM call
+are made and every client gets their result. The last block does the same
+with AsyncJobSearcher on one event loop.
+"""
+import argparse
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import groq
+
+from stub_servers import AdzunaStub, GroqStub, JSearchStub, StubServer, percentile
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from async_job_search import AsyncJobSearcher  # noqa: E402
+from job_cache import JobResultCache  # noqa: E402
+from job_index import JobIndex  # noqa: E402
+from job_search import SKILLS_PROMPT_VERSION, JobSearcher, skills_messages  # noqa: E402
+from llm_cache import LLMCache, cached_chat  # noqa: E402
+from singleflight import SingleFlight, get_default_flights  # noqa: E402
+
+RESUME = """Jane Doe - Senior Software Engineer
+EXPERIENCE
+Built Python and Go services on Kubernetes, with PostgreSQL and Kafka.
+SKILLS
+Python, Go, Kubernetes, Docker, PostgreSQL, Kafka, AWS, Terraform"""
+
+
+def configure(searcher, stubs):
+    jsearch, adzuna, groq_stub = stubs
+    searcher.rapidapi_key = "benchmark"
+    searcher.adzuna_app_id = "benchmark"
+    searcher.adzuna_app_key = "benchmark"
+    searcher.jsearch_url = f"{jsearch.url}/search"
+    searcher.adzuna_url = adzuna.url
+    return searcher
+
+
+def hits(stubs):
+    return tuple(stub.hits for stub in stubs)
+
+
+def run_threads(clients: int, fn):
+    """Run fn(i) on `clients` threads released at the same instant; returns per-client latencies."""
+    barrier = threading.Barrier(clients)
+
+    def client(i: int):
+        barrier.wait()
+        start = time.perf_counter()
+        fn(i)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        return list(executor.map(client, range(clients)))
+
+
+def report(label: str, before, after, latencies):
+    jsearch, adzuna, groq_hits = (b - a for a, b in zip(before, after))
+    print(f"{label:<26} upstream requests: JSearch {jsearch:>4}  Adzuna {adzuna:>4}  Groq {groq_hits:>4}   "
+          f"p50 {percentile(latencies, 50) * 1000:7.1f} ms   p99 {percentile(latencies, 99) * 1000:7.1f} ms")
+    return jsearch + adzuna, groq_hits
+
+
+def threaded(clients: int, stubs, coalesce: bool):
+    flights = SingleFlight(enabled=coalesce)
+    get_default_flights().enabled = coalesce  # cached_chat uses the process-wide group
+    searcher = configure(JobSearcher("benchmark", job_cache=JobResultCache(":memory:"), flights=flights,
+                                     job_index=JobIndex(":memory:")), stubs)
+    llm_cache = LLMCache(":memory:")
+    client = groq.Client(api_key="benchmark", base_url=stubs[2].url)
+
+    def search(_):
+        assert len(searcher.search_jobs("Software Engineer", "United States", 20)) == 20
+
+    def skills(_):
+        cached_chat(client, llm_cache, SKILLS_PROMPT_VERSION, RESUME, skills_messages(RESUME),
+                    model="llama-3.3-70b-versatile", temperature=0.3, max_tokens=200)
+
+    label = "coalesced" if coalesce else "independent"
+    before = hits(stubs)
+    search_latencies = run_threads(clients, search)
+    middle = hits(stubs)
+    skill_latencies = run_threads(clients, skills)
+    after = hits(stubs)
+    provider_requests, _ = report(f"{label} search", before, middle, search_latencies)
+    _, groq_hits = report(f"{label} LLM skills", middle, after, skill_latencies)
+    return provider_requests, groq_hits
+
+
+def asynchronous(clients: int, stubs):
+    get_default_flights().enabled = True
+
+    async def run():
+        searcher = configure(AsyncJobSearcher("benchmark", job_cache=JobResultCache(":memory:"),
+                                              llm_cache=LLMCache(":memory:"), flights=SingleFlight(),
+                                              job_index=JobIndex(":memory:")), stubs)
+        searcher.groq_client = groq.AsyncGroq(api_key="benchmark", base_url=stubs[2].url)
+        searcher.skill_mode = "llm"
+
+        async def timed(coro):
+            start = time.perf_counter()
+            await coro
+            return time.perf_counter() - start
+
+        async with searcher:
+            before = hits(stubs)
+            search_latencies = await asyncio.gather(*(
+                timed(searcher.search_jobs("Software Engineer", "United States", 20)) for _ in range(clients)))
+            middle = hits(stubs)
+            skill_latencies = await asyncio.gather(*(
+                timed(searcher.extract_skills_from_resume(RESUME)) for _ in range(clients)))
+            after = hits(stubs)
+        report("async coalesced search", before, middle, search_latencies)
+        report("async coalesced LLM", middle, after, skill_latencies)
+
+    asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    with StubServer(JSearchStub, args.latency) as jsearch, StubServer(AdzunaStub, args.latency) as adzuna, \
+            StubServer(GroqStub, args.latency) as groq_stub:
+        stubs = (jsearch, adzuna, groq_stub)
+        print(f"{args.clients} concurrent clients; one search = 1 JSearch page + 1 Adzuna page\n")
+        threaded(args.clients, stubs, coalesce=False)
+        provider_requests, groq_hits = threaded(args.clients, stubs, coalesce=True)
+        asynchronous(args.clients, stubs)
+
+    ok = provider_requests == 2 and groq_hits == 1
+    print(f"\nexactly one upstream search and one LLM call with coalescing: {'yes' if ok else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Skill extraction throughput: local taxonomy matcher vs. the LLM call.
+
+Usage:
+    python benchmarks/bench_skill_extraction.py [--resumes 2000] [--llm-runs 10] [--latency 0.5]
+
+Generates a synthetic corpus of resumes, each mentioning a random set of
+skills through their aliases ("k8s", "Golang", "React.js") inside filler
+prose, and reports resumes/second for skills.extract_skills plus the share
+of planted skills it recovered. The LLM path goes through JobSearcher with
+SKILL_EXTRACTION_MODE=llm against a local fake Groq endpoint.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from stub_servers import GroqStub, StubServer, percentile
+
+import groq  # noqa: E402
+
+from job_search import JobSearcher  # noqa: E402
+from llm_cache import LLMCache  # noqa: E402
+from skills import SKILL_TAXONOMY, SkillMatcher  # noqa: E402
+
+FILLER = [
+    "Delivered projects on schedule while working closely with cross-functional partners.",
+    "Owned the roadmap for a customer-facing product used by thousands of people every day.",
+    "Improved reliability and reduced operating costs across several quarters.",
+    "Interviewed candidates, wrote design documents and reviewed code from the wider team.",
+    "Worked with customers to understand their needs and turned feedback into features.",
+    "Presented results to leadership and kept the documentation up to date.",
+]
+
+
+def make_resume(rnd: random.Random, skills_per_resume: int):
+    planted = rnd.sample(list(SKILL_TAXONOMY), skills_per_resume)
+    lines = ["Alex Example - Engineer", "alex@example.com | Remote", "", "EXPERIENCE"]
+    for skill in planted:
+        alias = rnd.choice(SKILL_TAXONOMY[skill])
+        alias = alias.upper() if rnd.random() < 0.3 else alias.title() if rnd.random() < 0.5 else alias
+        lines.append(f"- {rnd.choice(FILLER)} Used {alias} day to day. {rnd.choice(FILLER)}")
+    lines += ["", "EDUCATION", "B.S. Computer Science"]
+    return "\n".join(lines), planted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--skills", type=int, default=12, help="skills planted per resume")
+    parser.add_argument("--llm-runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5, help="fixed LLM latency in seconds")
+    args = parser.parse_args()
+
+    rnd = random.Random(13)
+    corpus = [make_resume(rnd, args.skills) for _ in range(args.resumes)]
+    chars = sum(len(text) for text, _ in corpus) / len(corpus)
+
+    start = time.perf_counter()
+    matcher = SkillMatcher()
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found = [matcher.extract(text, limit=len(SKILL_TAXONOMY)) for text, _ in corpus]
+    elapsed = time.perf_counter() - start
+    recovered = sum(len(set(skills) & set(planted)) for skills, (_, planted) in zip(found, corpus))
+
+    print(f"{len(corpus)} resumes, ~{chars:.0f} chars each; automaton built in {build_time * 1000:.1f} ms")
+    print(f"local   {len(corpus) / elapsed:10.0f} resumes/s   {elapsed / len(corpus) * 1000:7.2f} ms/resume   "
+          f"recall {recovered / (len(corpus) * args.skills):.3f}")
+
+    with StubServer(GroqStub, args.latency) as stub, tempfile.TemporaryDirectory() as cache_dir:
+        searcher = JobSearcher("benchmark", llm_cache=LLMCache(os.path.join(cache_dir, "cache.sqlite3")))
+        searcher.groq_client = groq.Client(api_key="benchmark", base_url=stub.url)
+        searcher.skill_mode = "llm"
+        samples = []
+        for text, _ in corpus[:args.llm_runs]:
+            start = time.perf_counter()
+            searcher.extract_skills_from_resume(text)
+            samples.append(time.perf_counter() - start)
+    print(f"llm     {len(samples) / sum(samples):10.1f} resumes/s   "
+          f"{percentile(samples, 50) * 1000:7.2f} ms/resume (p50, {args.latency:.1f}s stub latency)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""App cold start: import cost of the app's modules and time to first render.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--json] [--max-render-ms N]
+
+Every measurement runs in a fresh interpreter, as a restarted container or
+a new replica would. The import cost comes from `python -X importtime`,
+with Streamlit imported first since the server has it loaded before the
+script runs; it lists the app's modules and which heavy libraries they
+pulled in. Time to first render runs app.py once through Streamlit's
+AppTest (warm-up thread included) and reports the median over --runs.
+
+--json prints one JSON object for CI to record, and --max-render-ms makes
+the run fail when the median render is slower than that.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+from stub_servers import ROOT, percentile
+
+# Modules app.py imports at the top
+APP_MODULES = ["analysis_queue", "lazy_imports", "job_results", "job_search", "prompt_compaction", "rate_limit",
+               "telemetry", "resume_analysis", "text_extraction"]
+HEAVY = ["pandas", "numpy", "groq", "PyPDF2", "requests", "httpx", "tiktoken"]
+
+RENDER = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+app = AppTest.from_file("app.py", default_timeout=60)
+app.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "errors": [str(e.value) for e in app.exception],
+                  "loaded": [name for name in %r if name in sys.modules]}))
+""" % (HEAVY,)
+
+
+def environment():
+    env = dict(os.environ, GROQ_API_KEY="benchmark", RATE_LIMITS="off")
+    env.pop("TELEMETRY_PORT", None)
+    return env
+
+
+def import_times():
+    """Cumulative import time (ms) of each app module, and the heavy libraries loaded on the way."""
+    code = ("import json, streamlit, sys; " + "; ".join(f"import {name}" for name in APP_MODULES) +
+            f"; print(json.dumps([name for name in {HEAVY!r} if name in sys.modules]))")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=environment(),
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\S+)$", line)
+        if match and match.group(2) in APP_MODULES:
+            times[match.group(2)] = int(match.group(1)) / 1000
+    return times, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def render_times(runs: int):
+    samples, loaded = [], []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", RENDER], cwd=ROOT, env=environment(),
+                                capture_output=True, text=True, check=True)
+        render = json.loads(result.stdout.strip().splitlines()[-1])
+        if render["errors"]:
+            raise SystemExit(f"app.py raised during render: {render['errors']}")
+        samples.append(render["seconds"])
+        loaded = render["loaded"]
+    return samples, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print one JSON object instead of a table")
+    parser.add_argument("--max-render-ms", type=float, help="Fail if the median first render is slower")
+    args = parser.parse_args()
+
+    times, imported = import_times()
+    samples, loaded = render_times(args.runs)
+    render_ms = percentile(samples, 50) * 1000
+
+    if args.json:
+        print(json.dumps({
+            "import_ms": round(sum(times.values()), 1),
+            "import_ms_by_module": {name: round(ms, 1) for name, ms in times.items()},
+            "heavy_imported": imported,
+            "first_render_ms_p50": round(render_ms, 1),
+            "first_render_ms_max": round(max(samples) * 1000, 1),
+        }))
+    else:
+        print("import time on top of streamlit (cumulative, ms)")
+        for name, ms in sorted(times.items(), key=lambda item: -item[1]):
+            print(f"  {name:<18} {ms:8.1f}")
+        print(f"  {'total':<18} {sum(times.values()):8.1f}")
+        print(f"heavy libraries imported by the app modules: {', '.join(imported) or 'none'}")
+        print(f"\nfirst render over {args.runs} fresh processes: p50 {render_ms:.0f} ms, "
+              f"max {max(samples) * 1000:.0f} ms (loaded by the end, incl. warm-up: {', '.join(loaded) or 'none'})")
+
+    if args.max_render_ms is not None and render_ms > args.max_render_ms:
+        raise SystemExit(f"first render p50 {render_ms:.0f} ms exceeds --max-render-ms {args.max_render_ms:g}")
+
+
+if __name__ == "__main__":
+    main()
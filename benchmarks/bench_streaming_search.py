@@ -0,0 +1,62 @@
+"""Time to first result of a job search with one fast and one slow provider.
+
+Usage:
+    python benchmarks/bench_streaming_search.py [--runs 10] [--fast-latency 0.2] [--slow-latency 2.0]
+
+JSearch is a stub answering in --fast-latency seconds, Adzuna one taking
+--slow-latency. Before, nothing was shown until search_jobs returned, so
+the first result came with the last; now each provider page is cleaned,
+de-duplicated and passed to on_results as it arrives. A last run makes
+Adzuna miss the search deadline (--timeout) to show the fast provider's
+jobs arriving long before the deadline ends the search.
+"""
+import argparse
+import time
+
+from stub_servers import AdzunaStub, JSearchStub, StubServer, percentile
+
+from bench_search_latency import make_searcher  # noqa: E402
+
+
+def measure(searcher, runs: int, results_wanted: int):
+    first, total, updates, rows = [], [], 0, 0
+    for run in range(runs):
+        arrivals = []
+        start = time.perf_counter()
+        # A new term per run, so no run is answered from the previous one's coalesced search
+        jobs_df = searcher.search_jobs(f"engineer {run}", "United States", results_wanted,
+                                       on_results=lambda partial: arrivals.append(time.perf_counter() - start))
+        total.append(time.perf_counter() - start)
+        first.append(arrivals[0] if arrivals else total[-1])
+        updates, rows = len(arrivals), len(jobs_df)
+    return first, total, updates, rows
+
+
+def report(label: str, first, total, updates: int, rows: int):
+    print(f"{label:<34} first result p50 {percentile(first, 50) * 1000:7.1f} ms   "
+          f"all results p50 {percentile(total, 50) * 1000:7.1f} ms   updates {updates}   rows {rows}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--results", type=int, default=40)
+    parser.add_argument("--fast-latency", type=float, default=0.2)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--timeout", type=float, default=1.0, help="Search deadline for the last run")
+    args = parser.parse_args()
+
+    with StubServer(JSearchStub, args.fast_latency) as jsearch, StubServer(AdzunaStub, args.slow_latency) as adzuna:
+        searcher = make_searcher(jsearch.url, adzuna.url, timeout=args.slow_latency * 5)
+        first, total, updates, rows = measure(searcher, args.runs, args.results)
+        print(f"JSearch {args.fast_latency:g} s, Adzuna {args.slow_latency:g} s, {args.results} results wanted\n")
+        report("before (table shown on return)", total, total, 1, rows)
+        report("after (table grows per page)", first, total, updates, rows)
+
+        searcher.search_timeout = args.timeout
+        first, total, updates, rows = measure(searcher, max(1, args.runs // 2), args.results)
+        report(f"after, Adzuna past {args.timeout:g} s deadline", first, total, updates, rows)
+
+
+if __name__ == "__main__":
+    main()
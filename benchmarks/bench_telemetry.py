@@ -0,0 +1,58 @@
+"""Tracing overhead per span, and what the exported metrics look like after a search.
+
+Usage:
+    python benchmarks/bench_telemetry.py [--spans 100000]
+
+Times an empty traced block against an untraced one, then runs a search
+against the stub providers with a fresh Telemetry registry and a JSON span
+log, and prints the Prometheus exposition and the first log lines.
+"""
+import argparse
+import io
+import time
+
+from stub_servers import AdzunaStub, JSearchStub, StubServer
+
+import telemetry  # noqa: E402
+from bench_search_latency import make_searcher  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spans", type=int, default=100000)
+    args = parser.parse_args()
+
+    registry = telemetry.Telemetry()
+    start = time.perf_counter()
+    for _ in range(args.spans):
+        pass
+    baseline = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(args.spans):
+        with registry.span("noop"):
+            pass
+    traced = time.perf_counter() - start
+    print(f"span overhead: {(traced - baseline) / args.spans * 1e6:.2f} us per span ({args.spans} spans)")
+
+    # Route the app's spans into a fresh registry that logs to memory
+    log = io.StringIO()
+    registry = telemetry.Telemetry()
+    registry._log = log
+    telemetry._default_telemetry = registry
+
+    with StubServer(JSearchStub, 0.2, 0.05) as jsearch, StubServer(AdzunaStub, 0.3, 0.05) as adzuna:
+        searcher = make_searcher(jsearch.url, adzuna.url, timeout=5.0)
+        for _ in range(3):
+            searcher.search_jobs_by_resume("Python developer with Docker, AWS and SQL", skills=["Python"])
+
+    print("\n--- Prometheus exposition (stage histograms trimmed to count/sum) ---")
+    for line in registry.render_prometheus().splitlines():
+        if "_bucket" not in line:
+            print(line)
+    print("\n--- JSON span log (first 6 lines) ---")
+    for line in log.getvalue().splitlines()[:6]:
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Time to first critique token and total page latency, blocking vs. streaming.
+
+Usage:
+    python benchmarks/bench_time_to_first_token.py [--runs 5]
+
+"blocking" waits for the whole critique and then asks for recommendations
+and skills one after another (the old flow). "streaming" streams the
+critique while the two Career Insights calls run in the background, the
+way app.py does now.
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from stub_servers import GroqStub, StubServer, percentile
+
+import groq  # noqa: E402
+
+from bench_analysis_modes import RESUME  # noqa: E402
+from job_search import JobSearcher  # noqa: E402
+from llm_cache import LLMCache  # noqa: E402
+from resume_analysis import critique_resume, stream_critique  # noqa: E402
+
+
+def run_blocking(client, searcher, resume, start):
+    critique_resume(client, searcher.llm_cache, resume, "Staff Engineer")
+    first_token = time.perf_counter() - start
+    searcher.get_job_recommendations(resume, "Staff Engineer")
+    searcher.extract_skills_from_resume(resume)
+    return first_token
+
+
+def run_streaming(client, searcher, resume, start):
+    first_token = None
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        recommendations = executor.submit(searcher.get_job_recommendations, resume, "Staff Engineer")
+        skills = executor.submit(searcher.extract_skills_from_resume, resume)
+        for _ in stream_critique(client, searcher.llm_cache, resume, "Staff Engineer"):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+        recommendations.result()
+        skills.result()
+    return first_token
+
+
+def measure(label, fn, client, searcher, runs):
+    ttft, total = [], []
+    for i in range(runs):
+        resume = f"{RESUME}\nReference #{label}-{i}"
+        start = time.perf_counter()
+        ttft.append(fn(client, searcher, resume, start))
+        total.append(time.perf_counter() - start)
+    print(f"{label:<10} first token p50 {percentile(ttft, 50) * 1000:7.1f} ms   "
+          f"page total p50 {percentile(total, 50) * 1000:7.1f} ms   p99 {percentile(total, 99) * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--per-input-token", type=float, default=0.0002)
+    parser.add_argument("--per-output-token", type=float, default=0.004)
+    args = parser.parse_args()
+
+    with StubServer(GroqStub, args.latency, per_input_token=args.per_input_token,
+                    per_output_token=args.per_output_token) as stub, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        client = groq.Client(api_key="benchmark", base_url=stub.url)
+        searcher = JobSearcher("benchmark", llm_cache=LLMCache(os.path.join(cache_dir, "cache.sqlite3")))
+        searcher.skill_mode = "llm"  # measure the LLM skills call, not the local extractor
+        searcher.groq_client = client
+        measure("blocking", run_blocking, client, searcher, args.runs)
+        measure("streaming", run_streaming, client, searcher, args.runs)
+
+
+if __name__ == "__main__":
+    main()
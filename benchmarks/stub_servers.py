@@ -0,0 +1,259 @@
+"""Local stand-ins for the upstream job and Groq APIs, used by the benchmarks.
+
+Each stub is a threaded HTTP server on 127.0.0.1 that serves canned
+fixtures after an injected delay, so the benchmarks can measure the
+app's own overhead without touching the network or spending quota.
+"""
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Make the app modules importable when a benchmark is run from anywhere
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# The app modules call st.* outside `streamlit run`; keep bare-mode chatter out of the results
+logging.disable(logging.WARNING)
+
+# The stubs have no quotas; benchmarks that want the rate governor build their own
+os.environ.setdefault("RATE_LIMITS", "off")
+
+
+class StubServer:
+    """Run a handler class on a free local port in a background thread."""
+
+    def __init__(self, handler_cls, latency: float = 0.0, jitter: float = 0.0, **options):
+        handler = type(handler_cls.__name__, (handler_cls,), {
+            "latency": latency,
+            "jitter": jitter,
+            "options": options,
+        })
+        # A deep listen backlog, so a burst of concurrent clients isn't stalled in SYN retries
+        server_cls = type("StubHTTPServer", (ThreadingHTTPServer,), {"request_queue_size": 1024})
+        self.httpd = server_cls(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.hits = 0
+        self.httpd.prompt_tokens = 0
+        self.httpd.completion_tokens = 0
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def hits(self) -> int:
+        return self.httpd.hits
+
+    @property
+    def prompt_tokens(self) -> int:
+        return self.httpd.prompt_tokens
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    jitter = 0.0
+    options = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay(self):
+        self.server.hits += 1
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+
+    def _send_json(self, payload, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _page_size(per_page: int, page: int, total) -> int:
+    """Rows on a given page when the stub pretends to hold `total` results (None = unlimited)."""
+    if total is None:
+        return per_page
+    return max(0, min(per_page, total - (page - 1) * per_page))
+
+
+class JSearchStub(_StubHandler):
+    """Serves JSearch-shaped results for any query, paginated by `page`."""
+
+    def do_GET(self):
+        self._delay()
+        query = parse_qs(urlparse(self.path).query)
+        page = int(query.get("page", ["1"])[0])
+        per_page = _page_size(self.options.get("per_page", 10), page, self.options.get("total"))
+        data = [
+            {
+                "job_title": f"Software Engineer {page}-{i}",
+                "employer_name": f"JSearch Co {i}",
+                "job_city": "Austin",
+                "job_state": "TX",
+                "job_employment_type": "FULLTIME",
+                "job_min_salary": 90000 + i * 1000,
+                "job_max_salary": 120000 + i * 1000,
+                "job_salary_period": "YEAR",
+                "job_posted_at_datetime_utc": f"2024-05-{(i % 28) + 1:02d}T00:00:00.000Z",
+                "job_apply_link": f"https://jsearch.example/jobs/{page}-{i}",
+            }
+            for i in range(per_page)
+        ]
+        self._send_json({"status": "OK", "data": data})
+
+
+class AdzunaStub(_StubHandler):
+    """Serves Adzuna-shaped results for any country, paginated by the /search/<page> path."""
+
+    def do_GET(self):
+        self._delay()
+        page = int(urlparse(self.path).path.rstrip("/").rsplit("/", 1)[-1] or 1)
+        query = parse_qs(urlparse(self.path).query)
+        per_page = _page_size(int(query.get("results_per_page", ["10"])[0]), page, self.options.get("total"))
+        results = [
+            {
+                "title": f"Data Analyst {page}-{i}",
+                "company": {"display_name": f"Adzuna Ltd {i}"},
+                "location": {"display_name": "Denver, Colorado"},
+                "contract_type": "permanent",
+                "salary_min": 70000 + i * 500,
+                "salary_max": 95000 + i * 500,
+                "created": f"2024-05-{(i % 28) + 1:02d}T00:00:00Z",
+                "redirect_url": f"https://adzuna.example/jobs/{page}-{i}",
+            }
+            for i in range(per_page)
+        ]
+        self._send_json({"count": per_page, "results": results})
+
+
+SAMPLE_CRITIQUE = """1. **OVERALL IMPRESSION**
+A solid, well-structured resume with clear technical depth.
+
+2. **STRENGTHS**
+- Quantified achievements
+- Modern technology stack
+
+3. **AREAS FOR IMPROVEMENT**
+- Summary is generic
+
+4. **SPECIFIC RECOMMENDATIONS**
+- Lead with impact metrics
+
+5. **ACTION ITEMS**
+- High: rewrite the summary
+
+6. **FINAL SCORE**
+7/10 - strong content, generic framing."""
+
+SAMPLE_STRUCTURED = {
+    "overall_impression": "A solid, well-structured resume with clear technical depth.",
+    "strengths": ["Quantified achievements", "Modern technology stack"],
+    "areas_for_improvement": ["Summary is generic"],
+    "specific_recommendations": ["Lead with impact metrics"],
+    "action_items": [{"priority": "High", "item": "Rewrite the summary"}],
+    "final_score": {"score": 7, "justification": "Strong content, generic framing."},
+    "skills": ["Python", "SQL", "AWS", "Docker", "Kubernetes", "React", "Data Analysis"],
+    "job_recommendations": [f"Recommendation {i}" for i in range(1, 6)],
+}
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for relative comparisons."""
+    return max(1, len(text) // 4)
+
+
+class GroqStub(_StubHandler):
+    """OpenAI-compatible /chat/completions endpoint with a latency model.
+
+    Each call takes `latency` seconds plus `per_input_token` per prompt token
+    and `per_output_token` per generated token, roughly like a hosted model.
+    """
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        messages = request.get("messages", [])
+        prompt = "\n".join(m.get("content", "") for m in messages)
+        system = messages[0].get("content", "") if messages else ""
+
+        if request.get("response_format", {}).get("type") == "json_object":
+            content = json.dumps(SAMPLE_STRUCTURED)
+        elif "keywords" in system:
+            content = ", ".join(SAMPLE_STRUCTURED["skills"])
+        elif "career counselor" in system:
+            content = "\n".join(f"- {rec}" for rec in SAMPLE_STRUCTURED["job_recommendations"])
+        else:
+            content = SAMPLE_CRITIQUE
+
+        prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(content)
+        self.server.hits += 1
+        self.server.prompt_tokens += prompt_tokens
+        self.server.completion_tokens += completion_tokens
+        per_output_token = self.options.get("per_output_token", 0.0)
+        time.sleep(self.latency + prompt_tokens * self.options.get("per_input_token", 0.0))
+
+        if request.get("stream"):
+            self._stream(request, content, per_output_token)
+            return
+
+        time.sleep(completion_tokens * per_output_token)
+        self._send_json({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+
+    def _stream(self, request, content: str, per_output_token: float):
+        """Send the completion as server-sent events, one chunk per word."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        for piece in re.findall(r"\S+\s*", content):
+            time.sleep(count_tokens(piece) * per_output_token)
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
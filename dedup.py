@@ -0,0 +1,168 @@
+import re
+import zlib
+from typing import List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+# Legal-entity and filler words that don't distinguish one employer from another
+COMPANY_STOPWORDS = {
+    "inc", "incorporated", "llc", "llp", "ltd", "limited", "corp", "corporation", "co", "company",
+    "plc", "gmbh", "ag", "sa", "pty", "the", "group", "holdings",
+}
+
+TITLE_ALIASES = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "mgr": "manager", "eng": "engineer",
+    "engr": "engineer", "dev": "developer", "swe": "software engineer", "ii": "2", "iii": "3", "iv": "4",
+}
+
+# Seniority words; two titles that differ in these (or in a grade number) are different jobs
+SENIORITY = {"senior", "junior", "lead", "principal", "staff", "head", "chief", "intern", "associate"}
+
+# Words that say nothing about the role itself
+TITLE_STOPWORDS = {"remote", "hybrid", "onsite", "on", "site", "the", "a", "an", "and", "of", "for", "in", "at", "m", "f", "d"}
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# MinHash parameters: 6 bands x 4 rows puts the LSH threshold near a Jaccard similarity of 0.64
+_NUM_HASHES = 24
+_BAND_ROWS = 4
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240501)
+_HASH_A = _rng.integers(1, _PRIME, _NUM_HASHES, dtype=np.int64)
+_HASH_B = _rng.integers(0, _PRIME, _NUM_HASHES, dtype=np.int64)
+
+
+def normalize_company(name) -> str:
+    words = _NON_WORD.sub(" ", str(name).lower()).split()
+    return " ".join(word for word in words if word not in COMPANY_STOPWORDS)
+
+
+def normalize_city(location) -> str:
+    """First component of a location ("Austin, TX" and "Austin, Travis County" -> "austin")."""
+    city = str(location).split(",")[0].lower().strip()
+    return "" if city in ("n/a", "nan", "none") else _NON_WORD.sub(" ", city).strip()
+
+
+def title_tokens(title) -> Set[str]:
+    tokens = set()
+    for word in _NON_WORD.sub(" ", str(title).lower()).split():
+        word = TITLE_ALIASES.get(word, word)
+        tokens.update(part for part in word.split() if part not in TITLE_STOPWORDS)
+    return tokens
+
+
+def _same_grade(a: Set[str], b: Set[str]) -> bool:
+    return ({t for t in a if t in SENIORITY or t.isdigit()} ==
+            {t for t in b if t in SENIORITY or t.isdigit()})
+
+
+def _minhash(token_sets: List[Set[str]]) -> np.ndarray:
+    """MinHash signatures (rows x _NUM_HASHES) for all token sets in one vectorized pass."""
+    lengths = np.fromiter((max(1, len(tokens)) for tokens in token_sets), dtype=np.int64, count=len(token_sets))
+    flat = np.fromiter(
+        (zlib.crc32(token.encode("utf-8")) for tokens in token_sets for token in (tokens or ("",))),
+        dtype=np.int64,
+        count=int(lengths.sum()),
+    )
+    hashed = (_HASH_A[:, None] * (flat[None, :] % _PRIME) + _HASH_B[:, None]) % _PRIME
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.minimum.reduceat(hashed, starts, axis=1).T
+
+
+def find_duplicates(titles, companies, locations, threshold: float = 0.7) -> np.ndarray:
+    """Map every row to the index of the row it duplicates (itself if it is unique).
+
+    Rows are candidates only when their normalized company and city match
+    (the blocking key) and they share a MinHash LSH bucket on title tokens;
+    candidates are then confirmed by exact Jaccard similarity >= threshold.
+    Each bucket is paired against its first member only, so the work stays
+    near-linear however large a bucket gets. Earlier rows win.
+    """
+    count = len(titles)
+    parent = np.arange(count)
+    if count < 2:
+        return parent
+
+    # Normalize and hash each distinct string once; listings repeat titles and employers a lot
+    title_codes, unique_titles = pd.factorize(np.asarray(titles, dtype=object).astype(str))
+    unique_tokens = [title_tokens(title) for title in unique_titles]
+    tokens = [unique_tokens[code] for code in title_codes]
+    signatures = _minhash(unique_tokens).astype(np.uint64)[title_codes]
+
+    company_codes, unique_companies = pd.factorize(np.asarray(companies, dtype=object).astype(str))
+    company_keys = np.array([normalize_company(company) for company in unique_companies], dtype=object)
+    city_codes, unique_cities = pd.factorize(np.asarray(locations, dtype=object).astype(str))
+    city_keys = np.array([normalize_city(location) for location in unique_cities], dtype=object)
+    blocks = pd.factorize(pd.Series(company_keys[company_codes] + "|" + city_keys[city_codes]))[0].astype(np.uint64)
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(_NUM_HASHES // _BAND_ROWS):
+        rows = signatures[:, band * _BAND_ROWS:(band + 1) * _BAND_ROWS]
+        # Fold block id and the band's rows into one bucket key (uint64 arithmetic wraps on purpose)
+        key = blocks * np.uint64(0x9E3779B97F4A7C15)
+        for column in range(_BAND_ROWS):
+            key = (key ^ rows[:, column]) * np.uint64(0x100000001B3)
+        order = np.argsort(key, kind="stable")
+        sorted_keys = key[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        first = np.repeat(order[starts], np.diff(np.r_[starts, count]))
+        paired = first != order
+        for i, j in zip(first[paired].tolist(), order[paired].tolist()):
+            if blocks[i] != blocks[j]:
+                continue
+            a, b = tokens[i], tokens[j]
+            if a == b or (_same_grade(a, b) and len(a & b) >= threshold * len(a | b)):
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    return np.array([find(i) for i in range(count)])
+
+
+def dedupe_jobs(jobs_df: pd.DataFrame, threshold: float = 0.7,
+                location_column: Optional[str] = "Location") -> pd.DataFrame:
+    """Drop near-duplicate postings (same role, company and city), keeping the first."""
+    if jobs_df.empty or 'Job Title' not in jobs_df.columns or 'Company' not in jobs_df.columns:
+        return jobs_df
+    if location_column in jobs_df.columns:
+        locations = jobs_df[location_column].tolist()
+    else:
+        locations = [""] * len(jobs_df)
+    representative = find_duplicates(jobs_df['Job Title'].tolist(), jobs_df['Company'].tolist(), locations, threshold)
+    return jobs_df[representative == np.arange(len(jobs_df))]
+
+
+class JobDeduper:
+    """dedupe_jobs for results that arrive in batches (a provider's pages as they come in).
+
+    add() returns the rows of a batch that duplicate neither an earlier row
+    of the batch nor any row added before, dropped ones included, so what
+    it returns can be appended to what is already shown. Rows are matched
+    as find_duplicates would match the batches concatenated in order.
+    """
+
+    def __init__(self, threshold: float = 0.7, location_column: Optional[str] = "Location"):
+        self.threshold = threshold
+        self.location_column = location_column
+        self._titles: List = []
+        self._companies: List = []
+        self._locations: List = []
+
+    def add(self, jobs_df: pd.DataFrame) -> pd.DataFrame:
+        if jobs_df.empty or 'Job Title' not in jobs_df.columns or 'Company' not in jobs_df.columns:
+            return jobs_df
+        start = len(self._titles)
+        self._titles.extend(jobs_df['Job Title'].tolist())
+        self._companies.extend(jobs_df['Company'].tolist())
+        if self.location_column in jobs_df.columns:
+            self._locations.extend(jobs_df[self.location_column].tolist())
+        else:
+            self._locations.extend([""] * len(jobs_df))
+        representative = find_duplicates(self._titles, self._companies, self._locations, self.threshold)
+        return jobs_df[representative[start:] == np.arange(start, len(self._titles))]
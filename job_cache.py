@@ -0,0 +1,175 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class JobResultCache:
+    """Disk-backed cache of provider result pages with stale-while-revalidate.
+
+    Pages are keyed on the normalized (search term, location, job type,
+    provider, page). Within `ttl` seconds a page is served as-is; for a further
+    `stale_ttl` seconds it is still served, but a background refresh is started.
+    The store is a SQLite file, so every Streamlit worker process on the host
+    shares it, and a refresh lease in the table keeps them from all refreshing
+    the same page at once.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None,
+                 stale_ttl: Optional[float] = None, lease: float = 60):
+        self.path = path or os.getenv("JOB_CACHE_PATH", os.path.join(".cache", "job_cache.sqlite3"))
+        self.ttl = float(os.getenv("JOB_CACHE_TTL", "3600")) if ttl is None else ttl
+        self.stale_ttl = float(os.getenv("JOB_CACHE_STALE_TTL", str(6 * 3600))) if stale_ttl is None else stale_ttl
+        self.lease = lease
+        self.counters = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0}
+
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="job-cache-refresh")
+        self._refresh_tasks = set()  # Strong references, so pending async refreshes aren't collected
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS job_pages ("
+                "key TEXT PRIMARY KEY, jobs TEXT NOT NULL, created REAL NOT NULL, refreshing REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS job_pages_created ON job_pages (created)")
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Job result cache disabled: {str(e)}")
+            self._db = None
+
+    @staticmethod
+    def make_key(search_term: str, location: str, job_type: Optional[str], provider: str, page: int) -> str:
+        """Normalize the query so trivially different spellings share an entry."""
+        def norm(value: Optional[str]) -> str:
+            return re.sub(r"\s+", " ", (value or "").strip().lower())
+
+        job_type = norm(job_type) or "any"
+        return json.dumps([norm(search_term), norm(location), job_type, provider, page])
+
+    def get(self, key: str) -> Tuple[Optional[List[Dict]], bool]:
+        """Return (jobs, is_fresh); jobs is None on a miss or an entry too old to serve."""
+        if self._db is None:
+            return None, False
+        try:
+            with self._lock:
+                row = self._db.execute("SELECT jobs, created FROM job_pages WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Job cache read error: {str(e)}")
+            return None, False
+        if not row:
+            return None, False
+        age = time.time() - row[1]
+        if age >= self.ttl + self.stale_ttl:
+            return None, False
+        return json.loads(row[0]), age < self.ttl
+
+    def put(self, key: str, jobs: List[Dict]):
+        if self._db is None:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO job_pages (key, jobs, created, refreshing) VALUES (?, ?, ?, NULL)",
+                    (key, json.dumps(jobs), now)
+                )
+                self._db.execute("DELETE FROM job_pages WHERE created < ?", (now - self.ttl - self.stale_ttl,))
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Job cache write error: {str(e)}")
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Optional[List[Dict]]]) -> Optional[List[Dict]]:
+        """Serve a page from the cache, fetching (or revalidating in the background) as needed.
+
+        `fetch` returns None on failure; failures are never cached.
+        """
+        jobs, fresh = self.get(key)
+        if jobs is not None:
+            with self._lock:
+                self.counters["fresh_hits" if fresh else "stale_hits"] += 1
+            if not fresh and self._claim_refresh(key):
+                self._refresher.submit(self._refresh, key, fetch)
+            return jobs
+
+        with self._lock:
+            self.counters["misses"] += 1
+        jobs = fetch()
+        if jobs is not None:
+            self.put(key, jobs)
+        return jobs
+
+    async def get_or_fetch_async(self, key: str,
+                                 fetch: Callable[[], Awaitable[Optional[List[Dict]]]]) -> Optional[List[Dict]]:
+        """get_or_fetch for a coroutine `fetch`; stale pages are revalidated in a task on the running loop."""
+        jobs, fresh = self.get(key)
+        if jobs is not None:
+            with self._lock:
+                self.counters["fresh_hits" if fresh else "stale_hits"] += 1
+            if not fresh and self._claim_refresh(key):
+                task = asyncio.ensure_future(self._refresh_async(key, fetch))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return jobs
+
+        with self._lock:
+            self.counters["misses"] += 1
+        jobs = await fetch()
+        if jobs is not None:
+            self.put(key, jobs)
+        return jobs
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+    def _claim_refresh(self, key: str) -> bool:
+        """Take the refresh lease for a stale page; only one process/thread wins it."""
+        now = time.time()
+        try:
+            with self._lock:
+                cursor = self._db.execute(
+                    "UPDATE job_pages SET refreshing = ? WHERE key = ? AND (refreshing IS NULL OR refreshing < ?)",
+                    (now, key, now - self.lease)
+                )
+                self._db.commit()
+                return cursor.rowcount == 1
+        except sqlite3.Error:
+            return False
+
+    def _refresh(self, key: str, fetch: Callable[[], Optional[List[Dict]]]):
+        jobs = fetch()
+        if jobs is not None:
+            self.put(key, jobs)
+            with self._lock:
+                self.counters["refreshes"] += 1
+
+    async def _refresh_async(self, key: str, fetch: Callable[[], Awaitable[Optional[List[Dict]]]]):
+        jobs = await fetch()
+        if jobs is not None:
+            self.put(key, jobs)
+            with self._lock:
+                self.counters["refreshes"] += 1
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_job_cache() -> JobResultCache:
+    """Process-wide job result cache."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = JobResultCache()
+        return _default_cache
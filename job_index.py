@@ -0,0 +1,258 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Multipliers that turn a salary quoted per period into a yearly figure
+ANNUAL = {"hour": 2080, "day": 260, "week": 52, "month": 12}
+
+# Provider job type spellings mapped to the app's filter values
+JOB_TYPES = {
+    "fulltime": "full-time", "permanent": "full-time",
+    "parttime": "part-time",
+    "contract": "contract", "contractor": "contract", "temporary": "contract",
+    "intern": "internship", "internship": "internship", "graduate": "internship",
+}
+
+COLUMNS = ("Job Title", "Company", "Location", "Job Type", "Salary", "Date Posted", "Apply Link", "Source")
+
+
+def normalize_job_type(job_type: Optional[str]) -> Optional[str]:
+    """Map "FULLTIME", "Full-time", "permanent" etc. to one of full-time/part-time/contract/internship."""
+    return JOB_TYPES.get(re.sub(r"[^a-z]", "", (job_type or "").lower()))
+
+
+def parse_salary(salary: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+    """Yearly (min, max) from a formatted salary such as "$50 - $70 per hour" or "Up to $90,000 yearly"."""
+    amounts = [float(amount.replace(",", "")) for amount in re.findall(r"\$([\d,]+(?:\.\d+)?)", salary or "")]
+    if not amounts:
+        return None, None
+    text = salary.lower()
+    factor = next((factor for period, factor in ANNUAL.items() if period in text), 1)
+    amounts = [amount * factor for amount in amounts]
+    if len(amounts) >= 2:
+        return amounts[0], amounts[1]
+    if text.startswith("up to"):
+        return None, amounts[0]
+    if "+" in text:
+        return amounts[0], None
+    return amounts[0], amounts[0]
+
+
+def parse_posted(date_posted: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Unix time of an ISO timestamp or an "N days ago" string; None if it can't be read."""
+    if not date_posted:
+        return None
+    now = time.time() if now is None else now
+    relative = re.match(r"(\d+)\s+(hour|day|week)s?\s+ago", date_posted.strip().lower())
+    if relative:
+        return now - int(relative.group(1)) * {"hour": 3600, "day": 86400, "week": 604800}[relative.group(2)]
+    try:
+        posted = datetime.fromisoformat(date_posted.strip())
+    except ValueError:
+        return None
+    if posted.tzinfo is None:
+        posted = posted.replace(tzinfo=timezone.utc)
+    return posted.timestamp()
+
+
+def _match_terms(text: Optional[str]) -> List[str]:
+    return [f'"{token}"' for token in re.findall(r"\w+", (text or "").lower())]
+
+
+def _match_query(search_term: Optional[str]) -> str:
+    """FTS5 query needing every word of the term, or of one alternative of a skills "A OR B" term."""
+    alternatives = [" ".join(terms) for terms in map(_match_terms, re.split(r"\s+OR\s+", search_term or "")) if terms]
+    if len(alternatives) <= 1:
+        return alternatives[0] if alternatives else ""
+    return " OR ".join(f"({alternative})" for alternative in alternatives)
+
+
+class JobIndex:
+    """Full-text index of every job the providers have returned, for answering searches locally.
+
+    Jobs are stored once per apply link (or title/company/location when
+    there is none) in a SQLite file (JOB_INDEX_PATH), with an FTS5 index
+    over title, company, location and the search terms and locations each
+    job was returned for, plus job type, yearly salary range and posting
+    date columns for filtering. Entries not seen from a provider within
+    `max_age` seconds are no longer served, and are deleted by the next add().
+    """
+
+    def __init__(self, path: Optional[str] = None, max_age: Optional[float] = None, candidates: int = 500):
+        self.path = path or os.getenv("JOB_INDEX_PATH", os.path.join(".cache", "job_index.sqlite3"))
+        self.max_age = float(os.getenv("JOB_INDEX_MAX_AGE", str(7 * 86400))) if max_age is None else max_age
+        self.candidates = candidates
+        self.counters = {"indexed": 0, "searches": 0, "expired": 0}
+
+        self._lock = threading.Lock()
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, apply_link TEXT,
+                    title TEXT, company TEXT, location TEXT, job_type TEXT, job_type_key TEXT,
+                    salary TEXT, salary_min REAL, salary_max REAL, date_posted TEXT, posted REAL,
+                    source TEXT, queries TEXT NOT NULL DEFAULT '', places TEXT NOT NULL DEFAULT '',
+                    indexed REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS jobs_indexed ON jobs (indexed);
+                CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+                    title, company, location, queries, places,
+                    content='jobs', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+                );
+                CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+                    INSERT INTO jobs_fts (rowid, title, company, location, queries, places)
+                    VALUES (new.id, new.title, new.company, new.location, new.queries, new.places);
+                END;
+                CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+                    INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location, queries, places)
+                    VALUES ('delete', old.id, old.title, old.company, old.location, old.queries, old.places);
+                END;
+                CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE ON jobs BEGIN
+                    INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location, queries, places)
+                    VALUES ('delete', old.id, old.title, old.company, old.location, old.queries, old.places);
+                    INSERT INTO jobs_fts (rowid, title, company, location, queries, places)
+                    VALUES (new.id, new.title, new.company, new.location, new.queries, new.places);
+                END;
+            """)
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Local job index disabled: {str(e)}")
+            self._db = None
+
+    def add(self, jobs: Iterable[Dict], search_term: str = "", location: str = ""):
+        """Insert or refresh normalized job records returned for a search."""
+        if self._db is None:
+            return
+        now = time.time()
+        query = re.sub(r"\s+", " ", (search_term or "").strip().lower())
+        place = re.sub(r"\s+", " ", (location or "").strip().lower())
+        rows = []
+        for job in jobs:
+            key = job.get("Apply Link")
+            if not key or key == "N/A":
+                key = "|".join(str(job.get(column, "")).strip().lower() for column in COLUMNS[:3])
+            salary_min, salary_max = parse_salary(job.get("Salary"))
+            rows.append((
+                key, job.get("Apply Link"), job.get("Job Title"), job.get("Company"), job.get("Location"), job.get("Job Type"),
+                normalize_job_type(job.get("Job Type")), job.get("Salary"), salary_min, salary_max,
+                job.get("Date Posted"), parse_posted(job.get("Date Posted"), now), job.get("Source"),
+                query, place, now
+            ))
+        if not rows:
+            return
+        try:
+            with self._lock:
+                # A job seen again keeps its row; the terms and places it was found for accumulate, compared as
+                # whole entries so that "java" is still added to a job first found for "javascript"
+                self._db.executemany("""
+                    INSERT INTO jobs (key, apply_link, title, company, location, job_type, job_type_key, salary, salary_min,
+                                      salary_max, date_posted, posted, source, queries, places, indexed)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        apply_link = excluded.apply_link, title = excluded.title, company = excluded.company, location = excluded.location,
+                        job_type = excluded.job_type, job_type_key = excluded.job_type_key,
+                        salary = excluded.salary, salary_min = excluded.salary_min, salary_max = excluded.salary_max,
+                        date_posted = excluded.date_posted, posted = COALESCE(excluded.posted, jobs.posted),
+                        source = excluded.source, indexed = excluded.indexed,
+                        queries = CASE WHEN instr(' | ' || jobs.queries || ' | ', ' | ' || excluded.queries || ' | ')
+                                            OR length(jobs.queries) > 500
+                                       THEN jobs.queries ELSE jobs.queries || ' | ' || excluded.queries END,
+                        places = CASE WHEN instr(' | ' || jobs.places || ' | ', ' | ' || excluded.places || ' | ')
+                                           OR length(jobs.places) > 500
+                                      THEN jobs.places ELSE jobs.places || ' | ' || excluded.places END
+                """, rows)
+                # Drop what can no longer be served so the file (and its FTS index) stops growing
+                expired = self._db.execute("DELETE FROM jobs WHERE indexed < ?", (now - self.max_age,)).rowcount
+                self._db.commit()
+                self.counters["indexed"] += len(rows)
+                self.counters["expired"] += expired
+        except sqlite3.Error as e:
+            print(f"Local job index write error: {str(e)}")
+
+    def search(self, search_term: str, location: Optional[str] = None, job_type: Optional[str] = None,
+               min_salary: Optional[float] = None, max_salary: Optional[float] = None,
+               posted_within_days: Optional[float] = None, limit: int = 20) -> List[Dict]:
+        """Indexed jobs matching every word of the search term (and of the location), best matches first.
+
+        A term of "A OR B" alternatives, as resume searches send, matches
+        jobs matching any one alternative.
+
+        Relevance (BM25) is ranked among the `candidates` matches first added
+        to the index most recently (a job seen again keeps its place), which
+        keeps common words fast on a large index.
+
+        Salary bounds are yearly and keep jobs whose range overlaps them;
+        jobs without a salary or posting date are dropped by those filters.
+        """
+        terms = _match_query(search_term)
+        if self._db is None or not terms:
+            return []
+        match = "{title company queries} : (" + terms + ")"
+        places = _match_terms(location)
+        if places:
+            match += " AND {location places} : (" + " ".join(places) + ")"
+
+        now = time.time()
+        conditions, params = ["jobs_fts MATCH ?", "jobs.indexed >= ?"], [match, now - self.max_age]
+        if normalize_job_type(job_type):
+            conditions.append("jobs.job_type_key = ?")
+            params.append(normalize_job_type(job_type))
+        if min_salary is not None:
+            conditions.append("COALESCE(jobs.salary_max, jobs.salary_min) >= ?")
+            params.append(min_salary)
+        if max_salary is not None:
+            conditions.append("COALESCE(jobs.salary_min, jobs.salary_max) <= ?")
+            params.append(max_salary)
+        if posted_within_days is not None:
+            conditions.append("jobs.posted >= ?")
+            params.append(now - posted_within_days * 86400)
+
+        try:
+            with self._lock:
+                # FTS5 streams matches newest rowid (first insert) first, so only the candidates are scored, not every match
+                rows = self._db.execute(
+                    "SELECT title, company, location, job_type, salary, date_posted, apply_link, source FROM ("
+                    "SELECT jobs.*, jobs_fts.rank AS score FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid "
+                    f"WHERE {' AND '.join(conditions)} ORDER BY jobs_fts.rowid DESC LIMIT ?"
+                    ") ORDER BY score LIMIT ?",
+                    (*params, max(limit, self.candidates), limit)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Local job index read error: {str(e)}")
+            return []
+        with self._lock:
+            self.counters["searches"] += 1
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def count(self) -> int:
+        if self._db is None:
+            return 0
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_default_job_index() -> JobIndex:
+    """Process-wide local job index."""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = JobIndex()
+        return _default_index
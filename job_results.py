@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from lazy_imports import LazyModule
+
+# The app imports this module at startup, before any results exist
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+ALL = "All"
+
+# Columns the results table can be filtered on
+FILTER_COLUMNS = ("Company", "Source")
+
+# Repetitive text columns stored as categoricals to keep session state small
+CATEGORY_COLUMNS = ("Company", "Location", "Job Type", "Source")
+
+
+class JobResults:
+    """One search's results, kept across Streamlit reruns and filtered locally.
+
+    The frame is stored compactly (repetitive columns as categoricals) with
+    the row positions of every company and source precomputed, so a filter
+    change is an index lookup and an intersection rather than another search.
+    """
+
+    def __init__(self, jobs_df: pd.DataFrame, label: str = ""):
+        jobs_df = jobs_df.reset_index(drop=True)
+        for column in CATEGORY_COLUMNS:
+            if column in jobs_df.columns:
+                jobs_df[column] = jobs_df[column].astype("category")
+        self.jobs_df = jobs_df
+        self.label = label
+        self.rows: Dict[str, Dict[str, np.ndarray]] = {
+            column: jobs_df.groupby(column, observed=True, sort=False).indices
+            for column in FILTER_COLUMNS if column in jobs_df.columns
+        }
+
+    def __len__(self) -> int:
+        return len(self.jobs_df)
+
+    def options(self, column: str) -> List[str]:
+        """Filter choices for a column: "All", then its values in order."""
+        return [ALL] + sorted(str(value) for value in self.rows.get(column, {}))
+
+    def filter(self, **selected: Optional[str]) -> pd.DataFrame:
+        """Rows matching every selected value, e.g. filter(Company="Acme", Source="All")."""
+        positions = None
+        for column, value in selected.items():
+            if value is None or value == ALL or column not in self.rows:
+                continue
+            matches = self.rows[column].get(value, np.empty(0, dtype=np.intp))
+            positions = matches if positions is None else np.intersect1d(positions, matches, assume_unique=True)
+        if positions is None:
+            return self.jobs_df
+        return self.jobs_df.iloc[np.sort(positions)]
@@ -1,29 +1,49 @@
+from __future__ import annotations
+
 import re
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import groq
 import os
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, Callable, Iterator, List, Dict, Optional, Tuple
 import streamlit as st
 import urllib.parse
 import time
 import random
 import json
-
-class JobSearcher:
-    def __init__(self, groq_api_key: str):
-        """Initialize the JobSearcher with Groq API key for skill extraction."""
-        self.groq_client = groq.Client(api_key=groq_api_key)
-
-        # API configurations
-        self.rapidapi_key = os.getenv("RAPIDAPI_KEY")  # For JSearch API
-        self.adzuna_app_id = os.getenv("ADZUNA_APP_ID")  # For Adzuna API
-        self.adzuna_app_key = os.getenv("ADZUNA_APP_KEY")  # For Adzuna API
-        
-    def extract_skills_from_resume(self, resume_text: str) -> List[str]:
-        """Extract relevant skills and keywords from resume text using AI."""
-        prompt = f"""
+import threading
+import contextvars
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from job_cache import JobResultCache, get_default_job_cache
+from job_index import JobIndex, get_default_job_index
+from lazy_imports import LazyModule
+from llm_cache import LLMCache, cached_chat, get_default_cache
+from prompt_compaction import prepare_resume
+from provider_transport import ProviderTransport, get_default_transport
+from singleflight import SingleFlight, get_default_flights
+from skills import MAX_SKILLS, extract_skills
+from telemetry import span
+
+if TYPE_CHECKING:
+    from dedup import JobDeduper
+
+# Loaded on first use, so importing this module doesn't hold up the app's first render
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+groq = LazyModule("groq")
+
+# Warnings raised inside a shared provider search, held for its callers to show; see JobSearcher._warn
+_search_notices: contextvars.ContextVar = contextvars.ContextVar("search_notices", default=None)
+
+# Called with the results so far each time a search's providers deliver more jobs
+ResultsCallback = Callable[["pd.DataFrame"], None]
+
+# Bump these whenever the matching prompt changes so stale cached answers are not reused
+SKILLS_PROMPT_VERSION = "skills-v1"
+RECOMMENDATIONS_PROMPT_VERSION = "recommendations-v1"
+
+
+def skills_messages(resume_text: str) -> List[Dict]:
+    """Chat messages asking for a comma-separated list of job search keywords."""
+    prompt = f"""
         Analyze the following resume and extract the most relevant skills, technologies, and keywords that would be useful for job searching. 
         Focus on:
         1. Technical skills (programming languages, frameworks, tools)
@@ -37,25 +57,161 @@ class JobSearcher:
         Resume content:
         {resume_text}
         """
+    return [
+        {"role": "system", "content": "You are an expert at extracting relevant job search keywords from resumes."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def parse_skills(skills_text: Optional[str]) -> List[str]:
+    """Split the model's comma-separated answer into at most MAX_SKILLS skills."""
+    if not skills_text:
+        return []
+    # Split by comma and clean up
+    skills = [skill.strip() for skill in skills_text.strip().split(',') if skill.strip()]
+    return skills[:MAX_SKILLS]
+
+
+def recommendation_messages(resume_text: str, target_role: Optional[str] = None) -> List[Dict]:
+    """Chat messages asking for five job search recommendations."""
+    prompt = f"""
+        Based on the following resume, provide 5 specific job search recommendations.
+        Focus on:
+        1. Specific job titles to search for
+        2. Companies or industries to target
+        3. Skills to highlight in applications
+        4. Keywords to use in job searches
+        
+        {f"The user is targeting: {target_role}" if target_role else ""}
         
+        Resume content:
+        {resume_text}
+        
+        Provide exactly 5 bullet points with actionable recommendations.
+        """
+    return [
+        {"role": "system", "content": "You are a career counselor providing job search advice."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def parse_recommendations(recommendations_text: Optional[str]) -> List[str]:
+    """Split the model's bullet list into at most five recommendations."""
+    if not recommendations_text:
+        return []
+    # Split into individual recommendations
+    lines = recommendations_text.strip().split('\n')
+    recommendations = [rec.strip() for rec in lines if rec.strip() and ('•' in rec or '-' in rec or rec.startswith(('1.', '2.', '3.', '4.', '5.')))]
+    return recommendations[:5]
+
+
+def with_script_context(fn):
+    """Wrap fn so Streamlit calls and telemetry spans made from a worker thread stay in the current session and trace."""
+    context = contextvars.copy_context()
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except Exception:
+        ctx = None
+
+    def run(*args, **kwargs):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        # A fresh copy per call: one Context can't be entered by two threads at once
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+
+class PageCursor:
+    """How far a provider's paginated search has read, so a top-up carries on where it stopped."""
+
+    def __init__(self):
+        self.next_page = 1
+        self.seen = set()
+        self.spare: List[Dict] = []  # Unique jobs read past the last target, handed out first next time
+        self.exhausted = False  # Short page, error or max_pages reached: nothing more to read
+
+
+class JobSearcher:
+    def __init__(self, groq_api_key: str, llm_cache: Optional[LLMCache] = None,
+                 transport: Optional[ProviderTransport] = None, job_cache: Optional[JobResultCache] = None,
+                 flights: Optional[SingleFlight] = None, job_index: Optional[JobIndex] = None):
+        """Initialize the JobSearcher with Groq API key for skill extraction."""
+        self.groq_api_key = groq_api_key
+        self._groq_client = None  # Built on first use, see groq_client
+        self._groq_lock = threading.Lock()
+        self.llm_cache = llm_cache or get_default_cache()
+        self.transport = transport or get_default_transport()  # Pooled HTTP session for job providers
+        self.job_cache = job_cache or get_default_job_cache()  # Provider result pages, shared on disk
+        self.flights = flights or get_default_flights()  # Identical searches in flight share one upstream call
+        self.job_index = job_index or get_default_job_index()  # Every job fetched, searchable offline
+
+        # API configurations
+        self.rapidapi_key = os.getenv("RAPIDAPI_KEY")  # For JSearch API
+        self.adzuna_app_id = os.getenv("ADZUNA_APP_ID")  # For Adzuna API
+        self.adzuna_app_key = os.getenv("ADZUNA_APP_KEY")  # For Adzuna API
+        # Overridable so a deployment (or a load test) can point at a proxy or stand-in
+        self.jsearch_url = os.getenv("JSEARCH_URL", "https://jsearch.p.rapidapi.com/search")
+        self.adzuna_url = os.getenv("ADZUNA_URL", "https://api.adzuna.com/v1/api/jobs")
+
+        # Deadline (seconds) for one search across all providers
+        self.search_timeout = float(os.getenv("JOB_SEARCH_TIMEOUT", "15"))
+        # Most result pages fetched from one provider per search
+        self.max_pages = int(os.getenv("JOB_SEARCH_MAX_PAGES", "5"))
+        # "live": always ask the providers; "local-first": answer from the job index when it has enough matches
+        self.search_mode = os.getenv("JOB_SEARCH_MODE", "live").lower()
+        # "local": taxonomy matcher, LLM only when it finds too little; "enrich": local + LLM; "llm": LLM only
+        self.skill_mode = os.getenv("SKILL_EXTRACTION_MODE", "local").lower()
+        self.min_local_skills = int(os.getenv("SKILL_MIN_LOCAL", "3"))
+        
+    @property
+    def groq_client(self):
+        """Groq client, created the first time it is needed."""
+        if self._groq_client is None:
+            with self._groq_lock:
+                if self._groq_client is None:
+                    self._groq_client = self._make_groq_client()
+        return self._groq_client
+
+    @groq_client.setter
+    def groq_client(self, client):
+        self._groq_client = client
+
+    def _make_groq_client(self):
+        return groq.Client(api_key=self.groq_api_key)
+
+    def extract_skills_from_resume(self, resume_text: str) -> List[str]:
+        """Extract relevant skills and keywords from resume text, locally first."""
+        with span("extract_skills", mode=self.skill_mode) as stage:
+            skills = [] if self.skill_mode == "llm" else extract_skills(resume_text)
+            stage.set(local_skills=len(skills))
+            if self.skill_mode == "local" and len(skills) >= self.min_local_skills:
+                return skills
+
+            # Enrichment or fallback: append the LLM's terms the taxonomy didn't already cover
+            seen = {skill.lower() for skill in skills}
+            for skill in self._extract_skills_with_llm(resume_text):
+                if skill.lower() not in seen:
+                    seen.add(skill.lower())
+                    skills.append(skill)
+            stage.set(skills=len(skills[:MAX_SKILLS]))
+            return skills[:MAX_SKILLS]
+
+    def _extract_skills_with_llm(self, resume_text: str) -> List[str]:
+        """Extract relevant skills and keywords from resume text using AI."""
+        resume_text = prepare_resume(resume_text, "skills")
         try:
-            response = self.groq_client.chat.completions.create(
+            skills_text = cached_chat(
+                self.groq_client,
+                self.llm_cache,
+                SKILLS_PROMPT_VERSION,
+                resume_text,
                 model="llama-3.3-70b-versatile",
-                messages=[
-                    {"role": "system", "content": "You are an expert at extracting relevant job search keywords from resumes."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=skills_messages(resume_text),
                 temperature=0.3,
                 max_tokens=200
             )
-            
-            skills_text = response.choices[0].message.content
-            if skills_text:
-                skills_text = skills_text.strip()
-                # Split by comma and clean up
-                skills = [skill.strip() for skill in skills_text.split(',') if skill.strip()]
-                return skills[:15]  # Limit to 15 skills
-            return []
+            return parse_skills(skills_text)
             
         except Exception as e:
             # Use print for non-Streamlit contexts
@@ -66,63 +222,63 @@ class JobSearcher:
             return []
     
     def search_jobs_by_resume(self, resume_text: str, location: str = "United States",
-                             results_wanted: int = 20, job_type: Optional[str] = None) -> pd.DataFrame:
-        """Search for jobs based on resume content."""
+                             results_wanted: int = 20, job_type: Optional[str] = None,
+                             skills: Optional[List[str]] = None, mode: Optional[str] = None,
+                             on_results: Optional[ResultsCallback] = None) -> pd.DataFrame:
+        """Search for jobs based on resume content (or skills already extracted from it)."""
         # Extract skills from resume
-        skills = self.extract_skills_from_resume(resume_text)
+        if not skills:
+            skills = self.extract_skills_from_resume(resume_text)
         
         if not skills:
-            try:
-                st.warning("Could not extract skills from resume. Please try manual search.")
-            except:
-                print("Could not extract skills from resume. Please try manual search.")
+            self._warn("Could not extract skills from resume. Please try manual search.")
             return pd.DataFrame()
         
         # Create search term from top skills
         search_term = " OR ".join(skills[:5])  # Use top 5 skills
         
-        return self.search_jobs(search_term, location, results_wanted, job_type)
+        # Providers return jobs in their own order; put the best matches for this resume first
+        from ranking import rank_jobs  # NumPy-based, loaded with the first search
+        with span("resume_search", skills=len(skills)):
+            jobs_df = self.search_jobs(search_term, location, results_wanted, job_type, mode,
+                                       on_results=on_results and (lambda jobs: on_results(rank_jobs(jobs, resume_text))))
+            with span("rank_jobs", jobs=len(jobs_df)):
+                return rank_jobs(jobs_df, resume_text)
     
     def search_jobs(self, search_term: str, location: str = "United States",
-                   results_wanted: int = 20, job_type: Optional[str] = None) -> pd.DataFrame:
-        """Search for jobs using real APIs (JSearch and Adzuna)."""
+                   results_wanted: int = 20, job_type: Optional[str] = None,
+                   mode: Optional[str] = None, on_results: Optional[ResultsCallback] = None) -> pd.DataFrame:
+        """Search for jobs using real APIs (JSearch and Adzuna), or the local job index first.
+
+        `mode` overrides JOB_SEARCH_MODE for this call: "local-first" returns
+        indexed jobs when there are at least `results_wanted` of them and only
+        queries the providers otherwise.
+
+        `on_results(jobs_df)` is called with the cleaned results so far each
+        time a provider page adds new jobs, so they can be shown before the
+        slower providers answer. It runs in the caller's own thread, for
+        callers that joined an identical search already running too.
+        """
         try:
-            with st.spinner("Searching for real job opportunities..."):
-                all_jobs = []
-
-                # Try JSearch API first (via RapidAPI)
-                if self.rapidapi_key:
-                    jsearch_jobs = self._search_jsearch_api(search_term, location, min(results_wanted, 10), job_type)
-                    all_jobs.extend(jsearch_jobs)
-
-                # Try Adzuna API as backup/additional source
-                if self.adzuna_app_id and self.adzuna_app_key and len(all_jobs) < results_wanted:
-                    remaining_results = results_wanted - len(all_jobs)
-                    adzuna_jobs = self._search_adzuna_api(search_term, location, min(remaining_results, 10), job_type)
-                    all_jobs.extend(adzuna_jobs)
-
-                # If no API keys available, fall back to sample data with warning
-                if not all_jobs:
-                    if not self.rapidapi_key and not (self.adzuna_app_id and self.adzuna_app_key):
-                        try:
-                            st.warning("⚠️ No API keys configured. Showing sample data. Please add RAPIDAPI_KEY or ADZUNA_APP_ID/ADZUNA_APP_KEY to .env file for real job data.")
-                        except:
-                            print("⚠️ No API keys configured. Showing sample data.")
-                    sample_jobs = self._generate_sample_jobs(search_term, location, results_wanted, job_type)
-                    all_jobs.extend(sample_jobs)
-
-                if not all_jobs:
-                    try:
-                        st.warning("No jobs found for the given criteria.")
-                    except:
-                        print("No jobs found for the given criteria.")
-                    return pd.DataFrame()
-
-                # Convert to DataFrame and clean
-                jobs_df = pd.DataFrame(all_jobs)
-                jobs_df = self._clean_job_data(jobs_df)
-
-                return jobs_df
+            local_df = self._search_local(search_term, location, results_wanted, job_type, mode)
+            if local_df is not None:
+                return local_df
+
+            with span("search_jobs", results_wanted=results_wanted) as stage, \
+                    st.spinner("Searching for real job opportunities..."):
+                # Sessions searching for the same thing at the same time share one run
+                (jobs_df, notices), shared = self.flights.do(
+                    self._search_key(search_term, location, results_wanted, job_type),
+                    lambda: self._shared_search(search_term, location, results_wanted, job_type),
+                    kind="search",
+                    # Every caller draws the partial results in its own session, on its own copy
+                    on_update=on_results and (lambda partial_df: on_results(partial_df.copy()))
+                )
+                stage.set(jobs=len(jobs_df), coalesced=shared)
+                for level, message in notices:
+                    self._warn(message, level)
+                # Callers may modify their results, so waiters get their own copy
+                return jobs_df.copy() if shared else jobs_df
 
         except Exception as e:
             try:
@@ -131,137 +287,382 @@ class JobSearcher:
                 print(f"Error searching for jobs: {str(e)}")
             return pd.DataFrame()
 
-    def _search_jsearch_api(self, search_term: str, location: str, results_wanted: int, job_type: Optional[str]) -> List[Dict]:
-        """Search jobs using JSearch API via RapidAPI."""
+    def _search_local(self, search_term: str, location: str, results_wanted: int, job_type: Optional[str],
+                      mode: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """Jobs from the local index in local-first mode, or None when the providers should be asked."""
+        if (mode or self.search_mode).lower() != "local-first":
+            return None
+        with span("local_search", results_wanted=results_wanted) as stage:
+            jobs = self.job_index.search(search_term, location, job_type, limit=results_wanted)
+            stage.set(jobs=len(jobs))
+        if len(jobs) < results_wanted:
+            return None
+        return pd.DataFrame(jobs)
+
+    def _index_jobs(self, jobs_df: pd.DataFrame, search_term: str, location: str):
+        """Keep provider results in the local job index for later local-first searches."""
+        with span("index_jobs", jobs=len(jobs_df)):
+            self.job_index.add(jobs_df.to_dict("records"), search_term, location)
+
+    def _search_key(self, search_term: str, location: str, results_wanted: int, job_type: Optional[str]) -> str:
+        """Single-flight key: the normalized query plus the provider setup that answers it."""
+        query = self.job_cache.make_key(search_term, location, job_type, "search", results_wanted)
+        return json.dumps([query, self.jsearch_url if self.rapidapi_key else None,
+                           self.adzuna_url if self.adzuna_app_id and self.adzuna_app_key else None,
+                           self.max_pages])
+
+    def _warn(self, message: str, level: str = "warning"):
+        """Show a search problem, or hold it for the callers if it happened inside a shared search."""
+        notices = _search_notices.get()
+        if notices is not None:
+            notices.append((level, message))
+            return
         try:
-            url = "https://jsearch.p.rapidapi.com/search"
+            getattr(st, level)(message)
+        except:
+            print(message)
+
+    def _shared_search(self, search_term: str, location: str, results_wanted: int,
+                       job_type: Optional[str]) -> Tuple[pd.DataFrame, List[Tuple[str, str]]]:
+        """_run_search as run once for all coalesced callers: its (level, message) warnings are returned
+        rather than drawn in the leader's session, so every caller shows them in its own."""
+        notices: List[Tuple[str, str]] = []
+        token = _search_notices.set(notices)
+        try:
+            return self._run_search(search_term, location, results_wanted, job_type), notices
+        finally:
+            _search_notices.reset(token)
 
-            querystring = {
-                "query": f"{search_term} {location}",
-                "page": "1",
-                "num_pages": "1",
-                "date_posted": "week"
-            }
+    def _run_search(self, search_term: str, location: str, results_wanted: int,
+                    job_type: Optional[str]) -> pd.DataFrame:
+        """Query all configured providers in parallel, cleaning and de-duplicating each page as it arrives.
 
-            # Add job type filter if specified
-            if job_type and job_type.lower() != "any":
-                employment_types = {
-                    "full-time": "FULLTIME",
-                    "part-time": "PARTTIME",
-                    "contract": "CONTRACTOR",
-                    "internship": "INTERN"
-                }
-                if job_type.lower() in employment_types:
-                    querystring["employment_types"] = employment_types[job_type.lower()]
+        The results so far are published to the search's callers after every page that adds jobs.
+        """
+        from dedup import JobDeduper  # NumPy-based, loaded with the first search
+        deduper = JobDeduper()
+        batches = []
+        for jobs in self._stream_providers(search_term, location, results_wanted, job_type):
+            # Only a page's new, unique jobs are cleaned and added; earlier pages are left as they are
+            batch = self._clean_job_data(pd.DataFrame(jobs), deduper)
+            if batch.empty:
+                continue
+            batches.append(batch)
+            self.flights.publish(self._merge_batches(batches).head(results_wanted))
+
+        if batches:
+            jobs_df = self._merge_batches(batches)
+            self._index_jobs(jobs_df, search_term, location)
+            # Trim after de-duplication so duplicates don't eat into the budget
+            return jobs_df.head(results_wanted)
+
+        # If no API keys available, fall back to sample data with warning
+        if not self.rapidapi_key and not (self.adzuna_app_id and self.adzuna_app_key):
+            self._warn("⚠️ No API keys configured. Showing sample data. Please add RAPIDAPI_KEY or ADZUNA_APP_ID/ADZUNA_APP_KEY to .env file for real job data.")
+        sample_jobs = self._generate_sample_jobs(search_term, location, results_wanted, job_type)
+
+        if not sample_jobs:
+            self._warn("No jobs found for the given criteria.")
+            return pd.DataFrame()
 
-            headers = {
-                "x-rapidapi-key": self.rapidapi_key,
-                "x-rapidapi-host": "jsearch.p.rapidapi.com"
-            }
+        return self._clean_job_data(pd.DataFrame(sample_jobs)).head(results_wanted)
 
-            response = requests.get(url, headers=headers, params=querystring, timeout=10)
+    def _merge_batches(self, batches: List[pd.DataFrame]) -> pd.DataFrame:
+        """One table of every cleaned batch so far, newest postings first."""
+        jobs_df = pd.concat(batches, ignore_index=True)
+        if 'Date Posted' in jobs_df.columns:
+            jobs_df = jobs_df.sort_values('Date Posted', ascending=False, kind='stable')
+        return jobs_df.reset_index(drop=True)
 
-            if response.status_code == 200:
-                data = response.json()
-                jobs = []
-
-                if "data" in data and data["data"]:
-                    for job in data["data"][:results_wanted]:
-                        job_data = {
-                            "Job Title": job.get("job_title", "N/A"),
-                            "Company": job.get("employer_name", "N/A"),
-                            "Location": f"{job.get('job_city', '')}, {job.get('job_state', '')}".strip(", "),
-                            "Job Type": job.get("job_employment_type", "N/A"),
-                            "Salary": self._format_salary_jsearch(job),
-                            "Date Posted": job.get("job_posted_at_datetime_utc", "N/A"),
-                            "Apply Link": job.get("job_apply_link", "N/A"),
-                            "Source": "JSearch API"
-                        }
-                        jobs.append(job_data)
-
-                return jobs
-            else:
-                try:
-                    st.warning(f"JSearch API returned status code: {response.status_code}")
-                except:
-                    print(f"JSearch API returned status code: {response.status_code}")
-                return []
+    def _stream_providers(self, search_term: str, location: str, results_wanted: int,
+                          job_type: Optional[str]) -> Iterator[List[Dict]]:
+        """Fan a search out to every configured provider and yield each page of jobs as it arrives.
 
-        except Exception as e:
+        The budget is split evenly between the providers. If one comes up
+        short, the others that still have pages are asked for the difference,
+        carrying on from where they stopped. Pages that arrive after the
+        search deadline are dropped.
+        """
+        providers = []
+        if self.rapidapi_key:
+            providers.append(("JSearch API", self._iter_jsearch_jobs))
+        if self.adzuna_app_id and self.adzuna_app_key:
+            providers.append(("Adzuna API", self._iter_adzuna_jobs))
+        if not providers:
+            return
+
+        # (provider, page of jobs | error | None once the provider is done)
+        pages: queue.Queue = queue.Queue()
+
+        cursors = {name: PageCursor() for name, _ in providers}
+        found = {name: 0 for name, _ in providers}
+
+        def run_provider(name: str, search: Callable, wanted: int) -> None:
             try:
-                st.warning(f"JSearch API error: {str(e)}")
-            except:
-                print(f"JSearch API error: {str(e)}")
-            return []
+                with span("provider_search", labels={"provider": name}) as stage:
+                    count = 0
+                    for jobs in search(search_term, location, wanted, job_type, cursors[name]):
+                        count += len(jobs)
+                        stage.set(jobs=count)
+                        pages.put((name, jobs))
+            except Exception as e:
+                cursors[name].exhausted = True
+                pages.put((name, e))
+            finally:
+                pages.put((name, None))
+
+        executor = ThreadPoolExecutor(max_workers=len(providers), thread_name_prefix="job-search")
+        deadline = time.monotonic() + self.search_timeout
+        pending: List[str] = []
+        round_providers, wanted = providers, results_wanted
+        try:
+            while round_providers and wanted > 0:
+                share = -(-wanted // len(round_providers))
+                for name, search in round_providers:
+                    executor.submit(with_script_context(run_provider), name, search, share)
+                pending = [name for name, _ in round_providers]
+                while pending:
+                    try:
+                        name, item = pages.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        pending.remove(name)
+                    elif isinstance(item, Exception):
+                        self._warn(f"{name} error: {str(item)}")
+                    else:
+                        found[name] += len(item)
+                        yield item
+                if pending:
+                    break
+                # Top up a shortfall from the providers that still have pages
+                wanted = results_wanted - sum(found.values())
+                round_providers = [(name, search) for name, search in providers if not cursors[name].exhausted]
+        finally:
+            # Don't block on a provider that missed the deadline; its request times out on its own
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        for name in pending:
+            self._warn(f"{name} did not respond within {self.search_timeout:g}s. Showing partial results.")
+
+    def _iter_pages(self, fetch_page: Callable[[int], Optional[List[Dict]]], results_wanted: int,
+                    per_page: int, cursor: Optional[PageCursor] = None) -> Iterator[List[Dict]]:
+        """Yield a provider's new unique jobs page by page until results_wanted more are collected.
+
+        The pages expected to be needed are fetched in parallel; if duplicates
+        leave us short, another wave is fetched, up to the max_pages budget.
+        Pass the cursor of an earlier call to continue after its last page.
+        fetch_page returns None on an error it has already reported.
+        """
+        cursor = cursor or PageCursor()
+        collected = 0
+        if cursor.spare:
+            jobs, cursor.spare = cursor.spare[:results_wanted], cursor.spare[results_wanted:]
+            collected += len(jobs)
+            yield jobs
+        executor = ThreadPoolExecutor(max_workers=self.max_pages, thread_name_prefix="job-pages")
+        try:
+            while collected < results_wanted and not cursor.exhausted:
+                if cursor.next_page > self.max_pages:
+                    cursor.exhausted = True
+                    return
+                wave = min(self.max_pages - cursor.next_page + 1, -(-(results_wanted - collected) // per_page))
+                futures = [(page, executor.submit(with_script_context(fetch_page), page))
+                           for page in range(cursor.next_page, cursor.next_page + wave)]
+
+                for page, future in futures:
+                    cursor.next_page = page + 1
+                    jobs = future.result()
+                    if jobs is None:
+                        cursor.exhausted = True
+                        return
+                    new_jobs = []
+                    for job in jobs:
+                        key = (job.get("Job Title"), job.get("Company"))
+                        if key not in cursor.seen:
+                            cursor.seen.add(key)
+                            new_jobs.append(job)
+                    taken = new_jobs[:results_wanted - collected]
+                    cursor.spare.extend(new_jobs[len(taken):])
+                    collected += len(taken)
+                    if taken:
+                        yield taken
+                    # A short page is the last one; stop as soon as we have enough
+                    if len(jobs) < per_page:
+                        cursor.exhausted = True
+                        return
+                    if collected >= results_wanted:
+                        return
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
-    def _search_adzuna_api(self, search_term: str, location: str, results_wanted: int, job_type: Optional[str]) -> List[Dict]:
-        """Search jobs using Adzuna API."""
+    def _search_jsearch_api(self, search_term: str, location: str, results_wanted: int, job_type: Optional[str]) -> List[Dict]:
+        """Search jobs using JSearch API via RapidAPI, reading as many pages as needed."""
+        return [job for page_jobs in self._iter_jsearch_jobs(search_term, location, results_wanted, job_type)
+                for job in page_jobs]
+
+    def _iter_jsearch_jobs(self, search_term: str, location: str, results_wanted: int,
+                           job_type: Optional[str], cursor: Optional[PageCursor] = None) -> Iterator[List[Dict]]:
+        """JSearch API jobs, a page at a time as each page arrives."""
+        return self._iter_pages(
+            lambda page: self.job_cache.get_or_fetch(
+                self.job_cache.make_key(search_term, location, job_type, "JSearch API", page),
+                lambda: self._fetch_jsearch_page(search_term, location, job_type, page)
+            ),
+            results_wanted,
+            per_page=10,
+            cursor=cursor
+        )
+
+    def _fetch_jsearch_page(self, search_term: str, location: str, job_type: Optional[str], page: int) -> Optional[List[Dict]]:
+        """Fetch one page (10 jobs) from the JSearch API."""
         try:
-            # Convert location to country code (simplified)
-            country = "us"  # Default to US
-            if "uk" in location.lower() or "united kingdom" in location.lower():
-                country = "gb"
-            elif "canada" in location.lower():
-                country = "ca"
-            elif "australia" in location.lower():
-                country = "au"
-
-            url = f"https://api.adzuna.com/v1/api/jobs/{country}/search/1"
-
-            params = {
-                "app_id": self.adzuna_app_id,
-                "app_key": self.adzuna_app_key,
-                "results_per_page": min(results_wanted, 20),
-                "what": search_term,
-                "where": location,
-                "sort_by": "date"
-            }
+            url, headers, querystring = self._jsearch_request(search_term, location, job_type, page)
+            response = self.transport.get("JSearch API", url, headers=headers, params=querystring)
 
-            # Add job type filter if specified
-            if job_type and job_type.lower() != "any":
-                job_type_mapping = {
-                    "full-time": "permanent",
-                    "part-time": "part_time",
-                    "contract": "contract",
-                    "internship": "graduate"
+            if response.status_code == 200:
+                return self._parse_jsearch_page(response.json())
+            else:
+                self._warn(f"JSearch API returned status code: {response.status_code}")
+                return None
+
+        except Exception as e:
+            self._warn(f"JSearch API error: {str(e)}")
+            return None
+
+    def _jsearch_request(self, search_term: str, location: str, job_type: Optional[str], page: int):
+        """URL, headers and query string for one JSearch page."""
+        querystring = {
+            "query": f"{search_term} {location}",
+            "page": str(page),
+            "num_pages": "1",
+            "date_posted": "week"
+        }
+
+        # Add job type filter if specified
+        if job_type and job_type.lower() != "any":
+            employment_types = {
+                "full-time": "FULLTIME",
+                "part-time": "PARTTIME",
+                "contract": "CONTRACTOR",
+                "internship": "INTERN"
+            }
+            if job_type.lower() in employment_types:
+                querystring["employment_types"] = employment_types[job_type.lower()]
+
+        headers = {
+            "x-rapidapi-key": self.rapidapi_key,
+            "x-rapidapi-host": "jsearch.p.rapidapi.com"
+        }
+        return self.jsearch_url, headers, querystring
+
+    def _parse_jsearch_page(self, data: Dict) -> List[Dict]:
+        """Normalize a JSearch response body into job records."""
+        jobs = []
+        if "data" in data and data["data"]:
+            for job in data["data"]:
+                job_data = {
+                    "Job Title": job.get("job_title", "N/A"),
+                    "Company": job.get("employer_name", "N/A"),
+                    "Location": f"{job.get('job_city', '')}, {job.get('job_state', '')}".strip(", "),
+                    "Job Type": job.get("job_employment_type", "N/A"),
+                    "Salary": self._format_salary_jsearch(job),
+                    "Date Posted": job.get("job_posted_at_datetime_utc", "N/A"),
+                    "Apply Link": job.get("job_apply_link", "N/A"),
+                    "Source": "JSearch API"
                 }
-                if job_type.lower() in job_type_mapping:
-                    params["category"] = job_type_mapping[job_type.lower()]
+                jobs.append(job_data)
+        return jobs
 
-            response = requests.get(url, params=params, timeout=10)
+    def _search_adzuna_api(self, search_term: str, location: str, results_wanted: int, job_type: Optional[str]) -> List[Dict]:
+        """Search jobs using Adzuna API, reading as many pages as needed."""
+        return [job for page_jobs in self._iter_adzuna_jobs(search_term, location, results_wanted, job_type)
+                for job in page_jobs]
+
+    def _iter_adzuna_jobs(self, search_term: str, location: str, results_wanted: int,
+                          job_type: Optional[str], cursor: Optional[PageCursor] = None) -> Iterator[List[Dict]]:
+        """Adzuna API jobs, a page at a time as each page arrives."""
+        # Fixed page size, so a cached page means the same thing whatever the budget
+        per_page = 20
+        return self._iter_pages(
+            lambda page: self.job_cache.get_or_fetch(
+                self.job_cache.make_key(search_term, location, job_type, "Adzuna API", page),
+                lambda: self._fetch_adzuna_page(search_term, location, job_type, page, per_page)
+            ),
+            results_wanted,
+            per_page=per_page,
+            cursor=cursor
+        )
+
+    def _fetch_adzuna_page(self, search_term: str, location: str, job_type: Optional[str], page: int,
+                           per_page: int) -> Optional[List[Dict]]:
+        """Fetch one page of results from the Adzuna API."""
+        try:
+            url, params = self._adzuna_request(search_term, location, job_type, page, per_page)
+            response = self.transport.get("Adzuna API", url, params=params)
 
             if response.status_code == 200:
-                data = response.json()
-                jobs = []
-
-                if "results" in data:
-                    for job in data["results"]:
-                        job_data = {
-                            "Job Title": job.get("title", "N/A"),
-                            "Company": job.get("company", {}).get("display_name", "N/A"),
-                            "Location": f"{job.get('location', {}).get('display_name', 'N/A')}",
-                            "Job Type": job.get("contract_type", "N/A"),
-                            "Salary": self._format_salary_adzuna(job),
-                            "Date Posted": job.get("created", "N/A"),
-                            "Apply Link": job.get("redirect_url", "N/A"),
-                            "Source": "Adzuna API"
-                        }
-                        jobs.append(job_data)
-
-                return jobs
+                return self._parse_adzuna_page(response.json())
             else:
-                try:
-                    st.warning(f"Adzuna API returned status code: {response.status_code}")
-                except:
-                    print(f"Adzuna API returned status code: {response.status_code}")
-                return []
+                self._warn(f"Adzuna API returned status code: {response.status_code}")
+                return None
 
         except Exception as e:
-            try:
-                st.warning(f"Adzuna API error: {str(e)}")
-            except:
-                print(f"Adzuna API error: {str(e)}")
-            return []
+            self._warn(f"Adzuna API error: {str(e)}")
+            return None
+
+    def _adzuna_request(self, search_term: str, location: str, job_type: Optional[str], page: int,
+                        per_page: int):
+        """URL and query parameters for one Adzuna page."""
+        # Convert location to country code (simplified)
+        country = "us"  # Default to US
+        if "uk" in location.lower() or "united kingdom" in location.lower():
+            country = "gb"
+        elif "canada" in location.lower():
+            country = "ca"
+        elif "australia" in location.lower():
+            country = "au"
+
+        url = f"{self.adzuna_url}/{country}/search/{page}"
+
+        params = {
+            "app_id": self.adzuna_app_id,
+            "app_key": self.adzuna_app_key,
+            "results_per_page": per_page,
+            "what": search_term,
+            "where": location,
+            "sort_by": "date"
+        }
+
+        # Add job type filter if specified
+        if job_type and job_type.lower() != "any":
+            job_type_mapping = {
+                "full-time": "permanent",
+                "part-time": "part_time",
+                "contract": "contract",
+                "internship": "graduate"
+            }
+            if job_type.lower() in job_type_mapping:
+                params["category"] = job_type_mapping[job_type.lower()]
+        return url, params
+
+    def _parse_adzuna_page(self, data: Dict) -> List[Dict]:
+        """Normalize an Adzuna response body into job records."""
+        jobs = []
+        if "results" in data:
+            for job in data["results"]:
+                job_data = {
+                    "Job Title": job.get("title", "N/A"),
+                    "Company": job.get("company", {}).get("display_name", "N/A"),
+                    "Location": f"{job.get('location', {}).get('display_name', 'N/A')}",
+                    "Job Type": job.get("contract_type", "N/A"),
+                    "Salary": self._format_salary_adzuna(job),
+                    "Date Posted": job.get("created", "N/A"),
+                    "Apply Link": job.get("redirect_url", "N/A"),
+                    "Source": "Adzuna API"
+                }
+                jobs.append(job_data)
+        return jobs
 
     def _format_salary_jsearch(self, job: Dict) -> str:
         """Format salary from JSearch API response."""
@@ -353,62 +754,115 @@ class JobSearcher:
 
         return sample_jobs
     
-    def _clean_job_data(self, jobs_df: pd.DataFrame) -> pd.DataFrame:
-        """Clean and format job data for display."""
-        try:
-            # Select and rename columns for better display
-            display_columns = {
-                'title': 'Job Title',
-                'company': 'Company',
-                'location': 'Location',
-                'job_type': 'Job Type',
-                'salary': 'Salary',
-                'date_posted': 'Date Posted',
-                'job_url': 'Apply Link',
-                'site': 'Source'
-            }
+    def _clean_job_data(self, jobs_df: pd.DataFrame, deduper: Optional[JobDeduper] = None) -> pd.DataFrame:
+        """Clean and format job data for display.
+
+        With a `deduper`, jobs already seen by it in earlier batches are dropped as well.
+        """
+        with span("clean_job_data", rows=len(jobs_df)) as stage:
+            try:
+                # Select and rename columns for better display
+                display_columns = {
+                    'title': 'Job Title',
+                    'company': 'Company',
+                    'location': 'Location',
+                    'job_type': 'Job Type',
+                    'salary': 'Salary',
+                    'date_posted': 'Date Posted',
+                    'job_url': 'Apply Link',
+                    'site': 'Source'
+                }
             
-            # Create salary column from min/max amounts or use existing salary
-            if 'Salary' not in jobs_df.columns:
-                if 'min_amount' in jobs_df.columns and 'max_amount' in jobs_df.columns:
-                    jobs_df['salary'] = jobs_df.apply(self._format_salary, axis=1)
-                else:
-                    jobs_df['salary'] = 'Not specified'
+                # Create salary column from min/max amounts or use existing salary
+                if 'Salary' not in jobs_df.columns:
+                    if 'min_amount' in jobs_df.columns and 'max_amount' in jobs_df.columns:
+                        jobs_df['salary'] = self._format_salary_column(jobs_df)
+                    else:
+                        jobs_df['salary'] = 'Not specified'
             
-            # Handle location column
-            if 'city' in jobs_df.columns and 'state' in jobs_df.columns:
-                jobs_df['location'] = jobs_df.apply(
-                    lambda row: f"{row.get('city', '')}, {row.get('state', '')}".strip(', '), 
-                    axis=1
-                )
+                # Handle location column: "City, State" with stray separators trimmed
+                if 'city' in jobs_df.columns and 'state' in jobs_df.columns:
+                    city = jobs_df['city'].to_numpy(dtype=object).astype(str)
+                    state = jobs_df['state'].to_numpy(dtype=object).astype(str)
+                    jobs_df['location'] = pd.Series(
+                        np.char.strip(np.char.add(np.char.add(city, ', '), state), ', '),
+                        index=jobs_df.index, dtype=object
+                    )
             
-            # Select available columns
-            available_columns = {}
-            for old_col, new_col in display_columns.items():
-                if old_col in jobs_df.columns:
-                    available_columns[old_col] = new_col
+                # Select available columns
+                available_columns = {}
+                for old_col, new_col in display_columns.items():
+                    if old_col in jobs_df.columns:
+                        available_columns[old_col] = new_col
             
-            # Rename columns
-            jobs_df = jobs_df.rename(columns=available_columns)
+                # Rename columns
+                jobs_df = jobs_df.rename(columns=available_columns)
             
-            # Select only the renamed columns that exist
-            final_columns = [col for col in display_columns.values() if col in jobs_df.columns]
-            jobs_df = jobs_df[final_columns]
+                # Select only the renamed columns that exist
+                final_columns = [col for col in display_columns.values() if col in jobs_df.columns]
+                jobs_df = jobs_df[final_columns]
             
-            # Remove duplicates based on job title and company
-            if 'Job Title' in jobs_df.columns and 'Company' in jobs_df.columns:
-                jobs_df = jobs_df.drop_duplicates(subset=['Job Title', 'Company'])
+                # Remove duplicates: same role at the same company and city, even across providers
+                from dedup import dedupe_jobs  # NumPy-based, loaded with the first search
+                jobs_df = deduper.add(jobs_df) if deduper is not None else dedupe_jobs(jobs_df)
             
-            # Sort by date if available
-            if 'Date Posted' in jobs_df.columns:
-                jobs_df = jobs_df.sort_values('Date Posted', ascending=False)
+                # Sort by date if available
+                if 'Date Posted' in jobs_df.columns:
+                    jobs_df = jobs_df.sort_values('Date Posted', ascending=False)
             
-            return jobs_df.reset_index(drop=True)
+                stage.set(jobs=len(jobs_df))
+                return jobs_df.reset_index(drop=True)
             
-        except Exception as e:
-            st.error(f"Error cleaning job data: {str(e)}")
-            return jobs_df
+            except Exception as e:
+                self._warn(f"Error cleaning job data: {str(e)}", "error")
+                return jobs_df
     
+    def _format_salary_column(self, jobs_df: pd.DataFrame) -> pd.Series:
+        """Vectorized _format_salary over a whole frame; same strings, no per-row Python calls."""
+        min_col, max_col = jobs_df['min_amount'], jobs_df['max_amount']
+        if not (pd.api.types.is_numeric_dtype(min_col) and pd.api.types.is_numeric_dtype(max_col)):
+            # Strings and mixed objects have per-value parsing rules; keep the row-wise path for them
+            return jobs_df.apply(self._format_salary, axis=1)
+
+        min_amount = min_col.to_numpy(dtype=float, na_value=np.nan)
+        max_amount = max_col.to_numpy(dtype=float, na_value=np.nan)
+        if 'interval' in jobs_df.columns:
+            interval = jobs_df['interval'].to_numpy(dtype=object).astype(str)
+        else:
+            interval = np.full(len(jobs_df), 'yearly')
+
+        has_min, has_max = ~np.isnan(min_amount), ~np.isnan(max_amount)
+        # int(inf) raises in _format_salary, which makes the whole row 'Not specified'
+        invalid = (has_min & np.isinf(min_amount)) | (has_max & np.isinf(max_amount))
+
+        def dollars(amounts: np.ndarray, mask: np.ndarray) -> np.ndarray:
+            # Format each distinct amount once; salaries repeat a lot across listings
+            out = np.full(len(amounts), '', dtype=object)
+            valid = mask & ~invalid
+            if valid.any():
+                unique, inverse = np.unique(np.trunc(amounts[valid]).astype(np.int64), return_inverse=True)
+                out[valid] = np.array([f"${amount:,}" for amount in unique], dtype=object)[inverse]
+            return out.astype(str)
+
+        low, high = dollars(min_amount, has_min), dollars(max_amount, has_max)
+        suffix = np.char.add(' ', interval)
+        result = np.select(
+            [
+                (~has_min & ~has_max) | invalid,
+                has_min & has_max & (min_amount == max_amount),
+                has_min & has_max,
+                has_min,
+            ],
+            [
+                'Not specified',
+                np.char.add(low, suffix),
+                np.char.add(np.char.add(np.char.add(low, ' - '), high), suffix),
+                np.char.add(np.char.add(low, '+'), suffix),
+            ],
+            default=np.char.add(np.char.add('Up to ', high), suffix),
+        )
+        return pd.Series(result, index=jobs_df.index, dtype=object)
+
     def _format_salary(self, row) -> str:
         """Format salary information from min/max amounts."""
         try:
@@ -437,40 +891,20 @@ class JobSearcher:
     
     def get_job_recommendations(self, resume_text: str, target_role: Optional[str] = None) -> List[str]:
         """Get job search recommendations based on resume analysis."""
-        prompt = f"""
-        Based on the following resume, provide 5 specific job search recommendations.
-        Focus on:
-        1. Specific job titles to search for
-        2. Companies or industries to target
-        3. Skills to highlight in applications
-        4. Keywords to use in job searches
-        
-        {f"The user is targeting: {target_role}" if target_role else ""}
-        
-        Resume content:
-        {resume_text}
-        
-        Provide exactly 5 bullet points with actionable recommendations.
-        """
-        
+        resume_text = prepare_resume(resume_text, "recommendations")
         try:
-            response = self.groq_client.chat.completions.create(
+            recommendations_text = cached_chat(
+                self.groq_client,
+                self.llm_cache,
+                RECOMMENDATIONS_PROMPT_VERSION,
+                resume_text,
                 model="llama-3.3-70b-versatile",
-                messages=[
-                    {"role": "system", "content": "You are a career counselor providing job search advice."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=recommendation_messages(resume_text, target_role),
                 temperature=0.7,
-                max_tokens=400
+                max_tokens=400,
+                target_role=target_role
             )
-            
-            recommendations_text = response.choices[0].message.content
-            if recommendations_text:
-                recommendations_text = recommendations_text.strip()
-                # Split into individual recommendations
-                recommendations = [rec.strip() for rec in recommendations_text.split('\n') if rec.strip() and ('•' in rec or '-' in rec or rec.startswith(('1.', '2.', '3.', '4.', '5.')))]
-                return recommendations[:5]
-            return []
+            return parse_recommendations(recommendations_text)
             
         except Exception as e:
             try:
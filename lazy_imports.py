@@ -0,0 +1,45 @@
+import importlib
+import threading
+from typing import Callable, Union
+
+
+class LazyModule:
+    """Stand-in for a module that is only imported when one of its attributes is first used.
+
+    Lets modules on the app's startup path refer to pandas, numpy, PyPDF2 or
+    requests as usual (`pd.DataFrame(...)`) without paying their import time
+    before the first render. Modules using one in annotations need
+    `from __future__ import annotations` so the annotations aren't evaluated.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute: str):
+        module = self._module
+        if module is None:
+            # The import lock makes concurrent first uses import the module once
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attribute)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r}{' (loaded)' if self._module is not None else ''}>"
+
+
+def warm_up(*targets: Union[str, Callable[[], object]]) -> threading.Thread:
+    """Import modules (given by name) and run callables in a background thread.
+
+    Used after the first render so the first search or analysis finds its
+    libraries and clients already loaded. Failures are printed, not raised.
+    """
+    def run():
+        for target in targets:
+            try:
+                importlib.import_module(target) if isinstance(target, str) else target()
+            except Exception as e:
+                print(f"Warm-up of {getattr(target, '__name__', target)} failed: {str(e)}")
+
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,349 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from rate_limit import get_default_governor
+from singleflight import get_default_flights
+from telemetry import get_default_telemetry, span
+
+
+class LLMCache:
+    """Two-tier cache for LLM responses: an in-process LRU in front of a SQLite file.
+
+    Entries are keyed on the normalized resume text hash plus everything that
+    changes the model output (prompt template version, model, temperature,
+    max_tokens and any other prompt variables such as the target role).
+    """
+
+    def __init__(self, path: Optional[str] = None, memory_items: int = 256,
+                 ttl: float = 7 * 24 * 3600, max_bytes: int = 50 * 1024 * 1024):
+        self.path = path or os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3"))
+        self.memory_items = memory_items
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, "
+                "accessed REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed)")
+            self._db.commit()
+        except sqlite3.Error as e:
+            # Read-only filesystems etc. - keep working with the memory tier only
+            print(f"LLM disk cache disabled: {str(e)}")
+            self._db = None
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Collapse whitespace so re-extracted copies of the same resume hash equally."""
+        return re.sub(r"\s+", " ", text or "").strip()
+
+    def make_key(self, resume_text: str, prompt_version: str, model: str,
+                 temperature: float, max_tokens: Optional[int] = None, **extra) -> str:
+        """Build the cache key for one LLM call."""
+        resume_hash = hashlib.sha256(self.normalize(resume_text).encode("utf-8")).hexdigest()
+        parts = {
+            "resume": resume_hash,
+            "prompt": prompt_version,
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "extra": {k: extra[k] for k in sorted(extra)},
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached response, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return entry[0]
+            self._memory.pop(key, None)
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, created FROM llm_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row and now - row[1] < self.ttl:
+                        self._db.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, row[0], row[1])
+                        self._counters["disk_hits"] += 1
+                        return row[0]
+                except sqlite3.Error as e:
+                    print(f"LLM cache read error: {str(e)}")
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key: str, value: str):
+        """Store a response in both tiers and evict old entries from disk."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, now, now, len(value.encode("utf-8")))
+                )
+                self._evict(now)
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"LLM cache write error: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process."""
+        with self._lock:
+            stats = dict(self._counters)
+        stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+        return stats
+
+    def _remember(self, key: str, value: str, created: float):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float):
+        self._db.execute("DELETE FROM llm_cache WHERE created < ?", (now - self.ttl,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used rows until we are back under the size budget
+        freed = 0
+        stale = []
+        for key, size in self._db.execute("SELECT key, size FROM llm_cache ORDER BY accessed"):
+            stale.append((key,))
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+        self._db.executemany("DELETE FROM llm_cache WHERE key = ?", stale)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> LLMCache:
+    """Process-wide cache, so the memory tier survives Streamlit reruns."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+        return _default_cache
+
+
+def _completion_params(model: str, messages: List[Dict], temperature: float,
+                       max_tokens: Optional[int], response_format: Optional[Dict]) -> Dict:
+    params = {"model": model, "messages": messages, "temperature": temperature}
+    if max_tokens is not None:
+        params["max_tokens"] = max_tokens
+    if response_format is not None:
+        params["response_format"] = response_format
+    return params
+
+
+def cached_chat(client, cache: LLMCache, prompt_version: str, resume_text: str, messages: List[Dict],
+                model: str, temperature: float, max_tokens: Optional[int] = None,
+                response_format: Optional[Dict] = None, validate: Optional[Callable[[str], bool]] = None,
+                **extra) -> Optional[str]:
+    """Run a chat completion through the cache.
+
+    Only non-empty responses are stored, and when `validate` is given only
+    responses it accepts, so a malformed answer is retried next time.
+    Identical calls made while one is in flight wait for it and share its
+    answer rather than each calling the API.
+    """
+    key = cache.make_key(resume_text, prompt_version, model, temperature, max_tokens, **extra)
+    with span("llm_call", labels={"prompt": prompt_version}, model=model) as call:
+        def lookup_or_fetch() -> Optional[str]:
+            cached = cache.get(key)
+            if cached is not None:
+                _record_call(call, prompt_version, "hit")
+                return cached
+
+            _record_call(call, prompt_version, "miss")
+            governor = get_default_governor()
+            reserved = estimate_tokens(messages, max_tokens)
+            governor.acquire("groq", reserved)
+            params = _completion_params(model, messages, temperature, max_tokens, response_format)
+            response = client.chat.completions.create(**params)
+            usage = getattr(response, "usage", None)
+            _record_usage(call, prompt_version, usage)
+            governor.settle("groq", reserved, _total_tokens(usage))
+
+            content = response.choices[0].message.content
+            if content and (validate is None or validate(content)):
+                cache.put(key, content)
+            return content
+
+        content, shared = get_default_flights().do(key, lookup_or_fetch, kind="llm")
+        if shared:
+            _record_call(call, prompt_version, "coalesced")
+        return content
+
+
+async def cached_chat_async(client, cache: LLMCache, prompt_version: str, resume_text: str, messages: List[Dict],
+                            model: str, temperature: float, max_tokens: Optional[int] = None,
+                            response_format: Optional[Dict] = None, validate: Optional[Callable[[str], bool]] = None,
+                            **extra) -> Optional[str]:
+    """cached_chat for an async client (groq.AsyncGroq)."""
+    key = cache.make_key(resume_text, prompt_version, model, temperature, max_tokens, **extra)
+    with span("llm_call", labels={"prompt": prompt_version}, model=model) as call:
+        async def lookup_or_fetch() -> Optional[str]:
+            cached = cache.get(key)
+            if cached is not None:
+                _record_call(call, prompt_version, "hit")
+                return cached
+
+            _record_call(call, prompt_version, "miss")
+            governor = get_default_governor()
+            reserved = estimate_tokens(messages, max_tokens)
+            await governor.acquire_async("groq", reserved)
+            params = _completion_params(model, messages, temperature, max_tokens, response_format)
+            response = await client.chat.completions.create(**params)
+            usage = getattr(response, "usage", None)
+            _record_usage(call, prompt_version, usage)
+            governor.settle("groq", reserved, _total_tokens(usage))
+
+            content = response.choices[0].message.content
+            if content and (validate is None or validate(content)):
+                cache.put(key, content)
+            return content
+
+        content, shared = await get_default_flights().do_async(key, lookup_or_fetch, kind="llm")
+        if shared:
+            _record_call(call, prompt_version, "coalesced")
+        return content
+
+
+def _record_call(call, prompt_version: str, result: str):
+    call.labels["cache"] = result
+    get_default_telemetry().increment("llm_requests_total", prompt=prompt_version, cache=result)
+
+
+def _record_usage(call, prompt_version: str, usage):
+    """Count prompt/completion tokens from a response's usage block, if it has one."""
+    if usage is None:
+        return
+    telemetry = get_default_telemetry()
+    for field in ("prompt_tokens", "completion_tokens"):
+        tokens = getattr(usage, field, None)
+        if tokens:
+            call.set(**{field: tokens})
+            telemetry.increment("llm_tokens_total", tokens, prompt=prompt_version, kind=field.split("_")[0])
+
+
+def _total_tokens(usage) -> Optional[int]:
+    if usage is None:
+        return None
+    return (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+
+
+def estimate_tokens(messages: List[Dict], max_tokens: Optional[int] = None) -> int:
+    """Rough token count for a request: ~4 characters per prompt token plus the completion budget."""
+    prompt_chars = sum(len(message.get("content") or "") for message in messages)
+    return prompt_chars // 4 + (max_tokens or 1024)
+
+
+def cached_chat_stream(client, cache: LLMCache, prompt_version: str, resume_text: str, messages: List[Dict],
+                       model: str, temperature: float, max_tokens: Optional[int] = None,
+                       **extra) -> Iterator[str]:
+    """Streaming variant of cached_chat: yields text deltas as the model produces them.
+
+    A cache hit is yielded as one chunk. The full response is stored once the
+    stream completes; an interrupted stream is not cached. Streams are not
+    coalesced: each reader gets its own deltas as they arrive.
+    """
+    key = cache.make_key(resume_text, prompt_version, model, temperature, max_tokens, **extra)
+    with span("llm_call", labels={"prompt": prompt_version}, model=model, stream=True) as call:
+        cached = cache.get(key)
+        if cached is not None:
+            _record_call(call, prompt_version, "hit")
+            yield cached
+            return
+
+        _record_call(call, prompt_version, "miss")
+        governor = get_default_governor()
+        reserved = estimate_tokens(messages, max_tokens)
+        governor.acquire("groq", reserved)
+        params = _completion_params(model, messages, temperature, max_tokens, None)
+        chunks = []
+        start = time.perf_counter()
+        for chunk in client.chat.completions.create(stream=True, **params):
+            # Groq reports usage on the last chunk, under x_groq
+            usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None)
+            _record_usage(call, prompt_version, usage)
+            governor.settle("groq", reserved, _total_tokens(usage))
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if not chunks:
+                    call.set(first_token_ms=round((time.perf_counter() - start) * 1000, 1))
+                chunks.append(delta)
+                yield delta
+
+        content = "".join(chunks)
+        if content:
+            cache.put(key, content)
+
+
+async def cached_chat_stream_async(client, cache: LLMCache, prompt_version: str, resume_text: str,
+                                   messages: List[Dict], model: str, temperature: float,
+                                   max_tokens: Optional[int] = None, **extra) -> AsyncIterator[str]:
+    """cached_chat_stream for an async client (groq.AsyncGroq)."""
+    key = cache.make_key(resume_text, prompt_version, model, temperature, max_tokens, **extra)
+    with span("llm_call", labels={"prompt": prompt_version}, model=model, stream=True) as call:
+        cached = cache.get(key)
+        if cached is not None:
+            _record_call(call, prompt_version, "hit")
+            yield cached
+            return
+
+        _record_call(call, prompt_version, "miss")
+        governor = get_default_governor()
+        reserved = estimate_tokens(messages, max_tokens)
+        await governor.acquire_async("groq", reserved)
+        params = _completion_params(model, messages, temperature, max_tokens, None)
+        chunks = []
+        start = time.perf_counter()
+        async for chunk in await client.chat.completions.create(stream=True, **params):
+            usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None)
+            _record_usage(call, prompt_version, usage)
+            governor.settle("groq", reserved, _total_tokens(usage))
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if not chunks:
+                    call.set(first_token_ms=round((time.perf_counter() - start) * 1000, 1))
+                chunks.append(delta)
+                yield delta
+
+        content = "".join(chunks)
+        if content:
+            cache.put(key, content)
@@ -0,0 +1,209 @@
+import functools
+import os
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Token budget for the resume text in each kind of prompt
+BUDGETS = {
+    "critique": int(os.getenv("PROMPT_BUDGET_CRITIQUE", "3000")),
+    "structured": int(os.getenv("PROMPT_BUDGET_STRUCTURED", "3000")),
+    "skills": int(os.getenv("PROMPT_BUDGET_SKILLS", "1500")),
+    "recommendations": int(os.getenv("PROMPT_BUDGET_RECOMMENDATIONS", "2000")),
+}
+
+SECTION_ALIASES = {
+    "summary": ["summary", "profile", "objective", "about me", "professional summary", "career summary",
+                "career objective", "professional profile"],
+    "experience": ["experience", "work experience", "professional experience", "employment history",
+                   "work history", "employment", "relevant experience"],
+    "skills": ["skills", "technical skills", "core competencies", "competencies", "technologies",
+               "tools", "key skills", "skills & tools", "skills and tools"],
+    "projects": ["projects", "personal projects", "selected projects", "key projects"],
+    "education": ["education", "academic background", "qualifications", "education & training"],
+    "certifications": ["certifications", "certificates", "licenses", "licenses & certifications",
+                       "licenses and certifications"],
+    "awards": ["awards", "honors", "honours", "achievements", "awards & honors"],
+    "publications": ["publications", "research", "papers"],
+    "volunteer": ["volunteer", "volunteering", "volunteer experience"],
+    "languages": ["languages"],
+    "interests": ["interests", "hobbies", "hobbies and interests", "hobbies & interests"],
+    "references": ["references"],
+}
+_HEADINGS = {alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+# Sections from most to least worth keeping when a resume is over budget; unlisted ones are dropped first
+PRIORITIES = {
+    "critique": ["header", "summary", "experience", "skills", "education", "projects", "certifications",
+                 "awards", "publications", "volunteer", "languages", "other", "interests", "references"],
+    "skills": ["skills", "experience", "projects", "certifications", "summary", "education", "header",
+               "awards", "publications", "volunteer", "languages", "other", "interests", "references"],
+    "recommendations": ["summary", "experience", "skills", "education", "projects", "certifications",
+                        "header", "awards", "publications", "volunteer", "languages", "other", "interests",
+                        "references"],
+}
+PRIORITIES["structured"] = PRIORITIES["critique"]
+
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$|^-\s*\d+\s*-$", re.IGNORECASE)
+_CONTACT = re.compile(r"@|https?://|www\.|linkedin|\+?\d[\d\s().-]{7,}\d", re.IGNORECASE)
+_BULLET = re.compile(r"^[-•*▪●◦‣·]")
+# Word pieces, digit runs, punctuation and whitespace runs (a lone space rides along with the next word)
+_TOKEN_PIECES = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]|\s{2,}|\n")
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+class Compaction(NamedTuple):
+    text: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def saved(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+@functools.lru_cache(maxsize=None)
+def load_encoding():
+    """tiktoken's cl100k_base encoding, or None without tiktoken or its BPE file.
+
+    Loaded on first use rather than at import: tiktoken fetches the BPE file
+    over the network unless TIKTOKEN_CACHE_DIR already holds it (the Docker
+    image pre-fetches it at build time).
+    """
+    try:
+        import tiktoken
+        # Llama 3 uses a tiktoken-style BPE; cl100k_base counts within a few percent of it
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, else a BPE-like estimate (~4 characters per word piece)."""
+    encoding = load_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum(1 + (len(piece) - 1) // 4 for piece in _TOKEN_PIECES.findall(text))
+
+
+def normalize_whitespace(text: str) -> str:
+    """Collapse runs of spaces, strip line ends and keep at most one blank line in a row."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n").replace("\x0c", "\n")
+    text = re.sub(r"[ \t\xa0\u2000-\u200b\u3000]+", " ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def strip_boilerplate(text: str, min_repeats: int = 3) -> str:
+    """Drop page numbers and repeated per-page headers/footers, keeping a header's first occurrence.
+
+    A line counts as boilerplate when it appears `min_repeats` times, or
+    twice if it carries contact details, which is how a name/email footer
+    shows up on a two-page resume. Bullet points are never treated as
+    boilerplate, however often they repeat.
+    """
+    lines = text.split("\n")
+    keys = [line.lower() for line in lines]
+    counts: Dict[str, int] = {}
+    for line, key in zip(lines, keys):
+        if line and len(line) <= 120 and not _BULLET.match(line):
+            counts[key] = counts.get(key, 0) + 1
+
+    kept, seen = [], set()
+    for line, key in zip(lines, keys):
+        if _PAGE_NUMBER.match(line):
+            continue
+        repeats = counts.get(key, 0)
+        if repeats >= min_repeats or (repeats >= 2 and _CONTACT.search(line)):
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(line)
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+
+
+def _heading(line: str) -> Optional[str]:
+    """Section key if the line is a section heading, "other" for an unknown all-caps heading."""
+    if not line or len(line) > 40:
+        return None
+    name = line.strip(" :-–—_*#|").lower()
+    if name in _HEADINGS:
+        return _HEADINGS[name]
+    if (line.isupper() and sum(ch.isalpha() for ch in line) >= 4 and len(line.split()) <= 4
+            and "," not in line and not _CONTACT.search(line)):
+        return "other"
+    return None
+
+
+def split_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """Split a resume into (section key, lines) in document order; text before any heading is "header"."""
+    sections = [("header", [])]
+    for line in text.split("\n"):
+        section = _heading(line)
+        if section:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(key, lines) for key, lines in sections if any(lines)]
+
+
+def compact_resume(text: str, call_type: str, budget: Optional[int] = None) -> Compaction:
+    """Clean up extracted resume text and trim it to the token budget for `call_type`.
+
+    Over budget, whole sections are dropped lowest priority first; the
+    section that crosses the budget is cut line by line from its end
+    instead, so the most recent roles in an experience section survive.
+    """
+    original_tokens = count_tokens(text)
+    budget = BUDGETS.get(call_type, BUDGETS["critique"]) if budget is None else budget
+    text = strip_boilerplate(normalize_whitespace(text))
+    tokens = count_tokens(text)
+    if tokens <= budget:
+        return Compaction(text, original_tokens, tokens)
+
+    sections = split_sections(text)
+    line_tokens = [[count_tokens(line) + 1 for line in lines] for _, lines in sections]
+    total = sum(map(sum, line_tokens))
+    order = PRIORITIES.get(call_type, PRIORITIES["critique"])
+    rank = {key: i for i, key in enumerate(order)}
+    # Lowest priority (and, within a priority, latest in the document) goes first
+    drop_order = sorted(range(len(sections)), key=lambda i: (rank.get(sections[i][0], len(order)), i), reverse=True)
+
+    keep = [len(lines) for _, lines in sections]
+    for i in drop_order:
+        if total <= budget:
+            break
+        section_tokens = sum(line_tokens[i])
+        if total - section_tokens >= budget and i != drop_order[-1]:
+            keep[i] = 0
+            total -= section_tokens
+            continue
+        # Cutting part of this section is enough (or it is all that is left)
+        while keep[i] > 1 and total > budget:
+            keep[i] -= 1
+            total -= line_tokens[i][keep[i]]
+
+    text = "\n".join("\n".join(lines[:keep[i]]) for i, (_, lines) in enumerate(sections) if keep[i])
+    return Compaction(text, original_tokens, count_tokens(text))
+
+
+def prepare_resume(text: str, call_type: str, budget: Optional[int] = None) -> str:
+    """compact_resume for one LLM request, recording the tokens saved for compaction_stats()."""
+    compaction = compact_resume(text, call_type, budget)
+    with _stats_lock:
+        entry = _stats.setdefault(call_type, {"requests": 0, "original_tokens": 0, "tokens": 0, "saved": 0})
+        entry["requests"] += 1
+        entry["original_tokens"] += compaction.original_tokens
+        entry["tokens"] += compaction.tokens
+        entry["saved"] += compaction.saved
+        entry["last_original_tokens"] = compaction.original_tokens
+        entry["last_tokens"] = compaction.tokens
+    return compaction.text
+
+
+def compaction_stats() -> Dict[str, Dict[str, int]]:
+    """Per call type: requests, tokens before and after compaction and tokens saved (totals and last request)."""
+    with _stats_lock:
+        return {call_type: dict(entry) for call_type, entry in _stats.items()}
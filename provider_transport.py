@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from lazy_imports import LazyModule
+from rate_limit import RateGovernor, get_default_governor
+from telemetry import get_default_telemetry
+
+# Loaded with the first request, off the app's startup path
+httpx = LazyModule("httpx")
+requests = LazyModule("requests")
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ProviderStats:
+    """Rolling request/latency/error counters for one provider."""
+
+    def __init__(self, window: int = 500):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.statuses: Dict[int, int] = {}
+        self.latencies = deque(maxlen=window)
+
+    def as_dict(self) -> Dict:
+        ordered = sorted(self.latencies)
+
+        def pct(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 1)
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "statuses": dict(self.statuses),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(ordered[-1] * 1000, 1) if ordered else None,
+        }
+
+
+class ProviderTransport:
+    """Shared HTTP transport for the job providers.
+
+    One pooled keep-alive session, so repeated searches reuse TCP/TLS
+    connections, plus jittered exponential backoff on 429/5xx and connection
+    errors that honours Retry-After. Every attempt first takes its place in
+    the provider's rate budget (RateGovernor), and a Retry-After is passed
+    on to it so other processes hold off too. Per-provider stats are kept
+    for display.
+    """
+
+    def __init__(self, pool_size: int = 10, max_retries: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0, timeout: float = 10, governor: Optional[RateGovernor] = None):
+        self.governor = governor or get_default_governor()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.pool_size = pool_size
+
+        self._session = None  # Built with the first request, see session
+        self._stats: Dict[str, ProviderStats] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """The pooled session, created (and requests imported) on first use."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    # pool_block keeps a burst of searches from opening unbounded connections
+                    adapter = requests.adapters.HTTPAdapter(pool_connections=self.pool_size,
+                                                            pool_maxsize=self.pool_size, pool_block=True)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def get(self, provider: str, url: str, **kwargs) -> requests.Response:
+        """GET with retries; returns the last response, or raises the last connection error."""
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.max_retries + 1):
+            self.governor.acquire(provider)
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(provider, time.perf_counter() - start, None, retried=attempt > 0)
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            self._record(provider, time.perf_counter() - start, response.status_code, retried=attempt > 0)
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+
+            delay = self._retry_after(response)
+            if delay is None:
+                delay = self._backoff(attempt)
+            else:
+                self.governor.defer(provider, delay)
+            if delay > self.backoff_max:
+                # The provider wants us gone for longer than a search can wait
+                return response
+            response.close()
+            time.sleep(delay)
+        return response
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-provider counters and latency percentiles."""
+        with self._lock:
+            return {provider: stats.as_dict() for provider, stats in self._stats.items()}
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spread retries from concurrent sessions apart
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+            return max(0.0, when.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _record(self, provider: str, latency: float, status: Optional[int], retried: bool):
+        with self._lock:
+            stats = self._stats.setdefault(provider, ProviderStats())
+            stats.requests += 1
+            stats.latencies.append(latency)
+            if retried:
+                stats.retries += 1
+            if status is None or status >= 400:
+                stats.errors += 1
+            if status is not None:
+                stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        telemetry = get_default_telemetry()
+        telemetry.observe("provider_request_duration_seconds", latency, provider=provider)
+        telemetry.increment("provider_responses_total", provider=provider,
+                            status=status if status is not None else "error")
+
+
+class AsyncProviderTransport(ProviderTransport):
+    """ProviderTransport for asyncio, on a pooled httpx.AsyncClient.
+
+    Same retry policy and per-provider stats; waiting out a backoff or a slow
+    provider doesn't hold a thread. The client belongs to the event loop it
+    is first used on, so create one per loop and `aclose()` it when done.
+    """
+
+    def __init__(self, pool_size: int = 10, max_retries: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0, timeout: float = 10, governor: Optional[RateGovernor] = None):
+        self.governor = governor or get_default_governor()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=timeout,
+        )
+        # Requests wait for a connection here rather than in httpcore's pool, which rescans
+        # its whole queue against every connection each time one frees up
+        self._slots = asyncio.Semaphore(pool_size)
+
+        self._stats: Dict[str, ProviderStats] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, provider: str, url: str, **kwargs) -> httpx.Response:
+        """GET with retries; returns the last response, or raises the last connection error."""
+        for attempt in range(self.max_retries + 1):
+            await self.governor.acquire_async(provider)
+            start = time.perf_counter()
+            try:
+                async with self._slots:
+                    start = time.perf_counter()
+                    response = await self.client.get(url, **kwargs)
+            except httpx.TransportError:
+                self._record(provider, time.perf_counter() - start, None, retried=attempt > 0)
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            self._record(provider, time.perf_counter() - start, response.status_code, retried=attempt > 0)
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+
+            delay = self._retry_after(response)
+            if delay is None:
+                delay = self._backoff(attempt)
+            else:
+                self.governor.defer(provider, delay)
+            if delay > self.backoff_max:
+                # The provider wants us gone for longer than a search can wait
+                return response
+            await response.aclose()
+            await asyncio.sleep(delay)
+        return response
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_default_transport = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> ProviderTransport:
+    """Process-wide transport, so pooled connections survive Streamlit reruns."""
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = ProviderTransport(
+                pool_size=int(os.getenv("PROVIDER_POOL_SIZE", "10")),
+                max_retries=int(os.getenv("PROVIDER_MAX_RETRIES", "3")),
+            )
+        return _default_transport
@@ -0,0 +1,97 @@
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Keep "c++", "c#", "node.js" and the like as single terms
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "our", "the", "to", "we", "with", "you", "your", "n", "na", "i", "my", "me", "will", "was", "were",
+}
+
+# How much each column counts towards a job's text
+DEFAULT_COLUMN_WEIGHTS = {"Job Title": 3.0, "Job Type": 0.5, "Company": 0.5, "Location": 0.25}
+
+
+def tokenize(text) -> List[str]:
+    return [token for token in _TOKEN.findall(str(text).lower()) if token not in STOPWORDS]
+
+
+def match_scores(resume_text: str, jobs_df: pd.DataFrame,
+                 column_weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """TF-IDF cosine similarity (0-100) between a resume and every job in the frame.
+
+    The job term matrix is built as sparse (row, term, weight) triples and all
+    scores come out of one weighted bincount, so the cost is linear in the
+    total number of job tokens. IDF is fitted on the job batch itself, which
+    favours the terms that tell these particular jobs apart.
+    """
+    column_weights = column_weights or DEFAULT_COLUMN_WEIGHTS
+    columns = [column for column in column_weights if column in jobs_df.columns]
+    count = len(jobs_df)
+    if count == 0 or not columns:
+        return np.zeros(count)
+
+    vocabulary: Dict[str, int] = {}
+    rows, terms, column_ids = [], [], []
+    for index, column in enumerate(columns):
+        # Tokenize each distinct value once; titles and companies repeat
+        codes, uniques = pd.factorize(jobs_df[column].to_numpy(dtype=object).astype(str))
+        unique_terms = [[vocabulary.setdefault(token, len(vocabulary)) for token in tokenize(value)]
+                        for value in uniques]
+        lengths = np.fromiter((len(unique_terms[code]) for code in codes), dtype=np.int64, count=count)
+        rows.append(np.repeat(np.arange(count), lengths))
+        terms.append(np.fromiter((term for code in codes for term in unique_terms[code]),
+                                 dtype=np.int64, count=int(lengths.sum())))
+        column_ids.append(np.full(int(lengths.sum()), index, dtype=np.int64))
+
+    rows, terms, column_ids = np.concatenate(rows), np.concatenate(terms), np.concatenate(column_ids)
+    vocab_size = max(1, len(vocabulary))
+    if rows.size == 0:
+        return np.zeros(count)
+
+    # Sublinear tf on each column's raw counts, then the column's weight, so that a light column
+    # (Location at 0.25) still adds to a term rather than turning log(weight) negative
+    column_cells, column_inverse = np.unique((rows * vocab_size + terms) * len(columns) + column_ids,
+                                             return_inverse=True)
+    column_weight = np.array([column_weights[column] for column in columns])
+    column_tf = (1 + np.log(np.bincount(column_inverse))) * column_weight[column_cells % len(columns)]
+
+    # Then add up each (row, term) pair across columns
+    cells, inverse = np.unique(column_cells // len(columns), return_inverse=True)
+    tf = np.bincount(inverse, weights=column_tf)
+    cell_rows, cell_terms = cells // vocab_size, cells % vocab_size
+
+    doc_freq = np.bincount(cell_terms, minlength=vocab_size)
+    idf = np.log((1 + count) / (1 + doc_freq)) + 1
+    values = tf * idf[cell_terms]
+    job_norms = np.sqrt(np.bincount(cell_rows, weights=values ** 2, minlength=count))
+
+    query = np.zeros(vocab_size)
+    resume_terms = [vocabulary[token] for token in tokenize(resume_text) if token in vocabulary]
+    if not resume_terms:
+        return np.zeros(count)
+    resume_tf = np.bincount(resume_terms, minlength=vocab_size).astype(float)
+    present = resume_tf > 0
+    query[present] = (1 + np.log(resume_tf[present])) * idf[present]
+    query /= np.linalg.norm(query)
+
+    dots = np.bincount(cell_rows, weights=values * query[cell_terms], minlength=count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = np.where(job_norms > 0, dots / job_norms, 0.0)
+    return np.round(scores * 100, 1)
+
+
+def rank_jobs(jobs_df: pd.DataFrame, resume_text: str,
+              column_weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """Add a "Match Score" column and sort the jobs best match first."""
+    if jobs_df.empty:
+        return jobs_df
+    ranked = jobs_df.copy()
+    ranked["Match Score"] = match_scores(resume_text, jobs_df, column_weights)
+    # Score first so it is visible without scrolling the table
+    ranked = ranked[["Match Score"] + [column for column in jobs_df.columns if column != "Match Score"]]
+    return ranked.sort_values("Match Score", ascending=False, kind="stable").reset_index(drop=True)
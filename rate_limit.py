@@ -0,0 +1,351 @@
+import asyncio
+import contextvars
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from telemetry import get_default_telemetry
+
+# Per-minute budgets for each upstream; 0 means unlimited. Groq's defaults are its free tier for
+# llama-3.3-70b-versatile, Adzuna's its free developer quota
+DEFAULT_LIMITS = {
+    "groq": {
+        "requests": int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30")),
+        "tokens": int(os.getenv("GROQ_TOKENS_PER_MINUTE", "12000")),
+    },
+    "JSearch API": {"requests": int(os.getenv("JSEARCH_REQUESTS_PER_MINUTE", "60"))},
+    "Adzuna API": {"requests": int(os.getenv("ADZUNA_REQUESTS_PER_MINUTE", "25"))},
+}
+
+# A queued caller that hasn't checked in for this long is presumed gone (its process died)
+STALE_WAITER = 5.0
+
+_party: contextvars.ContextVar = contextvars.ContextVar("rate_limit_party", default=None)
+
+
+class RateLimited(Exception):
+    """An upstream's budget is used up for longer than the caller is willing to wait."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        self.upstream = upstream
+        self.retry_after = retry_after
+        super().__init__(f"{upstream} is at its rate limit; retry in {math.ceil(retry_after)} s")
+
+
+def set_party(party: str) -> contextvars.Token:
+    """Name the user or session the calls made from this context are for (fair queueing)."""
+    return _party.set(party)
+
+
+def current_party() -> str:
+    """The party set with set_party, else the Streamlit session, else this process."""
+    party = _party.get()
+    if party:
+        return party
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+        if ctx is not None:
+            return f"session-{ctx.session_id}"
+    except Exception:
+        pass
+    return f"process-{os.getpid()}"
+
+
+class RateGovernor:
+    """Requests/minute and tokens/minute token buckets per upstream, shared by every process on the host.
+
+    Bucket levels live in a SQLite file (RATE_LIMIT_PATH), so all app
+    workers and batch runs draw on one budget. Each bucket holds one
+    minute's worth and refills continuously. Callers queue per upstream;
+    among waiting parties (sessions), the one served least recently goes
+    next, so one busy session can't crowd out the others. A caller whose
+    estimated wait is over `max_wait` seconds is refused at once with
+    RateLimited, which carries the retry-after time.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, int]]] = None, path: Optional[str] = None,
+                 max_wait: Optional[float] = None, poll: float = 0.25):
+        limits = DEFAULT_LIMITS if limits is None else limits
+        self.limits = {upstream: dict(dims) for upstream, dims in limits.items()}
+        self.path = path or os.getenv("RATE_LIMIT_PATH", os.path.join(".cache", "rate_limits.sqlite3"))
+        self.max_wait = float(os.getenv("RATE_LIMIT_MAX_WAIT", "10")) if max_wait is None else max_wait
+        self.poll = poll
+        self.counters = {"granted": 0, "shed": 0, "waited": 0.0}
+
+        self._lock = threading.Lock()
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Autocommit mode; every read-modify-write runs in an explicit BEGIN IMMEDIATE
+            self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (upstream TEXT NOT NULL, dimension TEXT NOT NULL, "
+                "level REAL NOT NULL, updated REAL NOT NULL, blocked_until REAL NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (upstream, dimension))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS waiters (id INTEGER PRIMARY KEY AUTOINCREMENT, upstream TEXT NOT NULL, "
+                "party TEXT NOT NULL, requests REAL NOT NULL, tokens REAL NOT NULL, heartbeat REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS served (upstream TEXT NOT NULL, party TEXT NOT NULL, at REAL NOT NULL, "
+                "PRIMARY KEY (upstream, party))"
+            )
+        except sqlite3.Error as e:
+            # Without the shared store there is nothing to coordinate on; let calls through
+            print(f"Rate limiter disabled: {str(e)}")
+            self._db = None
+
+    def set_limit(self, upstream: str, dimension: str, per_minute: int):
+        """Change one budget for this process (0 removes it)."""
+        with self._lock:
+            self.limits.setdefault(upstream, {})[dimension] = per_minute
+
+    def acquire(self, upstream: str, tokens: int = 0, party: Optional[str] = None,
+                max_wait: Optional[float] = None) -> float:
+        """Block until one request (and `tokens` tokens) fit the budget; returns the seconds waited.
+
+        Raises RateLimited instead of waiting longer than max_wait.
+        """
+        demand = self._demand(upstream, tokens)
+        if demand is None:
+            return 0.0
+        party = party or current_party()
+        max_wait = self.max_wait if max_wait is None else max_wait
+        start = time.monotonic()
+        ticket = None
+        try:
+            while True:
+                granted, wait, ticket = self._attempt(upstream, demand, party, ticket, time.monotonic() - start, max_wait)
+                if granted:
+                    return self._granted(upstream, time.monotonic() - start)
+                time.sleep(min(wait, self.poll))
+        finally:
+            self._leave(ticket)
+
+    async def acquire_async(self, upstream: str, tokens: int = 0, party: Optional[str] = None,
+                            max_wait: Optional[float] = None) -> float:
+        """acquire() for coroutines: waits with asyncio.sleep, so the event loop keeps running."""
+        demand = self._demand(upstream, tokens)
+        if demand is None:
+            return 0.0
+        party = party or current_party()
+        max_wait = self.max_wait if max_wait is None else max_wait
+        start = time.monotonic()
+        ticket = None
+        try:
+            while True:
+                granted, wait, ticket = self._attempt(upstream, demand, party, ticket, time.monotonic() - start, max_wait)
+                if granted:
+                    return self._granted(upstream, time.monotonic() - start)
+                await asyncio.sleep(min(wait, self.poll))
+        finally:
+            self._leave(ticket)
+
+    def settle(self, upstream: str, reserved_tokens: int, used_tokens: Optional[int]):
+        """Correct the token bucket once a call reports its real usage (refunds an overestimate)."""
+        if self._db is None or not used_tokens or not self.limits.get(upstream, {}).get("tokens"):
+            return
+        reserved_tokens = min(reserved_tokens, self.limits[upstream]["tokens"])
+        self._transaction(lambda now: self._db.execute(
+            "UPDATE buckets SET level = level - ? WHERE upstream = ? AND dimension = 'tokens'",
+            (used_tokens - reserved_tokens, upstream)
+        ))
+
+    def defer(self, upstream: str, seconds: float):
+        """Hold every caller of `upstream`, in every process, for `seconds` (e.g. after a 429 Retry-After)."""
+        if self._db is None or not self._active(upstream):
+            return
+
+        def block(now: float):
+            for dimension in self._active(upstream):
+                self._bucket(upstream, dimension, now)
+                self._db.execute(
+                    "UPDATE buckets SET blocked_until = MAX(blocked_until, ?) WHERE upstream = ? AND dimension = ?",
+                    (now + seconds, upstream, dimension)
+                )
+        self._transaction(block)
+
+    def utilization(self) -> Dict[str, Dict[str, float]]:
+        """Per upstream and dimension: the share of the per-minute budget currently used up (0-1)."""
+        if self._db is None:
+            return {}
+        now = time.time()
+        result = {}
+        with self._lock:
+            rows = self._db.execute("SELECT upstream, dimension, level, updated, blocked_until FROM buckets").fetchall()
+        for upstream, dimension, level, updated, blocked_until in rows:
+            limit = self.limits.get(upstream, {}).get(dimension)
+            if not limit:
+                continue
+            level = min(limit, level + (now - updated) * limit / 60)
+            used = 1.0 if blocked_until > now else max(0.0, 1 - level / limit)
+            result.setdefault(upstream, {})[dimension] = round(used, 4)
+        return result
+
+    def queued(self) -> Dict[str, int]:
+        """Callers currently waiting, per upstream."""
+        if self._db is None:
+            return {}
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT upstream, COUNT(*) FROM waiters WHERE heartbeat >= ? GROUP BY upstream",
+                (time.time() - STALE_WAITER,)
+            ).fetchall()
+        return dict(rows)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self.counters)
+
+    def collect_metrics(self):
+        telemetry = get_default_telemetry()
+        for upstream, dimensions in self.utilization().items():
+            for dimension, used in dimensions.items():
+                telemetry.set_gauge("rate_limit_utilization", used, upstream=upstream, dimension=dimension)
+
+    def _active(self, upstream: str) -> Dict[str, int]:
+        return {dimension: limit for dimension, limit in self.limits.get(upstream, {}).items() if limit > 0}
+
+    def _demand(self, upstream: str, tokens: int) -> Optional[Dict[str, float]]:
+        """What one call takes from each limited bucket, or None if the upstream is unlimited."""
+        if self._db is None:
+            return None
+        active = self._active(upstream)
+        if not active:
+            return None
+        # A request larger than a whole minute's budget could never be served; let it drain the bucket instead
+        wanted = {"requests": 1, "tokens": tokens}
+        return {dimension: min(wanted.get(dimension, 0), limit) for dimension, limit in active.items()}
+
+    def _bucket(self, upstream: str, dimension: str, now: float) -> Tuple[float, float]:
+        """Refilled (level, blocked_until) of a bucket; must run inside a transaction."""
+        limit = self.limits[upstream][dimension]
+        row = self._db.execute(
+            "SELECT level, updated, blocked_until FROM buckets WHERE upstream = ? AND dimension = ?",
+            (upstream, dimension)
+        ).fetchone()
+        if row is None:
+            self._db.execute(
+                "INSERT INTO buckets (upstream, dimension, level, updated) VALUES (?, ?, ?, ?)",
+                (upstream, dimension, float(limit), now)
+            )
+            return float(limit), 0.0
+        level = min(limit, row[0] + (now - row[1]) * limit / 60)
+        self._db.execute(
+            "UPDATE buckets SET level = ?, updated = ? WHERE upstream = ? AND dimension = ?",
+            (level, now, upstream, dimension)
+        )
+        return level, row[2]
+
+    def _attempt(self, upstream: str, demand: Dict[str, float], party: str, ticket: Optional[int],
+                 waited: float, max_wait: float) -> Tuple[bool, float, Optional[int]]:
+        """One look at the buckets: take the budget if it's our turn and it's there, else estimate the wait."""
+
+        def attempt(now: float):
+            self._db.execute("DELETE FROM waiters WHERE heartbeat < ?", (now - STALE_WAITER,))
+            if ticket is not None:
+                self._db.execute("UPDATE waiters SET heartbeat = ? WHERE id = ?", (now, ticket))
+
+            # Least recently served party first, then arrival order
+            head = self._db.execute(
+                "SELECT w.id FROM waiters w LEFT JOIN served s ON s.upstream = w.upstream AND s.party = w.party "
+                "WHERE w.upstream = ? ORDER BY COALESCE(s.at, 0), w.id LIMIT 1",
+                (upstream,)
+            ).fetchone()
+            buckets = {dimension: self._bucket(upstream, dimension, now) for dimension in demand}
+            available = all(level >= demand[dimension] and blocked_until <= now
+                            for dimension, (level, blocked_until) in buckets.items())
+
+            if available and (head is None or head[0] == ticket):
+                for dimension, amount in demand.items():
+                    self._db.execute(
+                        "UPDATE buckets SET level = level - ? WHERE upstream = ? AND dimension = ?",
+                        (amount, upstream, dimension)
+                    )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO served (upstream, party, at) VALUES (?, ?, ?)", (upstream, party, now)
+                )
+                if ticket is not None:
+                    self._db.execute("DELETE FROM waiters WHERE id = ?", (ticket,))
+                return True, 0.0, None
+
+            # Wait estimate: our demand plus that of everyone queued ahead, at the refill rate
+            ahead = self._db.execute(
+                "SELECT COALESCE(SUM(requests), 0), COALESCE(SUM(tokens), 0) FROM waiters "
+                "WHERE upstream = ? AND (? IS NULL OR id < ?)",
+                (upstream, ticket, ticket)
+            ).fetchone()
+            queued = {"requests": ahead[0], "tokens": ahead[1]}
+            wait = 0.0
+            for dimension, (level, blocked_until) in buckets.items():
+                rate = self.limits[upstream][dimension] / 60
+                deficit = queued[dimension] + demand[dimension] - level
+                wait = max(wait, blocked_until - now, deficit / rate)
+            wait = max(wait, 0.01)
+
+            if waited + wait > max_wait:
+                return False, wait, ticket
+            if ticket is None:
+                cursor = self._db.execute(
+                    "INSERT INTO waiters (upstream, party, requests, tokens, heartbeat) VALUES (?, ?, ?, ?, ?)",
+                    (upstream, party, demand.get("requests", 0), demand.get("tokens", 0), now)
+                )
+                return False, wait, cursor.lastrowid
+            return False, wait, ticket
+
+        granted, wait, new_ticket = self._transaction(attempt)
+        if not granted and waited + wait > max_wait:
+            with self._lock:
+                self.counters["shed"] += 1
+            get_default_telemetry().increment("rate_limited_total", upstream=upstream)
+            raise RateLimited(upstream, wait)
+        return granted, wait, new_ticket
+
+    def _granted(self, upstream: str, waited: float) -> float:
+        with self._lock:
+            self.counters["granted"] += 1
+            self.counters["waited"] += waited
+        get_default_telemetry().observe("rate_limit_wait_seconds", waited, upstream=upstream)
+        return waited
+
+    def _leave(self, ticket: Optional[int]):
+        """Drop a queue entry left behind by a caller that gave up or failed."""
+        if ticket is not None and self._db is not None:
+            try:
+                self._transaction(lambda now: self._db.execute("DELETE FROM waiters WHERE id = ?", (ticket,)))
+            except sqlite3.Error:
+                pass
+
+    def _transaction(self, body):
+        """Run body(now) in a write transaction, serialized with every other process using the file."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = body(time.time())
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return result
+
+
+_default_governor = None
+_default_governor_lock = threading.Lock()
+
+
+def get_default_governor() -> RateGovernor:
+    """Process-wide governor with the DEFAULT_LIMITS budgets; RATE_LIMITS=off disables it."""
+    global _default_governor
+    with _default_governor_lock:
+        if _default_governor is None:
+            limits = {} if os.getenv("RATE_LIMITS", "on").lower() in ("0", "off", "false") else DEFAULT_LIMITS
+            _default_governor = RateGovernor(limits)
+            get_default_telemetry().add_collector(_default_governor.collect_metrics)
+        return _default_governor
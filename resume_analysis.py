@@ -0,0 +1,243 @@
+import json
+import re
+from typing import Dict, Iterator, List, Optional
+
+from llm_cache import LLMCache, cached_chat, cached_chat_stream
+from prompt_compaction import prepare_resume
+
+MODEL = "llama-3.3-70b-versatile"
+
+# Bump these whenever the matching prompt changes so stale cached answers are not reused
+CRITIQUE_PROMPT_VERSION = "critique-v1"
+STRUCTURED_PROMPT_VERSION = "structured-v1"
+
+CRITIQUE_SYSTEM_PROMPT = "You are an expert resume reviewer with years of experience in HR and recruitment."
+
+CRITIQUE_SECTIONS = [
+    ("overall_impression", "1. **OVERALL IMPRESSION**"),
+    ("strengths", "2. **STRENGTHS**"),
+    ("areas_for_improvement", "3. **AREAS FOR IMPROVEMENT**"),
+    ("specific_recommendations", "4. **SPECIFIC RECOMMENDATIONS**"),
+    ("action_items", "5. **ACTION ITEMS**"),
+    ("final_score", "6. **FINAL SCORE**"),
+]
+
+
+def build_critique_prompt(resume_text: str, job_role: Optional[str] = None) -> str:
+    """Prompt for the free-form six-section critique."""
+    return f"""
+    You are an expert resume reviewer and career consultant with 15+ years of experience in talent acquisition and HR.
+    Analyze the following resume and provide comprehensive, actionable feedback for {job_role if job_role else 'general job applications'}.
+
+    **ANALYSIS FRAMEWORK:**
+    Please structure your response with the following sections:
+
+    1. **OVERALL IMPRESSION** (1-2 sentences)
+    - First impression and general quality assessment
+
+    2. **STRENGTHS**
+    - What works well in this resume
+    - Standout achievements or experiences
+
+    3. **AREAS FOR IMPROVEMENT**
+    - Content gaps or weaknesses
+    - Formatting and presentation issues
+    - Missing key information
+
+    4. **SPECIFIC RECOMMENDATIONS**
+    - Concrete suggestions for improvement
+    - Industry-specific advice for {job_role if job_role else 'General Job Applications'}
+    - Keywords and skills to consider adding
+
+    5. **ACTION ITEMS**
+    - Priority fixes (High/Medium/Low)
+    - Quick wins that can be implemented immediately
+
+    6. **FINAL SCORE**
+    - Rate the resume from 1-10 with brief justification
+
+    **RESUME CONTENT:**
+    {resume_text}
+
+    **INSTRUCTIONS:**
+    - Be honest but constructive in your feedback
+    - Provide specific examples from the resume when pointing out issues
+    - Consider ATS (Applicant Tracking System) compatibility
+    - Focus on relevance to {job_role if job_role else 'modern job market standards'}
+    - Suggest specific metrics, action verbs, and formatting improvements
+    - Keep feedback actionable and prioritized
+    """
+
+
+def build_structured_prompt(resume_text: str, job_role: Optional[str] = None) -> str:
+    """Prompt asking for the critique, skills and recommendations as one JSON object."""
+    target = job_role if job_role else 'general job applications'
+    return f"""
+    You are an expert resume reviewer and career consultant with 15+ years of experience in talent acquisition and HR.
+    Analyze the following resume for {target} and answer with ONE JSON object, no other text, using exactly this schema:
+
+    {{
+      "overall_impression": "1-2 sentence first impression and quality assessment",
+      "strengths": ["what works well, standout achievements"],
+      "areas_for_improvement": ["content gaps, formatting issues, missing information"],
+      "specific_recommendations": ["concrete suggestions, advice for {target}, keywords to add"],
+      "action_items": [{{"priority": "High|Medium|Low", "item": "fix or quick win"}}],
+      "final_score": {{"score": 1-10, "justification": "brief justification"}},
+      "skills": ["up to 15 technical skills, professional competencies, industry keywords and job titles"],
+      "job_recommendations": ["exactly 5 actionable job search recommendations: titles to search, companies or industries to target, skills and keywords to highlight"]
+    }}
+
+    **RESUME CONTENT:**
+    {resume_text}
+
+    **INSTRUCTIONS:**
+    - Be honest but constructive and cite specific examples from the resume
+    - Consider ATS (Applicant Tracking System) compatibility
+    - Suggest specific metrics, action verbs, and formatting improvements
+    """
+
+
+def critique_messages(resume_text: str, job_role: Optional[str]) -> List[Dict]:
+    """Chat messages for the free-form critique."""
+    return [{"role": "system", "content": CRITIQUE_SYSTEM_PROMPT},
+            {"role": "user", "content": build_critique_prompt(resume_text, job_role)}]
+
+
+def structured_messages(resume_text: str, job_role: Optional[str]) -> List[Dict]:
+    """Chat messages for the single JSON-mode analysis call."""
+    return [{"role": "system", "content": CRITIQUE_SYSTEM_PROMPT},
+            {"role": "user", "content": build_structured_prompt(resume_text, job_role)}]
+
+
+def critique_resume(client, cache: LLMCache, resume_text: str, job_role: Optional[str] = None) -> Optional[str]:
+    """Free-form markdown critique of a resume (one LLM call)."""
+    resume_text = prepare_resume(resume_text, "critique")
+    return cached_chat(
+        client,
+        cache,
+        CRITIQUE_PROMPT_VERSION,
+        resume_text,
+        model=MODEL,
+        messages=critique_messages(resume_text, job_role),
+        temperature=0.7,
+        job_role=job_role,
+    )
+
+
+def stream_critique(client, cache: LLMCache, resume_text: str, job_role: Optional[str] = None) -> Iterator[str]:
+    """Same critique as critique_resume, yielded token by token as it is generated."""
+    resume_text = prepare_resume(resume_text, "critique")
+    return cached_chat_stream(
+        client,
+        cache,
+        CRITIQUE_PROMPT_VERSION,
+        resume_text,
+        model=MODEL,
+        messages=critique_messages(resume_text, job_role),
+        temperature=0.7,
+        job_role=job_role,
+    )
+
+
+def _string_list(value) -> Optional[List[str]]:
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return None
+    items = [str(item).strip() for item in value if isinstance(item, (str, int, float)) and str(item).strip()]
+    return items or None
+
+
+def parse_structured_analysis(text: Optional[str]) -> Optional[Dict]:
+    """Validate a structured response; returns None if it does not match the schema."""
+    if not text:
+        return None
+    # Tolerate a ```json fence around the object
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    overall = data.get("overall_impression")
+    strengths = _string_list(data.get("strengths"))
+    improvements = _string_list(data.get("areas_for_improvement"))
+    recommendations = _string_list(data.get("specific_recommendations"))
+    skills = _string_list(data.get("skills"))
+    job_recommendations = _string_list(data.get("job_recommendations"))
+    if not (isinstance(overall, str) and overall.strip() and strengths and improvements
+            and recommendations and skills and job_recommendations):
+        return None
+
+    action_items = []
+    for item in data.get("action_items") or []:
+        if isinstance(item, dict) and item.get("item"):
+            action_items.append(f"**{str(item.get('priority', 'Medium')).title()}**: {item['item']}")
+        elif isinstance(item, str) and item.strip():
+            action_items.append(item.strip())
+    if not action_items:
+        return None
+
+    final_score = data.get("final_score")
+    if isinstance(final_score, dict):
+        try:
+            score = int(final_score.get("score"))
+        except (TypeError, ValueError):
+            return None
+        if not 1 <= score <= 10:
+            return None
+        final_score = f"**{score}/10** - {final_score.get('justification', '')}".rstrip(" -")
+    elif not isinstance(final_score, (str, int)):
+        return None
+
+    sections = {
+        "overall_impression": overall.strip(),
+        "strengths": strengths,
+        "areas_for_improvement": improvements,
+        "specific_recommendations": recommendations,
+        "action_items": action_items,
+        "final_score": str(final_score),
+    }
+    critique = []
+    for key, heading in CRITIQUE_SECTIONS:
+        body = sections[key]
+        if isinstance(body, list):
+            body = "\n".join(f"- {line}" for line in body)
+        critique.append(f"{heading}\n\n{body}")
+
+    return {
+        "critique": "\n\n".join(critique),
+        "skills": skills[:15],
+        "recommendations": job_recommendations[:5],
+    }
+
+
+def analyze_resume_structured(client, cache: LLMCache, resume_text: str,
+                              job_role: Optional[str] = None) -> Optional[Dict]:
+    """Critique, skills and recommendations from a single JSON-mode LLM call.
+
+    Returns None when the model's answer cannot be validated, so callers can
+    fall back to the separate per-call path.
+    """
+    resume_text = prepare_resume(resume_text, "structured")
+    try:
+        content = cached_chat(
+            client,
+            cache,
+            STRUCTURED_PROMPT_VERSION,
+            resume_text,
+            model=MODEL,
+            messages=structured_messages(resume_text, job_role),
+            temperature=0.7,
+            response_format={"type": "json_object"},
+            validate=lambda text: parse_structured_analysis(text) is not None,
+            job_role=job_role,
+        )
+    except Exception as e:
+        print(f"Structured analysis failed, falling back: {str(e)}")
+        return None
+    return parse_structured_analysis(content)
@@ -0,0 +1,204 @@
+import asyncio
+import contextvars
+import os
+import queue
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from telemetry import get_default_telemetry
+
+
+# Marks the end of a call's updates, and a call that hasn't published any yet
+_DONE = object()
+
+# The call whose fn is running in this context, for SingleFlight.publish
+_current_call: contextvars.ContextVar = contextvars.ContextVar("singleflight_call", default=None)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None  # Exception raised by fn; shared with the waiters
+        self.interrupt = None  # BaseException that stopped fn (e.g. the leader's session rerunning); not shared
+        self._lock = threading.Lock()
+        self._listeners: List[queue.Queue] = []
+        self._latest = _DONE
+
+    def listen(self) -> queue.Queue:
+        """Queue receiving the latest update so far, every later one, then _DONE."""
+        listener: queue.Queue = queue.Queue()
+        with self._lock:
+            if self._latest is not _DONE:
+                listener.put(self._latest)
+            if self.done.is_set():
+                listener.put(_DONE)
+            else:
+                self._listeners.append(listener)
+        return listener
+
+    def publish(self, value: Any):
+        with self._lock:
+            self._latest = value
+            for listener in self._listeners:
+                listener.put(value)
+
+    def finish(self):
+        with self._lock:
+            self.done.set()
+            for listener in self._listeners:
+                listener.put(_DONE)
+            self._listeners.clear()
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one execution.
+
+    The first caller for a key runs the function; callers that arrive with
+    the same key while it is still running wait for it and get the same
+    result (or exception) instead of making their own upstream request.
+    Only results and ordinary exceptions are shared: if the leader is
+    interrupted by control flow (a BaseException such as Streamlit stopping
+    or rerunning its script), the waiters run the call again themselves.
+    While it runs, the function can publish() progress (e.g. the results so
+    far) to every caller that passed on_update.
+    Nothing is kept once the call finishes - caching is a separate layer.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self._counters = {"calls": 0, "shared": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any], kind: str = "call",
+           on_update: Optional[Callable[[Any], None]] = None) -> Tuple[Any, bool]:
+        """Run fn once per key at a time; returns (result, shared), shared being True for waiters.
+
+        With on_update, each value fn publishes (starting with the latest one
+        when joining a call already running) is passed to on_update in this
+        caller's own thread. The leader then runs fn on a helper thread, so an
+        exception raised by its on_update leaves the call running for the rest.
+        """
+        if not self.enabled and on_update is None:
+            return fn(), False
+        counted = False
+        while True:
+            if self.enabled:
+                with self._lock:
+                    call = self._calls.get(key)
+                    leader = call is None
+                    if leader:
+                        call = self._calls[key] = _Call()
+                if not counted:
+                    self._count(kind, leader)
+                    counted = True
+            else:
+                call, leader = _Call(), True
+
+            if on_update is not None:
+                updates = call.listen()
+                if leader:
+                    threading.Thread(target=contextvars.copy_context().run, args=(self._lead_quietly, key, call, fn),
+                                     name="singleflight-leader", daemon=True).start()
+                while True:
+                    value = updates.get()
+                    if value is _DONE:
+                        break
+                    on_update(value)
+            elif leader:
+                return self._lead(key, call, fn), False
+            else:
+                call.done.wait()
+
+            if call.interrupt is not None:
+                if leader:
+                    raise call.interrupt
+                # The leader's exception belongs to its own caller; try again, maybe as the new leader
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result, not leader
+
+    def publish(self, value: Any):
+        """From inside fn: pass a progress value to the callers of the running do() that asked for updates."""
+        call = _current_call.get()
+        if call is not None:
+            call.publish(value)
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable], kind: str = "call") -> Tuple[Any, bool]:
+        """do() for coroutines on the running event loop.
+
+        The call runs as its own task, so a caller that is cancelled doesn't
+        cancel it for the others waiting on it.
+        """
+        if not self.enabled:
+            return await fn(), False
+        key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(key)
+            leader = task is None
+            if leader:
+                task = self._tasks[key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda done: self._finish_task(key, done))
+        self._count(kind, leader)
+        return await asyncio.shield(task), not leader
+
+    def stats(self) -> Dict[str, int]:
+        """Calls seen and how many of them shared another call's result."""
+        with self._lock:
+            return dict(self._counters)
+
+    def _lead(self, key: Hashable, call: _Call, fn: Callable[[], Any]) -> Any:
+        token = _current_call.set(call)
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException as e:
+            call.interrupt = e
+            raise
+        finally:
+            _current_call.reset(token)
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.finish()
+
+    def _lead_quietly(self, key: Hashable, call: _Call, fn: Callable[[], Any]):
+        # On a helper thread; whatever fn raises is kept on the call for the callers to raise
+        try:
+            self._lead(key, call, fn)
+        except BaseException:
+            pass
+
+    def _finish_task(self, key: Hashable, task: asyncio.Future):
+        with self._lock:
+            self._tasks.pop(key, None)
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def _count(self, kind: str, leader: bool):
+        with self._lock:
+            self._counters["calls"] += 1
+            if not leader:
+                self._counters["shared"] += 1
+        get_default_telemetry().increment("coalesced_calls_total", kind=kind,
+                                          role="leader" if leader else "shared")
+
+
+_default_flights = None
+_default_flights_lock = threading.Lock()
+
+
+def get_default_flights() -> SingleFlight:
+    """Process-wide group, so identical requests from different sessions coalesce (SINGLE_FLIGHT=0 disables)."""
+    global _default_flights
+    with _default_flights_lock:
+        if _default_flights is None:
+            _default_flights = SingleFlight(enabled=os.getenv("SINGLE_FLIGHT", "1") != "0")
+        return _default_flights
@@ -0,0 +1,239 @@
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# Canonical skill name -> aliases, matched case-insensitively on word boundaries.
+# Ambiguous English words ("go", "spring", "r") only count in unambiguous forms.
+SKILL_TAXONOMY: Dict[str, List[str]] = {
+    # Programming languages
+    "Python": ["python", "python3", "py3"],
+    "Java": ["java"],
+    "JavaScript": ["javascript", "js", "ecmascript", "es6"],
+    "TypeScript": ["typescript", "ts"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp", "c sharp"],
+    "Go": ["golang", "go lang"],
+    "Rust": ["rust"],
+    "Ruby": ["ruby"],
+    "PHP": ["php"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swift"],
+    "Scala": ["scala"],
+    "R": ["r programming", "rstudio", "r studio"],
+    "MATLAB": ["matlab"],
+    "Bash": ["bash", "shell scripting", "shell script"],
+    "SQL": ["sql", "t-sql", "pl/sql", "plsql"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3", "sass", "scss"],
+    # Frameworks and libraries
+    "React": ["react", "react.js", "reactjs"],
+    "React Native": ["react native"],
+    "Angular": ["angular", "angularjs", "angular.js"],
+    "Vue": ["vue", "vue.js", "vuejs"],
+    "Next.js": ["next.js", "nextjs"],
+    "Node.js": ["node.js", "nodejs", "node js"],
+    "Express": ["express.js", "expressjs"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Spring Boot": ["spring boot", "springboot"],
+    "Spring": ["spring framework"],
+    ".NET": [".net", "dotnet", "asp.net", ".net core"],
+    "Ruby on Rails": ["ruby on rails", "rails"],
+    "Laravel": ["laravel"],
+    "GraphQL": ["graphql"],
+    "REST APIs": ["rest api", "rest apis", "restful", "restful api", "restful apis"],
+    "gRPC": ["grpc"],
+    "Redux": ["redux"],
+    "jQuery": ["jquery"],
+    "Tailwind CSS": ["tailwind", "tailwindcss", "tailwind css"],
+    "Streamlit": ["streamlit"],
+    # Data and machine learning
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+    "TensorFlow": ["tensorflow"],
+    "PyTorch": ["pytorch", "torch"],
+    "Keras": ["keras"],
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning"],
+    "NLP": ["nlp", "natural language processing"],
+    "Computer Vision": ["computer vision", "opencv"],
+    "LLMs": ["llm", "llms", "large language models", "large language model", "generative ai", "genai"],
+    "Data Analysis": ["data analysis", "data analytics"],
+    "Data Visualization": ["data visualization", "data visualisation", "matplotlib", "seaborn", "plotly"],
+    "Statistics": ["statistics", "statistical analysis", "statistical modeling", "a/b testing"],
+    "Spark": ["spark", "apache spark", "pyspark"],
+    "Hadoop": ["hadoop", "hdfs", "mapreduce"],
+    "Kafka": ["kafka", "apache kafka"],
+    "Airflow": ["airflow", "apache airflow"],
+    "dbt": ["dbt"],
+    "ETL": ["etl", "elt", "data pipelines", "data pipeline"],
+    "Tableau": ["tableau"],
+    "Power BI": ["power bi", "powerbi"],
+    "Excel": ["excel", "ms excel", "microsoft excel", "vba"],
+    "Looker": ["looker"],
+    # Databases
+    "PostgreSQL": ["postgresql", "postgres", "psql"],
+    "MySQL": ["mysql"],
+    "SQLite": ["sqlite"],
+    "Oracle": ["oracle db", "oracle database"],
+    "SQL Server": ["sql server", "mssql", "ms sql"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Elasticsearch": ["elasticsearch", "elastic search", "opensearch"],
+    "Cassandra": ["cassandra"],
+    "DynamoDB": ["dynamodb"],
+    "Snowflake": ["snowflake"],
+    "BigQuery": ["bigquery", "big query"],
+    "Redshift": ["redshift"],
+    # Cloud and DevOps
+    "AWS": ["aws", "amazon web services", "ec2", "s3", "aws lambda"],
+    "Azure": ["azure", "microsoft azure"],
+    "GCP": ["gcp", "google cloud", "google cloud platform"],
+    "Docker": ["docker", "containerization", "dockerfile"],
+    "Kubernetes": ["kubernetes", "k8s", "eks", "gke", "aks"],
+    "Terraform": ["terraform"],
+    "Ansible": ["ansible"],
+    "CI/CD": ["ci/cd", "ci cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Jenkins": ["jenkins"],
+    "GitHub Actions": ["github actions"],
+    "GitLab CI": ["gitlab ci", "gitlab-ci"],
+    "Git": ["git", "github", "gitlab", "bitbucket"],
+    "Linux": ["linux", "unix", "ubuntu"],
+    "Microservices": ["microservices", "microservice", "micro-services"],
+    "Serverless": ["serverless"],
+    "Prometheus": ["prometheus"],
+    "Grafana": ["grafana"],
+    "Nginx": ["nginx"],
+    # Mobile
+    "iOS": ["ios"],
+    "Android": ["android"],
+    "Flutter": ["flutter", "dart"],
+    # Security and networking
+    "Cybersecurity": ["cybersecurity", "cyber security", "information security", "infosec"],
+    "Networking": ["networking", "tcp/ip", "dns"],
+    # Testing
+    "Unit Testing": ["unit testing", "unit tests", "pytest", "junit", "jest"],
+    "Test Automation": ["test automation", "selenium", "cypress", "playwright"],
+    # Design
+    "Figma": ["figma"],
+    "UI/UX Design": ["ui/ux", "ux design", "ui design", "user experience", "user interface design"],
+    "Adobe Creative Suite": ["photoshop", "illustrator", "adobe creative suite", "indesign"],
+    # Methods and business tools
+    "Agile": ["agile", "agile methodologies"],
+    "Scrum": ["scrum", "scrum master"],
+    "Kanban": ["kanban"],
+    "Jira": ["jira"],
+    "Confluence": ["confluence"],
+    "Salesforce": ["salesforce", "sfdc"],
+    "SAP": ["sap"],
+    "SEO": ["seo", "search engine optimization"],
+    "Digital Marketing": ["digital marketing", "google ads", "social media marketing", "sem"],
+    "CRM": ["crm", "hubspot"],
+    "Financial Modeling": ["financial modeling", "financial modelling", "financial analysis"],
+    "Accounting": ["accounting", "gaap", "bookkeeping", "quickbooks"],
+    # Professional skills
+    "Project Management": ["project management", "pmp", "program management"],
+    "Product Management": ["product management", "product roadmap", "roadmapping"],
+    "Leadership": ["leadership", "team lead", "team leadership", "people management"],
+    "Communication": ["communication", "communication skills"],
+    "Stakeholder Management": ["stakeholder management", "stakeholder engagement"],
+    "Problem Solving": ["problem solving", "problem-solving"],
+    "Mentoring": ["mentoring", "mentorship", "coaching"],
+    "System Design": ["system design", "systems design", "software architecture", "distributed systems"],
+}
+
+MAX_SKILLS = 15
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over every alias in a skill taxonomy.
+
+    One pass over the lowercased text finds every alias occurrence, however
+    many aliases there are. Matches must sit on word boundaries, so "java"
+    does not fire inside "javascript"; where aliases overlap ("react native"
+    and "react") the longest one wins.
+    """
+
+    def __init__(self, taxonomy: Optional[Dict[str, List[str]]] = None):
+        taxonomy = taxonomy or SKILL_TAXONOMY
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (alias length, canonical skill) for every alias ending here
+        self._out: List[List[Tuple[int, str]]] = [[]]
+
+        for canonical, aliases in taxonomy.items():
+            for alias in {alias.lower() for alias in aliases}:
+                self._add(alias, canonical)
+        self._link()
+
+    def _add(self, alias: str, canonical: str):
+        state = 0
+        for char in alias:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append((len(alias), canonical))
+
+    def _link(self):
+        """Breadth-first pass setting failure links and merging outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """All non-overlapping (start, end, canonical skill) matches, in text order."""
+        text = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, canonical in out[state]:
+                start = end - length
+                if (start == 0 or not text[start - 1].isalnum()) and \
+                        (end == len(text) or not (text[end].isalnum() or text[end] in "+#")):
+                    matches.append((start, end, canonical))
+
+        # Longest match wins where aliases overlap
+        matches.sort(key=lambda match: (match[0], match[0] - match[1]))
+        kept, covered = [], 0
+        for start, end, canonical in matches:
+            if start >= covered:
+                kept.append((start, end, canonical))
+                covered = end
+        return kept
+
+    def extract(self, text: str, limit: int = MAX_SKILLS) -> List[str]:
+        """Canonical skills found in the text, most mentioned first (ties by first mention)."""
+        counts: Dict[str, int] = {}
+        for _, _, canonical in self.find(text):
+            counts[canonical] = counts.get(canonical, 0) + 1
+        # dicts keep insertion order, so the stable sort breaks ties by first mention
+        return sorted(counts, key=counts.get, reverse=True)[:limit]
+
+
+_default_matcher = None
+
+
+def extract_skills(text: str, limit: int = MAX_SKILLS) -> List[str]:
+    """Extract skills with the default taxonomy (the automaton is built on first use)."""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = SkillMatcher()
+    return _default_matcher.extract(text, limit)
@@ -0,0 +1,285 @@
+import contextvars
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds, from a cache hit to a slow LLM call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PREFIX = "agragrati_"
+
+METRIC_HELP = {
+    "stage_duration_seconds": ("histogram", "Time spent in each traced stage"),
+    "provider_request_duration_seconds": ("histogram", "Job provider HTTP request latency, per attempt"),
+    "provider_responses_total": ("counter", "Job provider HTTP responses by status code (\"error\" for connection failures)"),
+    "llm_tokens_total": ("counter", "Tokens used by LLM calls, by prompt and kind"),
+    "llm_requests_total": ("counter", "LLM calls by prompt and cache result"),
+    "rate_limit_utilization": ("gauge", "Share of each upstream's per-minute budget in use (1 = exhausted)"),
+    "rate_limit_wait_seconds": ("histogram", "Time callers queued for an upstream's rate budget"),
+    "rate_limited_total": ("counter", "Calls refused with retry-after because an upstream's queue was too long"),
+    "coalesced_calls_total": ("counter", "Searches and LLM calls by whether they ran (leader) or shared an identical in-flight call"),
+}
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _new_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus model."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation (None if it is past the last bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, count in zip(self.buckets, self.counts):
+            if count >= rank:
+                return bound
+        return None
+
+
+class Span:
+    """One timed stage; attributes set on it go to the JSON log."""
+
+    def __init__(self, name: str, labels: Dict[str, str], attributes: Dict, parent: Optional["Span"]):
+        self.name = name
+        self.labels = labels
+        self.attributes = attributes
+        self.trace_id = parent.trace_id if parent else _new_id()
+        self.span_id = _new_id()
+        self.parent_id = parent.span_id if parent else None
+        self.status = "ok"
+        self.start = time.perf_counter()
+        self.started_at = time.time()
+        self.duration = 0.0
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+
+class Telemetry:
+    """Spans, counters and latency histograms for the app and JobSearcher.
+
+    Finished spans feed the `stage_duration_seconds` histogram and, when a
+    log path is configured (TELEMETRY_LOG, "-" for stdout), are written as one
+    JSON line each. `render_prometheus` exports everything in the Prometheus
+    text format, which `serve` exposes on /metrics.
+    """
+
+    def __init__(self, log_path: Optional[str] = None, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.log_path = log_path
+        self._metrics: Dict[str, Dict[Labels, object]] = {}
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._log = None
+        self._server = None
+        self._collectors: List[Callable[[], None]] = []
+        if log_path:
+            try:
+                self._log = sys.stdout if log_path == "-" else open(log_path, "a", encoding="utf-8")
+            except OSError as e:
+                print(f"Telemetry log disabled: {str(e)}")
+
+    @contextmanager
+    def span(self, name: str, labels: Optional[Dict[str, str]] = None, **attributes) -> Iterator[Span]:
+        """Time the enclosed block as a stage; an exception marks the span as an error and propagates."""
+        span = Span(name, labels or {}, attributes, _current_span.get())
+        token = _current_span.set(span)
+        try:
+            yield span
+        except GeneratorExit:
+            # A consumer stopped reading a stream early
+            span.status = "cancelled"
+            raise
+        except BaseException as e:
+            span.status = "error"
+            span.set(error=f"{type(e).__name__}: {str(e)}"[:300])
+            raise
+        finally:
+            _current_span.reset(token)
+            span.duration = time.perf_counter() - span.start
+            self.observe("stage_duration_seconds", span.duration, stage=name, status=span.status, **span.labels)
+            self._write_log(span)
+
+    def observe(self, metric: str, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._metrics.setdefault(metric, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def increment(self, metric: str, value: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._metrics.setdefault(metric, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, metric: str, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._metrics.setdefault(metric, {})[key] = value
+
+    def add_collector(self, collect: Callable[[], None]):
+        """Register a function that refreshes gauges; it runs before every snapshot or export."""
+        with self._lock:
+            self._collectors.append(collect)
+
+    def _collect(self):
+        with self._lock:
+            collectors = list(self._collectors)
+        for collect in collectors:
+            try:
+                collect()
+            except Exception as e:
+                print(f"Metrics collector failed: {str(e)}")
+
+    def snapshot(self) -> Dict[str, List[Dict]]:
+        """All series as plain data (histograms with count, sum, p50/p95 bucket bounds)."""
+        self._collect()
+        with self._lock:
+            snapshot = {}
+            for metric, series in self._metrics.items():
+                rows = []
+                for key, value in series.items():
+                    row = {"labels": dict(key)}
+                    if isinstance(value, Histogram):
+                        row.update(count=value.count, sum=round(value.sum, 6),
+                                   p50=value.quantile(0.5), p95=value.quantile(0.95))
+                    else:
+                        row["value"] = value
+                    rows.append(row)
+                snapshot[metric] = rows
+            return snapshot
+
+    def render_prometheus(self) -> str:
+        self._collect()
+        lines = []
+        with self._lock:
+            for metric in sorted(self._metrics):
+                kind, help_text = METRIC_HELP.get(metric, ("untyped", metric))
+                name = PREFIX + metric
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in sorted(self._metrics[metric].items()):
+                    if isinstance(value, Histogram):
+                        for bound, count in zip(value.buckets, value.counts):
+                            lines.append(f"{name}_bucket{_format_labels(key + (('le', repr(bound)),))} {count}")
+                        lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {value.count}")
+                        lines.append(f"{name}_sum{_format_labels(key)} {value.sum}")
+                        lines.append(f"{name}_count{_format_labels(key)} {value.count}")
+                    else:
+                        lines.append(f"{name}{_format_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """Expose /metrics (Prometheus text) and /metrics.json on a background HTTP server."""
+        if self._server is not None:
+            return
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = telemetry.render_prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = json.dumps(telemetry.snapshot()), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"Metrics endpoint disabled: {str(e)}")
+            return
+        threading.Thread(target=self._server.serve_forever, name="telemetry-http", daemon=True).start()
+
+    @staticmethod
+    def _key(labels: Dict) -> Labels:
+        return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+    def _write_log(self, span: Span):
+        if self._log is None:
+            return
+        record = {
+            "ts": round(span.started_at, 6),
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "name": span.name,
+            "duration_ms": round(span.duration * 1000, 3),
+            "status": span.status,
+            **span.labels,
+            **span.attributes,
+        }
+        with self._log_lock:
+            self._log.write(json.dumps(record, default=str) + "\n")
+            self._log.flush()
+
+
+def _format_labels(key: Labels) -> str:
+    if not key:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in key)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + "}"
+
+
+_default_telemetry = None
+_default_telemetry_lock = threading.Lock()
+
+
+def get_default_telemetry() -> Telemetry:
+    """Process-wide telemetry; starts the metrics endpoint if TELEMETRY_PORT is set."""
+    global _default_telemetry
+    with _default_telemetry_lock:
+        if _default_telemetry is None:
+            _default_telemetry = Telemetry(log_path=os.getenv("TELEMETRY_LOG"))
+            port = os.getenv("TELEMETRY_PORT")
+            if port:
+                _default_telemetry.serve(int(port), os.getenv("TELEMETRY_HOST", "127.0.0.1"))
+        return _default_telemetry
+
+
+def span(name: str, labels: Optional[Dict[str, str]] = None, **attributes):
+    """Shortcut for get_default_telemetry().span(...)."""
+    return get_default_telemetry().span(name, labels, **attributes)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
@@ -0,0 +1,194 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from lazy_imports import LazyModule
+from telemetry import span
+
+# Imported with the first PDF, so the app's first render doesn't wait for it
+PyPDF2 = LazyModule("PyPDF2")
+
+
+class ExtractionError(Exception):
+    """Raised when an uploaded file can't be turned into text within the limits."""
+
+
+# Limits for uploaded documents
+MAX_BYTES = int(os.getenv("EXTRACTION_MAX_BYTES", str(10 * 1024 * 1024)))
+MAX_PAGES = int(os.getenv("EXTRACTION_MAX_PAGES", "100"))
+TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "30"))
+
+# PDFs with at least this many pages are split across the process pool
+PARALLEL_MIN_PAGES = int(os.getenv("EXTRACTION_PARALLEL_MIN_PAGES", "16"))
+WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Memory budget for cached extraction results, in characters of text
+CACHE_MAX_CHARS = int(os.getenv("EXTRACTION_CACHE_MAX_CHARS", str(20 * 1024 * 1024)))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class ExtractionCache:
+    """LRU cache of extracted text keyed by the SHA-256 of the uploaded bytes.
+
+    Bounded by total characters held rather than entry count, since one
+    100-page portfolio can outweigh dozens of one-page resumes.
+    """
+
+    def __init__(self, max_chars: int = CACHE_MAX_CHARS):
+        self.max_chars = max_chars
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(data: bytes, content_type: Optional[str]) -> str:
+        return f"{content_type}:{hashlib.sha256(data).hexdigest()}"
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key: str, text: str):
+        if len(text) > self.max_chars:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._chars -= len(previous)
+            self._entries[key] = text
+            self._chars += len(text)
+            while self._chars > self.max_chars:
+                _, evicted = self._entries.popitem(last=False)
+                self._chars -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+
+extraction_cache = ExtractionCache()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork: the Streamlit server is multi-threaded
+            _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _extract_page_range(data: bytes, start: int, stop: int) -> List[str]:
+    """Extract pages [start, stop) of a PDF; runs in a worker process."""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def extract_pdf_text(data: bytes, max_pages: Optional[int] = None, timeout: Optional[float] = None,
+                     parallel_min_pages: Optional[int] = None) -> str:
+    """Extract text from a PDF, page-parallel for long documents.
+
+    Only the first `max_pages` pages are read. Raises ExtractionError if the
+    file can't be parsed or extraction takes longer than `timeout` seconds.
+    """
+    max_pages = MAX_PAGES if max_pages is None else max_pages
+    timeout = TIMEOUT if timeout is None else timeout
+    parallel_min_pages = PARALLEL_MIN_PAGES if parallel_min_pages is None else parallel_min_pages
+    deadline = time.monotonic() + timeout
+
+    try:
+        reader = PyPDF2.PdfReader(io.BytesIO(data))
+        page_count = min(len(reader.pages), max_pages)
+    except Exception as e:
+        raise ExtractionError(f"Could not read PDF: {str(e)}")
+
+    if page_count < parallel_min_pages or WORKERS < 2:
+        pages = []
+        for i in range(page_count):
+            if time.monotonic() > deadline:
+                raise ExtractionError(f"PDF extraction timed out after {timeout:g}s")
+            pages.append(reader.pages[i].extract_text() or "")
+    else:
+        # One contiguous page range per worker; each worker re-parses the bytes once
+        chunk = -(-page_count // WORKERS)
+        pool = _get_pool()
+        futures = [pool.submit(_extract_page_range, data, start, min(start + chunk, page_count))
+                   for start in range(0, page_count, chunk)]
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        if not_done:
+            for future in not_done:
+                future.cancel()
+            raise ExtractionError(f"PDF extraction timed out after {timeout:g}s")
+        pages = []
+        for future in futures:
+            try:
+                pages.extend(future.result())
+            except Exception as e:
+                raise ExtractionError(f"Could not read PDF: {str(e)}")
+
+    # Join once instead of growing a string page by page
+    return "".join(page + "\n" for page in pages)
+
+
+def extract_plain_text(data: bytes) -> str:
+    """Decode a plain-text upload."""
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise ExtractionError(f"Text file is not valid UTF-8: {str(e)}")
+
+
+EXTRACTORS: Dict[str, Callable[[bytes], str]] = {
+    "application/pdf": extract_pdf_text,
+    "text/plain": extract_plain_text,
+}
+
+
+def register_extractor(content_type: str, extractor: Callable[[bytes], str]):
+    """Plug in (or replace) the extractor used for a MIME type."""
+    EXTRACTORS[content_type] = extractor
+
+
+def extract_text(data: bytes, content_type: Optional[str], max_bytes: Optional[int] = None,
+                 cache: Optional[ExtractionCache] = extraction_cache) -> str:
+    """Turn an uploaded file into text using the extractor for its MIME type.
+
+    Results are cached by content hash, so the same upload is parsed once
+    however many times it is analyzed. Pass cache=None to always re-extract.
+    """
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    with span("extract_text", content_type=content_type, bytes=len(data)) as stage:
+        if len(data) > max_bytes:
+            raise ExtractionError(f"File is {len(data) / 1024 / 1024:.1f} MB; the limit is {max_bytes / 1024 / 1024:.0f} MB")
+
+        key = ExtractionCache.make_key(data, content_type) if cache is not None else None
+        if key is not None:
+            text = cache.get(key)
+            if text is not None:
+                stage.set(cache="hit", chars=len(text))
+                return text
+
+        # Anything that isn't a registered type is treated as text, as before
+        extractor = EXTRACTORS.get(content_type, extract_plain_text)
+        text = extractor(data)
+        stage.set(cache="miss", chars=len(text))
+        if key is not None:
+            cache.put(key, text)
+        return text